@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Hashable
+
+from fastapi.responses import Response
+
+from app.api.conditional import ConditionalRequest, Validators
+from app.api.serializers import json_response
+from app.config import RESPONSE_CACHE_SIZE
+from app.generation import generation
+
+
+def date_bucket(dt: datetime | None) -> datetime | None:
+    """Truncate `dt` to the hour so requests within the hour share a cached response.
+    Endpoints query with the truncated date too so a cached response is exactly the
+    response of every date in its bucket.
+    """
+    if dt is None:
+        return None
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+class ResponseCache:
+    """LRU cache of the serialized JSON bodies of API responses.
+    Keys include the generation so a scraper run never serves an old response, and the
+    cache is flushed when the generation changes. A hit skips both SQL and Pydantic, and
+    is answered with 304 from the cached validators when the client has it already.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._bodies: OrderedDict[
+            Hashable, tuple[bytes, Validators | None]
+        ] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def key(self, route: str, **params: Hashable) -> tuple:
+        return (route, generation.value, *sorted(params.items()))
+
+    def get(
+        self, key: tuple, conditional: ConditionalRequest | None = None
+    ) -> Response | None:
+        cached = self._bodies.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._bodies.move_to_end(key)
+        body, validators = cached
+        if validators is None:
+            return json_response(body)
+        if conditional and (not_modified := conditional.not_modified(validators)):
+            return not_modified
+        return json_response(body, validators.headers)
+
+    def store(
+        self, key: tuple, body: bytes, validators: Validators | None = None
+    ) -> Response:
+        """Cache the JSON `body` and return it as a response."""
+        self._bodies[key] = (body, validators)
+        self._bodies.move_to_end(key)
+        while len(self._bodies) > self.max_size:
+            self._bodies.popitem(last=False)
+        return json_response(body, validators.headers if validators else None)
+
+    def clear(self) -> None:
+        self._bodies.clear()
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+generation.on_change(response_cache.clear)
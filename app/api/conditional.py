@@ -0,0 +1,136 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Annotated, Hashable, Iterable
+
+from fastapi import Depends, Header
+from fastapi.responses import Response
+
+from app.database import AsyncSession
+from app.scraper.sessions import ForecastSession, WarningSession
+from app.scraper_sessions import get_latest_session_stamps
+
+
+@dataclass(frozen=True)
+class Validators:
+    """Strong `ETag` and `Last-Modified` of a response built from scraper sessions."""
+
+    etag: str
+    last_modified: datetime
+
+    @classmethod
+    def from_sessions(
+        cls,
+        sessions: Iterable[tuple[int, datetime]],
+        route: str,
+        params: dict[str, Hashable],
+    ) -> "Validators":
+        sessions = sorted(sessions)
+        # the params tell apart the responses built from the same sessions
+        digest = hashlib.blake2b(
+            repr((route, sorted(params.items()), [s[0] for s in sessions])).encode(),
+            digest_size=16,
+        )
+        return cls(
+            etag=f'"{digest.hexdigest()}"',
+            last_modified=max(s[1] for s in sessions).replace(microsecond=0),
+        )
+
+    @classmethod
+    def from_files(
+        cls, files: Iterable[Path], route: str, params: dict[str, Hashable]
+    ) -> "Validators":
+        """Validators of a response built from the exported `files`."""
+        stats = sorted((str(f), f.stat()) for f in files)
+        digest = hashlib.blake2b(
+            repr(
+                (
+                    route,
+                    sorted(params.items()),
+                    [(f, s.st_size, s.st_mtime_ns) for f, s in stats],
+                )
+            ).encode(),
+            digest_size=16,
+        )
+        return cls(
+            etag=f'"{digest.hexdigest()}"',
+            last_modified=datetime.fromtimestamp(
+                max(s.st_mtime for _, s in stats), timezone.utc
+            ).replace(microsecond=0),
+        )
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+        }
+
+
+class ConditionalRequest:
+    """`If-None-Match` and `If-Modified-Since` of a request.
+    `check` looks up the sessions a response is built from before any of its rows so a
+    handler can answer 304 without hydrating or serializing anything.
+    """
+
+    def __init__(
+        self,
+        if_none_match: str | None = Header(None),
+        if_modified_since: str | None = Header(None),
+    ) -> None:
+        self.if_none_match = if_none_match
+        self.if_modified_since = if_modified_since
+        self.validators: Validators | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return self.validators.headers if self.validators else {}
+
+    async def check(
+        self,
+        db_session: AsyncSession,
+        session_names: Iterable[ForecastSession | WarningSession],
+        as_of: datetime | None,
+        route: str,
+        **params: Hashable,
+    ) -> Response | None:
+        """Return a 304 response when the client has the response built from the
+        latest sessions, as of `as_of`, already."""
+        sessions = await get_latest_session_stamps(db_session, session_names, as_of)
+        if not sessions:
+            return None
+        self.validators = Validators.from_sessions(sessions, route, params)
+        return self.not_modified(self.validators)
+
+    def check_files(
+        self, files: Iterable[Path], route: str, **params: Hashable
+    ) -> Response | None:
+        """Return a 304 response when the client has the response built from the
+        exported `files` already."""
+        files = list(files)
+        if not files:
+            return None
+        self.validators = Validators.from_files(files, route, params)
+        return self.not_modified(self.validators)
+
+    def not_modified(self, validators: Validators) -> Response | None:
+        if self.if_none_match is not None:
+            # weak comparison as for any `If-None-Match`
+            tags = {t.strip().removeprefix("W/") for t in self.if_none_match.split(",")}
+            modified = not ({"*", validators.etag} & tags)
+        elif self.if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(self.if_modified_since)
+                modified = validators.last_modified > since
+            except (TypeError, ValueError):
+                modified = True
+        else:
+            modified = True
+        if modified:
+            return None
+        return Response(status_code=304, headers=validators.headers)
+
+
+ConditionalDep = Annotated[ConditionalRequest, Depends()]
@@ -1,49 +1,104 @@
+from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.exceptions import HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 
-from app.api.locations import LocationDep
-from app.api import responses
+from app.api.cache import date_bucket, response_cache
+from app.api.conditional import ConditionalDep
+from app.api.exports import ExportFormat, export_response
+from app.api.generation import check_generation_dependency
+from app.api.locations import CoordinatesDep, LocationDep, LocationsDep
+from app.api.pagination import CursorDep, encode_cursor
+from app.api import responses, serializers
 from app.api.scraper_sessions import (
     ScraperSessionDep,
     WeatherWarningScraperSessionDep,
 )
+from app.arrow_export import get_export_file, list_export_files
+from app.config import EXPORT_PATH
 from app.database import AsyncSession, get_db_session
 from app.forecast_media import get_images_by_session_id, get_latest_forecast_media
-from app.forecasts import get_latest_forecasts
-from app.locations import get_all_locations
+from app.forecasts import (
+    forecast_history_query,
+    get_forecast_history,
+    get_latest_forecast_intervals,
+    get_latest_forecasts,
+    get_latest_forecasts_by_location,
+    interpolate_forecasts,
+)
+from app.locations import location_registry
 
-from app.scraper.sessions import WarningSession
+from app.scraper.sessions import ForecastSession, WarningSession
 
 from app.scraper_sessions import get_latest_scraper_session
 from app.api.responses import (
+    VmgdApiForecastInterpolatedResponse,
+    VmgdApiForecastIntervalResponse,
+    VmgdApiForecastBatchResponse,
+    VmgdApiForecastHistoryResponse,
     VmgdApiForecastResponse,
     VmgdApiForecastMediaResponse,
+    VmgdApiWeatherWarningHistoryResponse,
     VmgdApiWeatherWarningResponse,
     VmgdApiWeatherWarningsResponse,
 )
-from app.api.utils import render_vmgd_api_response
-from app.utils.datetime import DateDep, now
-from app.weather_warnings import get_latest_weather_warning
+from app.api.serializers import (
+    dump_history_page,
+    dump_vmgd_api_response,
+    json_response,
+)
+from app.utils.datetime import DateDep, DateRangeDep
+from app.weather_warnings import (
+    get_latest_weather_warning,
+    get_weather_warning_history,
+    weather_warning_history_query,
+)
 
-api_router = APIRouter()
+api_router = APIRouter(dependencies=[Depends(check_generation_dependency)])
 
 
 @api_router.get("/locations")
 async def get_locations(
     db_session: AsyncSession = Depends(get_db_session),
+    *,
+    response: Response,
+    conditional: ConditionalDep,
+    coordinates: CoordinatesDep,
+    k: int = Query(None, ge=1),
+    max_distance: float = Query(None, alias="maxDistance", gt=0),
 ) -> list[responses.LocationResponseData]:
-    locations = await get_all_locations(db_session)
+    # the forecast sessions save the locations
+    if not_modified := await conditional.check(
+        db_session,
+        [ForecastSession.FORECAST_GENERAL],
+        None,
+        "locations",
+        coordinates=coordinates,
+        k=k,
+        max_distance=max_distance,
+    ):
+        return not_modified
+    response.headers.update(conditional.headers)
+    if coordinates is None:
+        locations = [
+            (location, None) for location in await location_registry.all(db_session)
+        ]
+    else:
+        # nearest first
+        locations = await location_registry.nearest(
+            db_session, *coordinates, k=k, max_distance=max_distance
+        )
     return [
         responses.LocationResponseData(
             id=location.id,
             name=location.name,
             latitude=location.latitude,
             longitude=location.longitude,
+            distance=distance,
         )
-        for location in locations
+        for location, distance in locations
     ]
 
 
@@ -51,31 +106,237 @@ async def get_locations(
 async def get_forecasts(
     db_session: AsyncSession = Depends(get_db_session),
     *,
+    conditional: ConditionalDep,
     location: LocationDep,
     dt: DateDep,
 ) -> VmgdApiForecastResponse:
+    dt = date_bucket(dt)
+    params = dict(location=location.id if location else None, dt=dt)
+    cache_key = response_cache.key("forecasts", **params)
+    if cached := response_cache.get(cache_key, conditional):
+        return cached
+    if not_modified := await conditional.check(
+        db_session, [ForecastSession.FORECAST_GENERAL], dt, "forecasts", **params
+    ):
+        return not_modified
     forecasts = await get_latest_forecasts(db_session, location, dt)
     if not forecasts:
         raise HTTPException(status_code=404, detail="No forecast data available")
-    data = [
-        responses.ForecastResponseData(
-            location=forecast.location.id,
-            date=forecast.date,
-            summary=forecast.summary,
-            minTemp=forecast.minTemp,
-            maxTemp=forecast.maxTemp,
-            minHumi=forecast.minHumi,
-            maxHumi=forecast.maxHumi,
+    body = dump_vmgd_api_response(
+        list(map(serializers.forecast_data, forecasts)),
+        issued=forecasts[0].issued_at,
+        fetched=forecasts[0].session.fetched_at,
+    )
+    return response_cache.store(cache_key, body, conditional.validators)
+
+
+@api_router.get("/forecasts/batch")
+async def get_forecasts_batch(
+    db_session: AsyncSession = Depends(get_db_session),
+    *,
+    conditional: ConditionalDep,
+    locations: LocationsDep,
+    date_range: DateRangeDep,
+) -> VmgdApiForecastBatchResponse:
+    """Daily forecasts of the comma separated `locationIds`, or of `all` locations,
+    between `start` and `end` grouped by location. The forecasts are those of the latest
+    session as of `start`."""
+    start, end = map(date_bucket, date_range)
+    params = dict(
+        locations=tuple(l.id for l in locations) if locations is not None else None,
+        start=start,
+        end=end,
+    )
+    cache_key = response_cache.key("forecasts/batch", **params)
+    if cached := response_cache.get(cache_key, conditional):
+        return cached
+    if not_modified := await conditional.check(
+        db_session,
+        [ForecastSession.FORECAST_GENERAL],
+        start,
+        "forecasts/batch",
+        **params,
+    ):
+        return not_modified
+    forecasts = await get_latest_forecasts_by_location(
+        db_session, locations, start, end
+    )
+    if not forecasts:
+        raise HTTPException(status_code=404, detail="No forecast data available")
+    first = next(iter(forecasts.values()))[0]
+    body = dump_vmgd_api_response(
+        serializers.location_forecasts_data(forecasts),
+        issued=first.issued_at,
+        fetched=first.session.fetched_at,
+    )
+    return response_cache.store(cache_key, body, conditional.validators)
+
+
+@api_router.get("/forecasts/history")
+async def get_forecasts_history(
+    db_session: AsyncSession = Depends(get_db_session),
+    *,
+    conditional: ConditionalDep,
+    location: LocationDep,
+    cursor: CursorDep,
+    limit: int = Query(100, ge=1, le=1000),
+) -> VmgdApiForecastHistoryResponse:
+    """Daily forecasts of every session in the order they were issued, `limit` at a
+    time. Pass `meta.next` as `cursor` for the next page, it is null on the last page.
+    """
+    # the history only grows when a session completes
+    if not_modified := await conditional.check(
+        db_session,
+        [ForecastSession.FORECAST_GENERAL],
+        None,
+        "forecasts/history",
+        location=location.id if location else None,
+        cursor=cursor,
+        limit=limit,
+    ):
+        return not_modified
+    forecasts = await get_forecast_history(db_session, location, cursor, limit + 1)
+    next_cursor = None
+    if len(forecasts) > limit:
+        forecasts = forecasts[:limit]
+        next_cursor = encode_cursor(forecasts[-1].issued_at, forecasts[-1].id)
+    body = dump_history_page(
+        list(map(serializers.forecast_history_data, forecasts)), next_cursor
+    )
+    return json_response(body, conditional.headers)
+
+
+@api_router.get("/forecasts/interpolated")
+async def get_interpolated_forecasts(
+    db_session: AsyncSession = Depends(get_db_session),
+    *,
+    conditional: ConditionalDep,
+    coordinates: CoordinatesDep,
+    max_distance: float = Query(None, alias="maxDistance", gt=0),
+) -> VmgdApiForecastInterpolatedResponse:
+    """Daily forecast at `lat`/`lon` interpolated from the nearby locations of the
+    latest forecast."""
+    if coordinates is None:
+        raise HTTPException(status_code=400, detail="Both lat and lon are required")
+    if not_modified := await conditional.check(
+        db_session,
+        [ForecastSession.FORECAST_GENERAL],
+        None,
+        "forecasts/interpolated",
+        coordinates=coordinates,
+        max_distance=max_distance,
+    ):
+        return not_modified
+    index = await location_registry.index(db_session)
+    if max_distance is not None and not index.nearest(
+        *coordinates, max_distance=max_distance
+    ):
+        raise HTTPException(status_code=404, detail="No location within this distance")
+    forecasts = await get_latest_forecasts(db_session, None)
+    data = interpolate_forecasts(forecasts, index, *coordinates)
+    if not data:
+        raise HTTPException(status_code=404, detail="No forecast data available")
+    body = dump_vmgd_api_response(
+        list(map(serializers.forecast_interpolated_data, data)),
+        issued=forecasts[0].issued_at,
+        fetched=forecasts[0].session.fetched_at,
+    )
+    return json_response(body, conditional.headers)
+
+
+@api_router.get("/forecasts/intervals")
+async def get_forecast_intervals(
+    db_session: AsyncSession = Depends(get_db_session),
+    *,
+    conditional: ConditionalDep,
+    location: LocationDep,
+    dt: DateDep,
+) -> VmgdApiForecastIntervalResponse:
+    if not_modified := await conditional.check(
+        db_session,
+        [ForecastSession.FORECAST_GENERAL],
+        dt,
+        "forecasts/intervals",
+        location=location.id if location else None,
+        dt=dt,
+    ):
+        return not_modified
+    intervals = await get_latest_forecast_intervals(db_session, location, dt)
+    if not intervals:
+        raise HTTPException(status_code=404, detail="No forecast data available")
+    body = dump_vmgd_api_response(
+        [
+            data
+            for interval in intervals
+            for data in serializers.forecast_interval_data(interval)
+        ],
+        issued=intervals[0].issued_at,
+        fetched=intervals[0].session.fetched_at,
+    )
+    return json_response(body, conditional.headers)
+
+
+@api_router.get("/export/forecasts", response_class=StreamingResponse)
+async def export_forecasts(
+    db_session: AsyncSession = Depends(get_db_session),
+    *,
+    conditional: ConditionalDep,
+    locations: LocationsDep,
+    date_range: DateRangeDep,
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+) -> StreamingResponse:
+    """Stream the daily forecasts of every session with a forecast date between `start`
+    and `end` as NDJSON or CSV."""
+    if not_modified := await conditional.check(
+        db_session,
+        [ForecastSession.FORECAST_GENERAL],
+        None,
+        "export/forecasts",
+        locations=tuple(l.id for l in locations) if locations is not None else None,
+        date_range=date_range,
+        export_format=export_format.value,
+    ):
+        return not_modified
+    query = forecast_history_query(locations, *date_range)
+    return export_response(
+        db_session, query, export_format, "forecasts", conditional.headers
+    )
+
+
+@api_router.get("/export/files")
+async def get_export_files(
+    *, response: Response, conditional: ConditionalDep
+) -> list[responses.ExportFileResponseData]:
+    """Files of the partitioned Parquet or Arrow IPC export of the forecast and warning
+    history. Exports only add files, so a client fetches the files it does not have."""
+    paths = list_export_files(EXPORT_PATH)
+    if not_modified := conditional.check_files(
+        [EXPORT_PATH / path for path in paths], "export/files"
+    ):
+        return not_modified
+    response.headers.update(conditional.headers)
+    data = []
+    for path in paths:
+        stat = (EXPORT_PATH / path).stat()
+        data.append(
+            responses.ExportFileResponseData(
+                path=path.as_posix(),
+                size=stat.st_size,
+                modified=datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            )
         )
-        for forecast in forecasts
-    ]
-    issued = forecasts[0].issued_at
-    fetched = forecasts[0].session.fetched_at
-    return await render_vmgd_api_response(
-        data,
-        response_class=VmgdApiForecastResponse,
-        issued=issued,
-        fetched=fetched,
+    return data
+
+
+@api_router.get("/export/files/{path:path}", response_class=FileResponse)
+async def get_export_file_(path: str, *, conditional: ConditionalDep) -> FileResponse:
+    file = get_export_file(EXPORT_PATH, path)
+    if file is None:
+        raise HTTPException(status_code=404, detail="No export file at this path")
+    if not_modified := conditional.check_files([file], "export/file"):
+        return not_modified
+    return FileResponse(
+        file, media_type="application/octet-stream", headers=conditional.headers
     )
 
 
@@ -83,37 +344,45 @@ async def get_forecasts(
 async def get_forecast_media_(
     db_session: AsyncSession = Depends(get_db_session),
     *,
+    conditional: ConditionalDep,
     dt: DateDep,
 ) -> VmgdApiForecastMediaResponse:
-    if dt is None:
-        dt = now()
+    dt = date_bucket(dt)
+    cache_key = response_cache.key("media", dt=dt)
+    if cached := response_cache.get(cache_key, conditional):
+        return cached
+    if not_modified := await conditional.check(
+        db_session, [ForecastSession.FORECAST_MEDIA], dt, "media", dt=dt
+    ):
+        return not_modified
     forecast_media = await get_latest_forecast_media(db_session, dt)
     if not forecast_media:
         raise HTTPException(status_code=404, detail="No forecast data available")
 
     images = await get_images_by_session_id(db_session, forecast_media.session_id)
-    data = responses.ForecastMediaResponseData(
-        summary=forecast_media.summary,
-        images=[img._server_filepath for img in images] if images is not None else [],
-    )
-    issued = forecast_media.issued_at
-    fetched = forecast_media.session.fetched_at
-    return await render_vmgd_api_response(
-        data,
-        response_class=VmgdApiForecastMediaResponse,
-        issued=issued,
-        fetched=fetched,
+    body = dump_vmgd_api_response(
+        serializers.forecast_media_data(forecast_media, images),
+        issued=forecast_media.issued_at,
+        fetched=forecast_media.session.fetched_at,
     )
+    return response_cache.store(cache_key, body, conditional.validators)
 
 
 @api_router.get("/warnings")
 async def get_weather_warnings_(
     db_session: AsyncSession = Depends(get_db_session),
     *,
+    conditional: ConditionalDep,
     dt: DateDep,
 ) -> VmgdApiWeatherWarningsResponse:
-    if not dt:
-        dt = now()
+    dt = date_bucket(dt)
+    cache_key = response_cache.key("warnings", dt=dt)
+    if cached := response_cache.get(cache_key, conditional):
+        return cached
+    if not_modified := await conditional.check(
+        db_session, WarningSession, dt, "warnings", dt=dt
+    ):
+        return not_modified
     weather_warnings = []
     for session_name in WarningSession:
         ww = await get_latest_weather_warning(
@@ -124,21 +393,72 @@ async def get_weather_warnings_(
 
     if not weather_warnings:
         raise HTTPException(status_code=404, detail="No weather warning data available")
-    data = [
-        responses.WeatherWarningResponseData(
-            date=w.date,
-            name=w.session._name,
-            body=w.body,
-        )
-        for w in weather_warnings
-    ]
-    issued = min(map(lambda w: w.issued_at, weather_warnings))
-    fetched = min(map(lambda w: w.session.fetched_at, weather_warnings))
-    return await render_vmgd_api_response(
-        data,
-        response_class=VmgdApiWeatherWarningsResponse,
-        issued=issued,
-        fetched=fetched,
+    body = dump_vmgd_api_response(
+        list(map(serializers.weather_warning_data, weather_warnings)),
+        issued=min(map(lambda w: w.issued_at, weather_warnings)),
+        fetched=min(map(lambda w: w.session.fetched_at, weather_warnings)),
+    )
+    return response_cache.store(cache_key, body, conditional.validators)
+
+
+@api_router.get("/warnings/history")
+async def get_weather_warnings_history(
+    db_session: AsyncSession = Depends(get_db_session),
+    *,
+    conditional: ConditionalDep,
+    session_name: WeatherWarningScraperSessionDep,
+    cursor: CursorDep,
+    limit: int = Query(100, ge=1, le=1000),
+) -> VmgdApiWeatherWarningHistoryResponse:
+    """Weather warnings of every session, or of the `name` session, in the order they
+    were issued as `/forecasts/history`."""
+    if not_modified := await conditional.check(
+        db_session,
+        [session_name] if session_name else WarningSession,
+        None,
+        "warnings/history",
+        session_name=session_name.value if session_name else None,
+        cursor=cursor,
+        limit=limit,
+    ):
+        return not_modified
+    warnings = await get_weather_warning_history(
+        db_session, session_name, cursor, limit + 1
+    )
+    next_cursor = None
+    if len(warnings) > limit:
+        warnings = warnings[:limit]
+        next_cursor = encode_cursor(warnings[-1].issued_at, warnings[-1].id)
+    body = dump_history_page(
+        list(map(serializers.weather_warning_history_data, warnings)), next_cursor
+    )
+    return json_response(body, conditional.headers)
+
+
+@api_router.get("/export/warnings", response_class=StreamingResponse)
+async def export_weather_warnings(
+    db_session: AsyncSession = Depends(get_db_session),
+    *,
+    conditional: ConditionalDep,
+    session_name: WeatherWarningScraperSessionDep,
+    date_range: DateRangeDep,
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+) -> StreamingResponse:
+    """Stream the weather warnings of every session, or of the `name` session, dated
+    between `start` and `end` as NDJSON or CSV."""
+    if not_modified := await conditional.check(
+        db_session,
+        [session_name] if session_name else WarningSession,
+        None,
+        "export/warnings",
+        session_name=session_name.value if session_name else None,
+        date_range=date_range,
+        export_format=export_format.value,
+    ):
+        return not_modified
+    query = weather_warning_history_query(session_name, *date_range)
+    return export_response(
+        db_session, query, export_format, "warnings", conditional.headers
     )
 
 
@@ -146,11 +466,19 @@ async def get_weather_warnings_(
 async def get_weather_warning(
     db_session: AsyncSession = Depends(get_db_session),
     *,
+    conditional: ConditionalDep,
     warning_name: WarningSession,
     dt: DateDep,
 ) -> VmgdApiWeatherWarningResponse:
-    if not dt:
-        dt = now()
+    dt = date_bucket(dt)
+    params = dict(warning_name=warning_name.value, dt=dt)
+    cache_key = response_cache.key("warning", **params)
+    if cached := response_cache.get(cache_key, conditional):
+        return cached
+    if not_modified := await conditional.check(
+        db_session, [warning_name], dt, "warning", **params
+    ):
+        return not_modified
     ww = await get_latest_weather_warning(
         db_session,
         dt=dt,
@@ -160,17 +488,12 @@ async def get_weather_warning(
         raise HTTPException(
             status_code=404, detail="No weather warnings data available"
         )
-    data = responses.WeatherWarningResponseData(
-        date=ww.date,
-        name=ww.session._name,
-        body=ww.body,
-    )
-    return await render_vmgd_api_response(
-        data,
-        response_class=VmgdApiWeatherWarningResponse,
+    body = dump_vmgd_api_response(
+        serializers.weather_warning_data(ww),
         issued=ww.issued_at,
         fetched=ww.session.fetched_at,
     )
+    return response_cache.store(cache_key, body, conditional.validators)
 
 
 #
@@ -236,10 +559,9 @@ async def get_weather_warning(
 #         url=page._path,
 #         data=page.raw_data,
 #     )
-#     return await render_vmgd_api_response(
-#         db_session,
-#         request,
-#         data,
+#     body = dump_vmgd_api_response(
+#         data.dict(),
 #         issued=page.issued_at,
 #         fetched=page.session.fetched_at,
 #     )
+#     return json_response(body)
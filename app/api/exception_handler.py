@@ -5,7 +5,7 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.api import templates
 from app.api.main import app
-from app.database import async_session
+from app.database import async_read_session
 
 
 @app.exception_handler(StarletteHTTPException)
@@ -22,7 +22,7 @@ async def custom_http_exception_handler(
         )  # return JSON response for API requests
         and 400 <= exc.status_code < 600
     ):
-        async with async_session() as db_session:
+        async with async_read_session() as db_session:
             title = (
                 {
                     404: "Oops, nothing to see here",
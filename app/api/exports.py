@@ -0,0 +1,92 @@
+"""Stream the rows of a history query as NDJSON or CSV.
+Rows are fetched with a server side cursor and written a chunk of `EXPORT_CHUNK_SIZE`
+rows at a time, so an export holds one chunk in memory however many rows it has.
+"""
+
+import csv
+import enum
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Sequence
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, Select
+
+from app.api.serializers import VU_TZ
+from app.config import EXPORT_CHUNK_SIZE
+from app.database import AsyncSession
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _vu_values(row: Row) -> list[Any]:
+    return [
+        value.astimezone(VU_TZ) if isinstance(value, datetime) else value
+        for value in row
+    ]
+
+
+def _ndjson_chunk(columns: Sequence[str], rows: Sequence[Row]) -> bytes:
+    return b"".join(
+        orjson.dumps(
+            dict(zip(columns, _vu_values(row))), option=orjson.OPT_APPEND_NEWLINE
+        )
+        for row in rows
+    )
+
+
+def _csv_chunk(rows: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            [
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in row
+            ]
+        )
+    return buffer.getvalue().encode()
+
+
+async def stream_rows(
+    db_session: AsyncSession, query: Select, export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """Yield the rows of `query` as chunks of NDJSON lines or CSV with a header."""
+    result = await db_session.stream(
+        query.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    columns = list(result.keys())
+    if export_format == ExportFormat.CSV:
+        yield _csv_chunk([columns])
+    async for rows in result.partitions():
+        if export_format == ExportFormat.CSV:
+            yield _csv_chunk(list(map(_vu_values, rows)))
+        else:
+            yield _ndjson_chunk(columns, rows)
+
+
+def export_response(
+    db_session: AsyncSession,
+    query: Select,
+    export_format: ExportFormat,
+    name: str,
+    headers: dict[str, str] | None = None,
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(db_session, query, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format.value}"',
+            **(headers or {}),
+        },
+    )
@@ -0,0 +1,11 @@
+from fastapi import Depends
+
+from app.database import AsyncSession, get_db_session
+from app.generation import generation
+
+
+async def check_generation_dependency(
+    db_session: AsyncSession = Depends(get_db_session),
+) -> None:
+    """Flush the caches of this worker when the scraper committed new data."""
+    await generation.check(db_session)
@@ -3,17 +3,46 @@ from fastapi import Depends, HTTPException, Query
 
 from app import models
 from app.database import AsyncSession, get_db_session
-from app.locations import get_location_by_id, get_location_by_slug
+from app.locations import location_registry
 from app.utils.slugify import slugify
 
 
+async def get_coordinates_dependency(
+    lat: float = Query(None, ge=-90, le=90),
+    lon: float = Query(None, ge=-180, le=180),
+) -> tuple[float, float] | None:
+    if lat is None and lon is None:
+        return None
+    if lat is None or lon is None:
+        raise HTTPException(status_code=400, detail="Both lat and lon are required")
+    return lat, lon
+
+
+CoordinatesDep = Annotated[
+    tuple[float, float] | None, Depends(get_coordinates_dependency)
+]
+
+
 async def get_location_dependency(
     db_session: AsyncSession = Depends(get_db_session),
+    *,
+    coordinates: CoordinatesDep,
     location_id: int = Query(None, alias="locationId"),
+    max_distance: float = Query(None, alias="maxDistance", gt=0),
 ) -> models.Location:
+    """Resolve `locationId`, or else the location nearest to `lat`/`lon`."""
     if location_id is None:
-        return None
-    location = await get_location_by_id(db_session, location_id)
+        if coordinates is None:
+            return None
+        nearest = await location_registry.nearest(
+            db_session, *coordinates, max_distance=max_distance
+        )
+        if not nearest:
+            raise HTTPException(
+                status_code=404, detail="No location within this distance"
+            )
+        return nearest[0][0]
+    location = await location_registry.get_by_id(db_session, location_id)
     if not location:
         raise HTTPException(status_code=400, detail="No location with this ID")
     return location
@@ -22,12 +51,39 @@ async def get_location_dependency(
 LocationDep = Annotated[models.Location, Depends(get_location_dependency)]
 
 
+async def get_locations_dependency(
+    db_session: AsyncSession = Depends(get_db_session),
+    location_ids: str = Query("all", alias="locationIds"),
+) -> list[models.Location] | None:
+    """Resolve the comma separated `locationIds`, or None for `all` locations."""
+    if location_ids == "all":
+        return None
+    try:
+        ids = sorted({int(location_id) for location_id in location_ids.split(",")})
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="locationIds must be `all` or comma separated IDs"
+        )
+    locations = []
+    for location_id in ids:
+        location = await location_registry.get_by_id(db_session, location_id)
+        if not location:
+            raise HTTPException(status_code=400, detail="No location with this ID")
+        locations.append(location)
+    return locations
+
+
+LocationsDep = Annotated[
+    list[models.Location] | None, Depends(get_locations_dependency)
+]
+
+
 async def get_location_by_slug_dependency(
     db_session: AsyncSession = Depends(get_db_session),
     location_name: str = Query("Port Vila", alias="location"),
 ) -> models.Location:
     slug = slugify(location_name)
-    location = await get_location_by_slug(db_session, slug)
+    location = await location_registry.get_by_slug(db_session, slug)
     if not location:
         raise HTTPException(status_code=404, detail="No location with this name")
     return location
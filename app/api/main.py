@@ -156,7 +156,7 @@ async def get_healthcheck() -> JSONResponse:
 #     location: LocationSlugDep,
 # ) -> templates.TemplateResponse:
 #     if not location:
-#         location = await get_location_by_name(
+#         location = await location_registry.get_by_name(
 #             db_session, name="Port Vila"
 #         )  # default value
 #     forecasts = await get_latest_forecasts(db_session, location=location, dt=now())
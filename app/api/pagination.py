@@ -0,0 +1,37 @@
+"""Opaque continuation tokens of the keyset pagination over `(issued_at, id)`.
+A token is the key of the last row of a page, so the next page is a range search of
+the `(issued_at, id)` index that costs the same however deep the page is.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Annotated
+
+import orjson
+from fastapi import Depends, HTTPException, Query
+
+
+def encode_cursor(issued_at: datetime, id_: int) -> str:
+    token = orjson.dumps([issued_at.isoformat(), id_])
+    return base64.urlsafe_b64encode(token).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    token = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    issued_at, id_ = orjson.loads(token)
+    return datetime.fromisoformat(issued_at), int(id_)
+
+
+async def get_cursor_dependency(
+    cursor: str = Query(None),
+) -> tuple[datetime, int] | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+CursorDep = Annotated[tuple[datetime, int] | None, Depends(get_cursor_dependency)]
@@ -12,6 +12,13 @@ class LocationResponseData(BaseModel):
     name: str
     latitude: float
     longitude: float
+    distance: Optional[float] = None  # km from the requested coordinates
+
+
+class ExportFileResponseData(BaseModel):
+    path: str
+    size: int
+    modified: datetime
 
 
 class RawPageResponseData(BaseModel):
@@ -33,6 +40,46 @@ class ForecastResponseData(BaseModel):
     maxTemp: int
     minHumi: int
     maxHumi: int
+    windSpeed: Optional[float] = None
+    windDirection: Optional[float] = None
+    weatherCondition: Optional[int] = None
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        vu_tz = pytz.timezone("Pacific/Efate")
+        self.date = self.date.astimezone(vu_tz)
+
+
+class ForecastHistoryResponseData(ForecastResponseData):
+    id: int
+    session_id: int
+    issued_at: datetime
+
+
+class LocationForecastsResponseData(BaseModel):
+    location: int
+    forecasts: list[ForecastResponseData]
+
+
+class ForecastInterpolatedResponseData(BaseModel):
+    date: datetime
+    minTemp: float
+    maxTemp: float
+    minHumi: float
+    maxHumi: float
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        vu_tz = pytz.timezone("Pacific/Efate")
+        self.date = self.date.astimezone(vu_tz)
+
+
+class ForecastIntervalResponseData(BaseModel):
+    location: int
+    date: datetime
+    weatherCondition: Optional[int] = None
+    windDirection: Optional[float] = None
+    windSpeed: Optional[int] = None
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -58,6 +105,12 @@ class WeatherWarningResponseData(BaseModel):
         self.date = self.date.astimezone(vu_tz)
 
 
+class WeatherWarningHistoryResponseData(WeatherWarningResponseData):
+    id: int
+    session_id: int
+    issued_at: datetime
+
+
 class VmgdApiResponseMeta(BaseModel):
     issued: datetime
     fetched: datetime
@@ -68,10 +121,37 @@ class VmgdApiResponse(BaseModel):
     meta: VmgdApiResponseMeta
 
 
+class VmgdApiHistoryMeta(BaseModel):
+    next: Optional[str] = None  # `cursor` of the next page, None on the last page
+    attribution: str = Field(default=config.VMGD_ATTRIBUTION)
+
+
+class VmgdApiForecastHistoryResponse(BaseModel):
+    meta: VmgdApiHistoryMeta
+    data: list[ForecastHistoryResponseData]
+
+
+class VmgdApiWeatherWarningHistoryResponse(BaseModel):
+    meta: VmgdApiHistoryMeta
+    data: list[WeatherWarningHistoryResponseData]
+
+
 class VmgdApiForecastResponse(VmgdApiResponse):
     data: list[ForecastResponseData]
 
 
+class VmgdApiForecastBatchResponse(VmgdApiResponse):
+    data: list[LocationForecastsResponseData]
+
+
+class VmgdApiForecastInterpolatedResponse(VmgdApiResponse):
+    data: list[ForecastInterpolatedResponseData]
+
+
+class VmgdApiForecastIntervalResponse(VmgdApiResponse):
+    data: list[ForecastIntervalResponseData]
+
+
 class VmgdApiForecastMediaResponse(VmgdApiResponse):
     data: ForecastMediaResponseData
 
@@ -0,0 +1,139 @@
+"""Write trusted rows of our own database straight to the JSON of the API responses.
+The output matches the Pydantic models of `app.api.responses`, which still define the
+JSON schema and OpenAPI docs, without building and validating the models per row.
+"""
+
+from datetime import datetime
+from typing import Any, Iterable
+
+import orjson
+import pytz
+from fastapi.responses import Response
+
+from app import models
+from app.config import VMGD_ATTRIBUTION
+from app.scraper.schemas import MISSING_VALUE
+from app.scraper.scrapers import NO_CURRENT_WARNING
+
+VU_TZ = pytz.timezone("Pacific/Efate")
+
+
+def _vu(dt: datetime) -> datetime:
+    return dt.astimezone(VU_TZ)
+
+
+def _missing_as_none(value: Any, type_: type) -> Any:
+    return None if value == MISSING_VALUE else type_(value)
+
+
+def forecast_data(forecast: models.ForecastDaily) -> dict[str, Any]:
+    return {
+        "location": forecast.location_id,
+        "date": _vu(forecast.date),
+        "summary": forecast.summary,
+        "minTemp": forecast.minTemp,
+        "maxTemp": forecast.maxTemp,
+        "minHumi": forecast.minHumi,
+        "maxHumi": forecast.maxHumi,
+        "windSpeed": forecast.windSpeed,
+        "windDirection": forecast.windDirection,
+        "weatherCondition": forecast.weatherCondition,
+    }
+
+
+def forecast_history_data(forecast: models.ForecastDaily) -> dict[str, Any]:
+    return {
+        **forecast_data(forecast),
+        "id": forecast.id,
+        "session_id": forecast.session_id,
+        "issued_at": forecast.issued_at,
+    }
+
+
+def location_forecasts_data(
+    forecasts_by_location: dict[int, list[models.ForecastDaily]]
+) -> list[dict[str, Any]]:
+    return [
+        {"location": location_id, "forecasts": list(map(forecast_data, forecasts))}
+        for location_id, forecasts in forecasts_by_location.items()
+    ]
+
+
+def forecast_interpolated_data(interpolated: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "date": _vu(interpolated["date"]),
+        "minTemp": float(interpolated["minTemp"]),
+        "maxTemp": float(interpolated["maxTemp"]),
+        "minHumi": float(interpolated["minHumi"]),
+        "maxHumi": float(interpolated["maxHumi"]),
+    }
+
+
+def forecast_interval_data(
+    interval: models.ForecastInterval,
+) -> Iterable[dict[str, Any]]:
+    for date, cond, wd, ws in zip(
+        interval.times,
+        interval.weather_conditions,
+        interval.wind_directions,
+        interval.wind_speeds,
+    ):
+        yield {
+            "location": interval.location_id,
+            "date": _vu(date),
+            "weatherCondition": _missing_as_none(cond, int),
+            "windDirection": _missing_as_none(wd, float),
+            "windSpeed": _missing_as_none(ws, int),
+        }
+
+
+def forecast_media_data(
+    forecast_media: models.ForecastMedia, images: list[models.Image]
+) -> dict[str, Any]:
+    return {
+        "summary": forecast_media.summary,
+        "images": [image._server_filepath for image in images or []],
+    }
+
+
+def weather_warning_data(ww: models.WeatherWarning) -> dict[str, Any]:
+    return {
+        "date": _vu(ww.date),
+        "name": ww.session._name,
+        "body": NO_CURRENT_WARNING if ww.body is None else ww.body,
+    }
+
+
+def weather_warning_history_data(ww: models.WeatherWarning) -> dict[str, Any]:
+    return {
+        **weather_warning_data(ww),
+        "id": ww.id,
+        "session_id": ww.session_id,
+        "issued_at": ww.issued_at,
+    }
+
+
+def dump_history_page(data: list[dict[str, Any]], next_cursor: str | None) -> bytes:
+    """JSON of a page of the history responses, `VmgdApiHistoryMeta` and `data`."""
+    return orjson.dumps(
+        {"meta": {"next": next_cursor, "attribution": VMGD_ATTRIBUTION}, "data": data}
+    )
+
+
+def dump_vmgd_api_response(data: Any, *, issued: datetime, fetched: datetime) -> bytes:
+    """JSON of a `VmgdApiResponse` with `data` from the functions above."""
+    return orjson.dumps(
+        {
+            "meta": {
+                # remove microsecond for presentation purpose only
+                "issued": issued.replace(microsecond=0),
+                "fetched": fetched.replace(microsecond=0),
+                "attribution": VMGD_ATTRIBUTION,
+            },
+            "data": data,
+        }
+    )
+
+
+def json_response(body: bytes, headers: dict[str, str] | None = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
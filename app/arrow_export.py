@@ -0,0 +1,279 @@
+"""Export the forecast and warning history to partitioned Parquet or Arrow IPC files.
+
+Each table is written as a hive partitioned dataset, `forecasts/year=2024/month=6/
+location_id=1/` and `warnings/year=2024/month=6/name=warning_marine/`, readable by
+pyarrow, pandas, polars or DuckDB as one dataset. Exports are incremental: the
+completion time of the last exported session is kept in `_export.json` next to the
+datasets and every export appends new files with only the rows of sessions completed
+since, so existing files are never rewritten. A directory keeps the format of its first
+export.
+"""
+
+import enum
+import json
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterator
+
+import anyio
+import pyarrow as pa
+import pyarrow.dataset as ds
+from anyio.from_thread import BlockingPortal
+from loguru import logger
+from sqlalchemy import Select, func, select
+
+from app import models
+from app.config import EXPORT_CHUNK_SIZE
+from app.database import AsyncSession
+from app.scraper.sessions import ForecastSession, WarningSession
+from app.utils.datetime import as_vu
+
+WATERMARK_FILE = "_export.json"
+
+
+class ArrowFormat(str, enum.Enum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
+# file format of `pyarrow.dataset`
+DATASET_FORMATS = {ArrowFormat.PARQUET: "parquet", ArrowFormat.ARROW: "ipc"}
+
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+FORECAST_SCHEMA = pa.schema(
+    [
+        ("session_id", pa.int64()),
+        ("fetched_at", _TIMESTAMP),
+        ("issued_at", _TIMESTAMP),
+        ("location_id", pa.int32()),
+        ("location", pa.string()),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("date", _TIMESTAMP),
+        ("summary", pa.string()),
+        ("minTemp", pa.int16()),
+        ("maxTemp", pa.int16()),
+        ("minHumi", pa.int16()),
+        ("maxHumi", pa.int16()),
+        ("windSpeed", pa.float64()),
+        ("windDirection", pa.float64()),
+        ("weatherCondition", pa.int16()),
+        ("year", pa.int16()),
+        ("month", pa.int8()),
+    ]
+)
+
+WARNING_SCHEMA = pa.schema(
+    [
+        ("session_id", pa.int64()),
+        ("name", pa.string()),
+        ("fetched_at", _TIMESTAMP),
+        ("issued_at", _TIMESTAMP),
+        ("date", _TIMESTAMP),
+        ("body", pa.string()),
+        ("year", pa.int16()),
+        ("month", pa.int8()),
+    ]
+)
+
+
+def _forecasts_query(after: datetime | None, until: datetime) -> Select:
+    query = (
+        select(
+            models.ForecastDaily.session_id,
+            models.Session.started_at.label("fetched_at"),
+            models.ForecastDaily.issued_at,
+            models.ForecastDaily.location_id,
+            models.Location.name.label("location"),
+            models.Location.latitude,
+            models.Location.longitude,
+            models.ForecastDaily.date,
+            models.ForecastDaily.summary,
+            models.ForecastDaily.minTemp,
+            models.ForecastDaily.maxTemp,
+            models.ForecastDaily.minHumi,
+            models.ForecastDaily.maxHumi,
+            models.ForecastDaily.windSpeed,
+            models.ForecastDaily.windDirection,
+            models.ForecastDaily.weatherCondition,
+        )
+        .join(models.Session, models.ForecastDaily.session_id == models.Session.id)
+        .join(models.Location, models.ForecastDaily.location_id == models.Location.id)
+        .where(models.Session._name == ForecastSession.FORECAST_GENERAL.value)
+    )
+    return _new_sessions(query, after, until).order_by(models.ForecastDaily.id)
+
+
+def _warnings_query(after: datetime | None, until: datetime) -> Select:
+    query = (
+        select(
+            models.WeatherWarning.session_id,
+            models.Session._name.label("name"),
+            models.Session.started_at.label("fetched_at"),
+            models.WeatherWarning.issued_at,
+            models.WeatherWarning.date,
+            models.WeatherWarning.body,
+        )
+        .join(models.Session, models.WeatherWarning.session_id == models.Session.id)
+        .where(models.Session._name.in_([s.value for s in WarningSession]))
+    )
+    return _new_sessions(query, after, until).order_by(models.WeatherWarning.id)
+
+
+def _new_sessions(query: Select, after: datetime | None, until: datetime) -> Select:
+    # the rows of a failed session are rolled back with it so every session with rows
+    # completed, including those completed before sessions had a status
+    query = query.where(models.Session.completed_at <= until)
+    if after is not None:
+        query = query.where(models.Session.completed_at > after)
+    return query
+
+
+# the partitions of each table, `year` and `month` are those of the date in VU time
+TABLES = {
+    "forecasts": (_forecasts_query, FORECAST_SCHEMA, ["year", "month", "location_id"]),
+    "warnings": (_warnings_query, WARNING_SCHEMA, ["year", "month", "name"]),
+}
+
+
+def read_watermarks(directory: Path, export_format: ArrowFormat) -> dict[str, datetime]:
+    """Completion time of the last session exported to each dataset of `directory`."""
+    try:
+        state = json.loads((directory / WATERMARK_FILE).read_text())
+    except FileNotFoundError:
+        return {}
+    if state["format"] != export_format.value:
+        raise ValueError(f"{directory} holds an export in {state['format']} format")
+    return {
+        table: datetime.fromisoformat(dt) for table, dt in state["watermarks"].items()
+    }
+
+
+def _write_watermarks(
+    directory: Path, export_format: ArrowFormat, watermarks: dict[str, datetime]
+) -> None:
+    path = directory / WATERMARK_FILE
+    tmp_path = path.with_suffix(".tmp")
+    state = dict(
+        format=export_format.value,
+        watermarks={table: dt.isoformat() for table, dt in watermarks.items()},
+    )
+    tmp_path.write_text(json.dumps(state))
+    # the watermarks move only once the files are written
+    tmp_path.replace(path)
+
+
+def _record_batch(rows: list[Any], schema: pa.Schema) -> pa.RecordBatch:
+    columns = {name: [] for name in schema.names}
+    for row in rows:
+        for name, value in row._mapping.items():
+            columns[name].append(value)
+        date = as_vu(row.date)
+        columns["year"].append(date.year)
+        columns["month"].append(date.month)
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+async def export_table(
+    db_session: AsyncSession,
+    table: str,
+    directory: Path,
+    export_format: ArrowFormat,
+    after: datetime | None,
+    until: datetime,
+) -> int:
+    """Append the rows of `table` of the sessions completed after `after` and up to
+    `until` to its dataset in `directory`, and return the number of rows."""
+    make_query, schema, partitions = TABLES[table]
+    result = await db_session.stream(
+        make_query(after, until).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    chunks = result.partitions()
+
+    async def next_chunk() -> list[Any] | None:
+        return await anext(chunks, None)
+
+    rows = await next_chunk()
+    if rows is None:
+        return 0
+    n_rows = 0
+
+    def batches(portal: BlockingPortal) -> Iterator[pa.RecordBatch]:
+        # pulled by the threads of the dataset writer; each chunk is read on the event
+        # loop only once the writer wants it so one chunk at a time is in memory
+        nonlocal rows, n_rows
+        while rows is not None:
+            n_rows += len(rows)
+            yield _record_batch(rows, schema)
+            rows = portal.call(next_chunk)
+
+    # files are named after the export so a later export never overwrites them
+    run = until.strftime("%Y%m%dT%H%M%S%f")
+    async with BlockingPortal() as portal:
+        await anyio.to_thread.run_sync(
+            partial(
+                ds.write_dataset,
+                pa.RecordBatchReader.from_batches(schema, batches(portal)),
+                directory / table,
+                format=DATASET_FORMATS[export_format],
+                partitioning=ds.partitioning(
+                    pa.schema([schema.field(name) for name in partitions]),
+                    flavor="hive",
+                ),
+                basename_template=f"part-{run}-{{i}}.{export_format.value}",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        )
+    return n_rows
+
+
+async def export_history(
+    db_session: AsyncSession, directory: Path, export_format: ArrowFormat
+) -> dict[str, int]:
+    """Export the sessions completed since the last export of each table to
+    `directory` and return the number of rows exported per table."""
+    directory.mkdir(parents=True, exist_ok=True)
+    watermarks = read_watermarks(directory, export_format)
+    # sessions completing while the rows are read wait for the next export
+    until = await db_session.scalar(select(func.max(models.Session.completed_at)))
+    if until is None:
+        return {table: 0 for table in TABLES}
+
+    exported = {}
+    for table in TABLES:
+        after = watermarks.get(table)
+        if after is not None and after >= until:
+            exported[table] = 0
+            continue
+        exported[table] = await export_table(
+            db_session, table, directory, export_format, after, until
+        )
+        # saved per table so a failure of a later table does not export it again
+        watermarks[table] = until
+        _write_watermarks(directory, export_format, watermarks)
+        logger.info(f"Exported {exported[table]} rows of {table} to {directory}")
+    return exported
+
+
+def _is_export_file(path: Path) -> bool:
+    suffixes = {f".{export_format.value}" for export_format in ArrowFormat}
+    return path.name.startswith("part-") and path.suffix in suffixes and path.is_file()
+
+
+def list_export_files(directory: Path) -> list[Path]:
+    """Paths of the exported files in `directory`, relative to it."""
+    return sorted(
+        path.relative_to(directory)
+        for path in directory.rglob("part-*")
+        if _is_export_file(path)
+    )
+
+
+def get_export_file(directory: Path, path: str) -> Path | None:
+    """Resolve the exported file at `path` relative to `directory`, never outside it."""
+    file = (directory / path).resolve()
+    if not file.is_relative_to(directory.resolve()) or not _is_export_file(file):
+        return None
+    return file
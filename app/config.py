@@ -44,15 +44,34 @@ class Config(BaseModel):
     https: bool = False
     debug: bool = True
     sqlalchemy_database: str | None = None
+    sqlite_synchronous: str = "NORMAL"  # durable enough with WAL
+    sqlite_mmap_size: int = 268435456  # 256MiB
+    sqlite_cache_size: int = -65536  # negative values are KiB so 64MiB
+    sqlite_api_read_only: bool = True  # API connects with `mode=ro`
+    sqlite_immutable: bool = False  # only for a read-only snapshot that never changes
 
     use_page_cache: bool = False
+    generation_check_interval_ms: int = 500  # how stale API caches may be
+    response_cache_size: int = 1024
+    export_chunk_size: int = 1000  # rows fetched and written per chunk of an export
 
     vmgd_timeout: int = 15
+    vmgd_http2: bool = True
+    vmgd_max_connections: int = 10
+    vmgd_max_keepalive_connections: int = 5
+    vmgd_keepalive_expiry: float = 30.0
+    vmgd_max_requests_in_flight: int = 4
+    vmgd_requests_per_second: float = 2.0
+
+    scraper_executor: str = "process"  # one of "process", "thread" or "inline"
+    scraper_pool_size: int = 2
+    scraper_html_parser: str = "html.parser"  # or "lxml"
     vmgd_base_url: str = "https://www.vmgd.gov.vu/vmgd/index.php"
     vmgd_attribution: str = (
         "The data provided was collected on the `fetched` date provided from the Vanuatu Meteorology & Geo-Hazards Department website at https://vmgd.gov.vu/. This service should not be used by anyone for anything; always get up-to-date and accurate data from the VMGD website directly."
     )
     vmgd_image_path: str | None = None
+    export_path: str | None = None
 
 
 def load_config() -> Config:
@@ -75,14 +94,34 @@ BASE_URL = f"{_SCHEME}://{DOMAIN}"
 DEBUG = CONFIG.debug
 DB_PATH = CONFIG.sqlalchemy_database or ROOT_DIR / "data" / "db.sqlite"
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
+SQLITE_SYNCHRONOUS = CONFIG.sqlite_synchronous
+SQLITE_MMAP_SIZE = CONFIG.sqlite_mmap_size
+SQLITE_CACHE_SIZE = CONFIG.sqlite_cache_size
+SQLITE_API_READ_ONLY = CONFIG.sqlite_api_read_only
+SQLITE_IMMUTABLE = CONFIG.sqlite_immutable
 
 USE_PAGE_CACHE = CONFIG.use_page_cache
+GENERATION_CHECK_INTERVAL_MS = CONFIG.generation_check_interval_ms
+RESPONSE_CACHE_SIZE = CONFIG.response_cache_size
+EXPORT_CHUNK_SIZE = CONFIG.export_chunk_size
 
 VMGD_TIMEOUT = CONFIG.vmgd_timeout
+VMGD_HTTP2 = CONFIG.vmgd_http2
+VMGD_MAX_CONNECTIONS = CONFIG.vmgd_max_connections
+VMGD_MAX_KEEPALIVE_CONNECTIONS = CONFIG.vmgd_max_keepalive_connections
+VMGD_KEEPALIVE_EXPIRY = CONFIG.vmgd_keepalive_expiry
+VMGD_MAX_REQUESTS_IN_FLIGHT = CONFIG.vmgd_max_requests_in_flight
+VMGD_REQUESTS_PER_SECOND = CONFIG.vmgd_requests_per_second
+
+SCRAPER_EXECUTOR = CONFIG.scraper_executor
+SCRAPER_POOL_SIZE = CONFIG.scraper_pool_size
+SCRAPER_HTML_PARSER = CONFIG.scraper_html_parser
 VMGD_BASE_URL = CONFIG.vmgd_base_url
 VMGD_ATTRIBUTION = CONFIG.vmgd_attribution
 VMGD_IMAGE_PATH = CONFIG.vmgd_image_path or ROOT_DIR / "data" / "vmgd" / "images"
 
+EXPORT_PATH = Path(CONFIG.export_path or ROOT_DIR / "data" / "export")
+
 # bootstrap images directory
 if not Path(VMGD_IMAGE_PATH).exists():
     Path(VMGD_IMAGE_PATH).mkdir(parents=True)
@@ -2,7 +2,10 @@ from typing import Any
 from typing import AsyncGenerator
 
 from sqlalchemy import MetaData
+from sqlalchemy import event
+from sqlalchemy import insert
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
@@ -11,25 +14,97 @@ from sqlalchemy.orm import sessionmaker
 from app.config import DB_PATH
 from app.config import DEBUG
 from app.config import SQLALCHEMY_DATABASE_URL
+from app.config import SQLITE_API_READ_ONLY
+from app.config import SQLITE_CACHE_SIZE
+from app.config import SQLITE_IMMUTABLE
+from app.config import SQLITE_MMAP_SIZE
+from app.config import SQLITE_SYNCHRONOUS
+
+
+def set_sqlite_pragmas(engine: Engine, read_only: bool = False) -> None:
+    """Tune every new connection of `engine`.
+    WAL lets the API read while the scraper writes; it is persistent so only writable
+    connections set it.
+    """
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(SQLITE_CACHE_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def begin_immediate(engine: Engine) -> None:
+    """Start transactions of `engine` with `BEGIN IMMEDIATE`.
+    The write lock is then taken when the transaction starts, waiting on the busy
+    timeout, instead of failing with `SQLITE_BUSY` when a read upgrades to a write
+    after another connection wrote.
+    """
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        # stop the driver from issuing its own BEGIN
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def on_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False, "timeout": 15}
 )
+set_sqlite_pragmas(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# the writer used by the scraper
 DATABASE_URL = f"sqlite+aiosqlite:///{DB_PATH}"
 async_engine = create_async_engine(
     DATABASE_URL, future=True, echo=DEBUG, connect_args={"timeout": 15}
 )
+set_sqlite_pragmas(async_engine.sync_engine)
+begin_immediate(async_engine.sync_engine)
 async_session = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
+# the reader used by the API
+if SQLITE_API_READ_ONLY:
+    READ_DATABASE_URL = f"sqlite+aiosqlite:///file:{DB_PATH}?mode=ro&uri=true"
+    if SQLITE_IMMUTABLE:
+        READ_DATABASE_URL = READ_DATABASE_URL.replace("?", "?immutable=1&", 1)
+    async_read_engine = create_async_engine(
+        READ_DATABASE_URL, future=True, echo=DEBUG, connect_args={"timeout": 15}
+    )
+    set_sqlite_pragmas(async_read_engine.sync_engine, read_only=True)
+    async_read_session = sessionmaker(
+        async_read_engine, class_=AsyncSession, expire_on_commit=False
+    )
+else:
+    async_read_engine = async_engine
+    async_read_session = async_session
+
 Base: Any = declarative_base()
 metadata_obj = MetaData()
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session() as session:
+    async with async_read_session() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+async def bulk_insert(
+    db_session: AsyncSession, model: type[Base], rows: list[dict[str, Any]]
+) -> None:
+    """Insert `rows` of `model` with a single executemany.
+    Rows are keyed by attribute name. Unlike `db_session.add()` no objects are created or
+    tracked by the unit of work, so the rows are not loaded into `db_session`.
+    """
+    if rows:
+        await db_session.execute(insert(model), rows)
@@ -1,6 +1,6 @@
 """Actions related to the forecast media."""
 
-from datetime import datetime, timedelta
+from datetime import datetime
 from sqlalchemy import select
 
 from loguru import logger
@@ -9,41 +9,17 @@ from app import models
 from app.database import AsyncSession
 from app.scraper.sessions import ForecastSession
 
-from app.scraper_sessions import get_latest_scraper_session
-
-
-async def _get_latest_forecast_media_session_subquery(dt: datetime):
-    """Get latest forecast media session for the date given."""
-    end = dt
-    start = end - timedelta(days=1)
-    subquery = (
-        select(models.Session.id)
-        .join(models.Session.media)
-        .filter(models.Session.completed_at is not None)
-        .filter(
-            models.ForecastMedia.issued_at >= start,
-            models.ForecastMedia.issued_at < end,
-        )
-        .order_by(models.Session.completed_at.desc())
-        .limit(1)
-        .scalar_subquery()
-    )
-    return subquery
+from app.scraper_sessions import latest_session_id
 
 
 async def get_latest_forecast_media(
     db_session: AsyncSession,
     dt: datetime | None = None,
-) -> models.Page | None:
-    query = select(models.ForecastMedia)
-    if dt:
-        subq = await _get_latest_forecast_media_session_subquery(dt)
-        query = query.where(models.ForecastMedia.session_id == subq)
-    else:
-        session = await get_latest_scraper_session(
-            db_session, session_name=ForecastSession.FORECAST_MEDIA
-        )
-        query = query.where(models.ForecastMedia.session_id == session.id)
+) -> models.ForecastMedia | None:
+    query = select(models.ForecastMedia).where(
+        models.ForecastMedia.session_id
+        == latest_session_id(ForecastSession.FORECAST_MEDIA, dt)
+    )
     forecast_media = (await db_session.execute(query)).scalar()
     return forecast_media
 
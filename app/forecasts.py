@@ -1,58 +1,196 @@
 """Actions related to the forecasts."""
 
 from datetime import datetime, timedelta
-from sqlalchemy import select
+from itertools import groupby
+from operator import attrgetter
+
+import numpy as np
+from sqlalchemy import Select, select, tuple_
 
 from loguru import logger
 
 from app import models
 from app.database import AsyncSession
+from app.locations import LocationIndex
 from app.scraper.sessions import ForecastSession
-from app.scraper_sessions import get_latest_scraper_session
-
-
-async def _get_latest_forecast_session_subquery(
-    location: models.Location,
-    dt: datetime,
-):
-    """Get latest forecast media session for the date given."""
-    end = dt
-    start = end - timedelta(days=1)
-    subquery = (
-        select(models.Session.id)
-        .join(models.Session.forecasts)
-        .filter(models.Session.completed_at is not None)
-        .filter(models.ForecastDaily.date >= start, models.ForecastDaily.date < end)
-    )
-    if location:
-        subquery = subquery.filter(models.ForecastDaily.location_id == location.id)
-    return (
-        subquery.order_by(models.Session.completed_at.desc()).limit(1).scalar_subquery()
-    )
+from app.scraper_sessions import latest_session_id
 
 
 async def get_latest_forecasts(
     db_session: AsyncSession,
     location: models.Location,
     dt: datetime | None = None,
-) -> models.Page | None:
-    query = select(models.ForecastDaily)
+) -> list[models.ForecastDaily]:
+    query = select(models.ForecastDaily).where(
+        models.ForecastDaily.session_id
+        == latest_session_id(ForecastSession.FORECAST_GENERAL, dt)
+    )
     if location:
         query = query.where(models.ForecastDaily.location_id == location.id)
     if dt:
-        subq = await _get_latest_forecast_session_subquery(location, dt)
         threshold = dt - timedelta(days=1)
         query = (
-            query.where(models.ForecastDaily.session_id == subq)
-            .where(models.ForecastDaily.date > threshold)
+            query.where(models.ForecastDaily.date > threshold)
             .where(models.ForecastDaily.date <= dt)
             .order_by(models.ForecastDaily.date.desc())
             .limit(1)
         )
-    else:
-        session = await get_latest_scraper_session(
-            db_session, session_name=ForecastSession.FORECAST_GENERAL
+    forecasts = (await db_session.execute(query)).scalars().all()
+    return forecasts
+
+
+async def get_latest_forecasts_by_location(
+    db_session: AsyncSession,
+    locations: list[models.Location] | None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict[int, list[models.ForecastDaily]]:
+    """Return the daily forecasts of the latest session as of `start` keyed by
+    location id, in one query. As with `get_latest_forecasts` the forecast in effect
+    at `start` is the first, up to the last forecast in effect at `end`.
+    """
+    query = select(models.ForecastDaily).where(
+        models.ForecastDaily.session_id
+        == latest_session_id(ForecastSession.FORECAST_GENERAL, start)
+    )
+    if locations is not None:
+        query = query.where(
+            models.ForecastDaily.location_id.in_([l.id for l in locations])
         )
-        query = query.where(models.ForecastDaily.session_id == session.id)
+    if start:
+        query = query.where(models.ForecastDaily.date > start - timedelta(days=1))
+    if end:
+        query = query.where(models.ForecastDaily.date <= end)
+    query = query.order_by(models.ForecastDaily.location_id, models.ForecastDaily.date)
+    forecasts = (await db_session.execute(query)).scalars().all()
+    return {
+        location_id: list(location_forecasts)
+        for location_id, location_forecasts in groupby(
+            forecasts, key=attrgetter("location_id")
+        )
+    }
+
+
+def forecast_history_query(
+    locations: list[models.Location] | None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> Select:
+    """Query the daily forecasts of every session between `start` and `end` as plain
+    rows, in the order of the (date, location_id) index so nothing is sorted."""
+    query = select(
+        models.ForecastDaily.session_id,
+        models.ForecastDaily.issued_at,
+        models.ForecastDaily.location_id.label("location"),
+        models.ForecastDaily.date,
+        models.ForecastDaily.summary,
+        models.ForecastDaily.minTemp,
+        models.ForecastDaily.maxTemp,
+        models.ForecastDaily.minHumi,
+        models.ForecastDaily.maxHumi,
+        models.ForecastDaily.windSpeed,
+        models.ForecastDaily.windDirection,
+        models.ForecastDaily.weatherCondition,
+    )
+    if locations is not None:
+        query = query.where(
+            models.ForecastDaily.location_id.in_([l.id for l in locations])
+        )
+    if start:
+        query = query.where(models.ForecastDaily.date >= start)
+    if end:
+        query = query.where(models.ForecastDaily.date <= end)
+    return query.order_by(
+        models.ForecastDaily.date,
+        models.ForecastDaily.location_id,
+        models.ForecastDaily.id,
+    )
+
+
+async def get_forecast_history(
+    db_session: AsyncSession,
+    location: models.Location | None,
+    after: tuple[datetime, int] | None,
+    limit: int,
+) -> list[models.ForecastDaily]:
+    """Return up to `limit` daily forecasts of completed sessions in `(issued_at, id)`
+    order after the key `after`. The key is a range search of the `(issued_at, id)`
+    index, unlike an offset the rows before it are never read."""
+    # a correlated EXISTS, not a join, so the planner cannot start from the session
+    # table and sort the rows of every session
+    completed = (
+        select(models.Session.id)
+        .where(
+            models.Session.id == models.ForecastDaily.session_id,
+            models.Session.completed_at.is_not(None),
+        )
+        .exists()
+    )
+    query = select(models.ForecastDaily).where(completed)
+    if location:
+        query = query.where(models.ForecastDaily.location_id == location.id)
+    if after:
+        query = query.where(
+            tuple_(models.ForecastDaily.issued_at, models.ForecastDaily.id) > after
+        )
+    query = query.order_by(
+        models.ForecastDaily.issued_at, models.ForecastDaily.id
+    ).limit(limit)
     forecasts = (await db_session.execute(query)).scalars().all()
     return forecasts
+
+
+async def get_latest_forecast_intervals(
+    db_session: AsyncSession,
+    location: models.Location,
+    dt: datetime | None = None,
+) -> list[models.ForecastInterval]:
+    """Return the 6 hourly forecasts of the latest session as of `dt`."""
+    query = select(models.ForecastInterval).where(
+        models.ForecastInterval.session_id
+        == latest_session_id(ForecastSession.FORECAST_GENERAL, dt)
+    )
+    if location:
+        query = query.where(models.ForecastInterval.location_id == location.id)
+    query = query.order_by(models.ForecastInterval.location_id)
+    intervals = (await db_session.execute(query)).scalars().all()
+    return intervals
+
+
+INTERPOLATED_FIELDS = ("minTemp", "maxTemp", "minHumi", "maxHumi")
+
+
+def interpolate_forecasts(
+    forecasts: list[models.ForecastDaily],
+    index: LocationIndex,
+    latitude: float,
+    longitude: float,
+) -> list[dict]:
+    """Interpolate the daily forecasts of the locations to the point by inverse distance
+    weighting. Each location missing a forecast for a date gives its weight to the others;
+    dates no nearby location has a forecast for are left out.
+    """
+    weights = index.idw_weights(latitude, longitude)
+    dates = sorted({forecast.date for forecast in forecasts})
+    date_rows = {date: row for row, date in enumerate(dates)}
+
+    # values[field, date, location]
+    values = np.full((len(INTERPOLATED_FIELDS), len(dates), len(index)), np.nan)
+    for forecast in forecasts:
+        position = index.position(forecast.location_id)
+        if position is not None:
+            values[:, date_rows[forecast.date], position] = [
+                getattr(forecast, field) for field in INTERPOLATED_FIELDS
+            ]
+    available_weights = np.where(np.isnan(values), 0.0, weights)
+    with np.errstate(invalid="ignore"):
+        interpolated = np.nansum(values * available_weights, axis=2) / np.sum(
+            available_weights, axis=2
+        )
+    interpolated = np.round(interpolated, 1)
+
+    return [
+        dict(date=date, **dict(zip(INTERPOLATED_FIELDS, interpolated[:, row].tolist())))
+        for row, date in enumerate(dates)
+        if not np.isnan(interpolated[:, row]).any()
+    ]
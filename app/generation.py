@@ -0,0 +1,68 @@
+"""Cross-process invalidation of the caches of the API workers."""
+
+import time
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from app import models
+from app.config import GENERATION_CHECK_INTERVAL_MS
+from app.database import AsyncSession
+
+GENERATION_ID = 1
+
+
+class GenerationWatcher:
+    """Tell the caches of this process when another process committed new data.
+    The scraper bumps the `generation` row in the transaction that completes a session.
+    `check` reads it at most once every `check_interval` seconds and calls every
+    `on_change` callback when it moved, so the caches need no query of their own.
+    """
+
+    def __init__(self, check_interval: float) -> None:
+        self.check_interval = check_interval
+        self.value: int | None = None
+        self._checked_at: float | None = None
+        self._callbacks: list[Callable[[], None]] = []
+
+    def on_change(self, callback: Callable[[], None]) -> None:
+        self._callbacks.append(callback)
+
+    def reset(self) -> None:
+        """Forget the generation so the next check reads it and flushes the caches."""
+        self.value = None
+        self._checked_at = None
+
+    async def check(self, db_session: AsyncSession) -> int | None:
+        """Return the generation, reading it when the last read is too old."""
+        checked_at = time.monotonic()
+        if (
+            self._checked_at is not None
+            and checked_at - self._checked_at < self.check_interval
+        ):
+            return self.value
+        self._checked_at = checked_at
+        value = await db_session.scalar(
+            select(models.Generation.value).where(models.Generation.id == GENERATION_ID)
+        )
+        if value != self.value:
+            self.value = value
+            for callback in self._callbacks:
+                callback()
+        return value
+
+
+async def bump_generation(db_session: AsyncSession) -> None:
+    query = (
+        insert(models.Generation)
+        .values(id=GENERATION_ID, value=1)
+        .on_conflict_do_update(
+            index_elements=[models.Generation.id],
+            set_=dict(value=models.Generation.value + 1),
+        )
+    )
+    await db_session.execute(query)
+
+
+generation = GenerationWatcher(GENERATION_CHECK_INTERVAL_MS / 1000)
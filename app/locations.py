@@ -1,47 +1,228 @@
 """Actions related to the VMGD locations."""
 
-from sqlalchemy import func, select
+import time
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
 
 from app import models
 from app.database import AsyncSession
+from app.generation import generation
+from app.utils.datetime import now
+from app.utils.slugify import slugify
 
+EARTH_RADIUS_KM = 6371.0088
 
-async def get_all_locations(
-    db_session: AsyncSession,
-) -> list[models.Location]:
-    query = select(models.Location)
-    locations = (await db_session.execute(query)).scalars().all()
-    return locations
+# inverse distance weighting of the `IDW_NEIGHBOURS` nearest locations; the weights are
+# computed once for the centre of each query cell of `IDW_CELL_DEGREES` (about 1km)
+IDW_POWER = 2
+IDW_NEIGHBOURS = 4
+IDW_CELL_DEGREES = 0.01
+IDW_CACHE_SIZE = 4096
 
 
-async def get_location_by_id(
-    db_session: AsyncSession,
-    location_id: int,
-) -> models.Location | None:
-    query = select(models.Location).where(models.Location.id == location_id)
-    location = (await db_session.execute(query)).scalar()
-    return location
+class LocationIndex:
+    """Nearest location lookups by great-circle distance over every location at once.
+    The coordinates are kept in numpy arrays so a lookup is a single vectorized haversine.
+    """
 
+    def __init__(self, locations: list[models.Location]) -> None:
+        self._locations = list(locations)
+        self._latitudes = np.radians([l.latitude for l in self._locations])
+        self._longitudes = np.radians([l.longitude for l in self._locations])
+        self._cos_latitudes = np.cos(self._latitudes)
+        self._positions = {l.id: i for i, l in enumerate(self._locations)}
+        self._cell_weights = lru_cache(maxsize=IDW_CACHE_SIZE)(self._compute_weights)
 
-async def get_location_by_name(
-    db_session: AsyncSession,
-    name: str,
-) -> models.Location | None:
-    query = select(models.Location).where(
-        func.lower(models.Location.name) == func.lower(name)
-    )
-    location = (await db_session.execute(query.limit(1))).scalar()
-    return location
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def position(self, location_id: int) -> int | None:
+        """Return the position of the location in the arrays of the index."""
+        return self._positions.get(location_id)
+
+    def distances(self, latitude: float, longitude: float) -> np.ndarray:
+        """Return the distance in km from the point to every location."""
+        latitude, longitude = np.radians(latitude), np.radians(longitude)
+        a = (
+            np.sin((self._latitudes - latitude) / 2) ** 2
+            + np.cos(latitude)
+            * self._cos_latitudes
+            * np.sin((self._longitudes - longitude) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int | None = 1,
+        max_distance: float | None = None,
+    ) -> list[tuple[models.Location, float]]:
+        """Return up to `k` (or all when `None`) locations closest to the point, with
+        their distance in km, ordered nearest first. Locations further than
+        `max_distance` km are left out.
+        """
+        if not self._locations:
+            return []
+        distances = self.distances(latitude, longitude)
+        if k is not None and k < len(distances):
+            candidates = np.argpartition(distances, k - 1)[:k]
+        else:
+            candidates = np.arange(len(distances))
+        candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+        if max_distance is not None:
+            candidates = candidates[distances[candidates] <= max_distance]
+        return [(self._locations[i], float(distances[i])) for i in candidates]
+
+    def idw_weights(self, latitude: float, longitude: float) -> np.ndarray:
+        """Return the (unnormalized) inverse distance weight of every location for the point.
+        Points in the same query cell share the cached weights of the cell.
+        """
+        return self._cell_weights(
+            round(latitude / IDW_CELL_DEGREES), round(longitude / IDW_CELL_DEGREES)
+        )
+
+    def _compute_weights(self, cell_latitude: int, cell_longitude: int) -> np.ndarray:
+        distances = self.distances(
+            cell_latitude * IDW_CELL_DEGREES, cell_longitude * IDW_CELL_DEGREES
+        )
+        # a location at the centre of the cell takes (almost) all of the weight
+        weights = 1 / np.maximum(distances, 1e-6) ** IDW_POWER
+        if len(weights) > IDW_NEIGHBOURS:
+            weights[np.argpartition(distances, IDW_NEIGHBOURS)[IDW_NEIGHBOURS:]] = 0
+        weights.flags.writeable = False  # shared by every caller in the cell
+        return weights
+
+
+class LocationRegistry:
+    """Process-wide cache of every location keyed by id, lowercase name and slug.
+    It is loaded on first use and updated as locations are saved through it. Locations
+    inserted by another process are picked up by reloading on a lookup miss, at most
+    once every `miss_reload_interval` seconds. The `LocationIndex` for coordinate lookups
+    is rebuilt only after the locations change.
+    """
+
+    miss_reload_interval = 60.0
+
+    def __init__(self) -> None:
+        self._by_id: dict[int, models.Location] = {}
+        self._by_name: dict[str, models.Location] = {}
+        self._by_slug: dict[str, models.Location] = {}
+        self._loaded_at: float | None = None
+        self._index: LocationIndex | None = None
 
+    def add(self, location: models.Location) -> None:
+        self._by_id[location.id] = location
+        self._by_name[location.name.lower()] = location
+        self._by_slug[location.slug.lower()] = location
+        self._index = None
 
-async def get_location_by_slug(
+    def clear(self) -> None:
+        """Drop every location so the next lookup reloads them from the database."""
+        self._by_id, self._by_name, self._by_slug = {}, {}, {}
+        self._loaded_at = None
+        self._index = None
+
+    async def load(self, db_session: AsyncSession) -> None:
+        locations = (await db_session.execute(select(models.Location))).scalars().all()
+        self._by_id, self._by_name, self._by_slug = {}, {}, {}
+        self._index = None
+        for location in locations:
+            # detach so the locations can outlive `db_session`
+            db_session.expunge(location)
+            self.add(location)
+        self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, db_session: AsyncSession) -> None:
+        if self._loaded_at is None:
+            await self.load(db_session)
+
+    async def _get(
+        self, db_session: AsyncSession, index: str, key
+    ) -> models.Location | None:
+        await self.ensure_loaded(db_session)
+        location = getattr(self, index).get(key)
+        if (
+            location is None
+            and time.monotonic() - self._loaded_at >= self.miss_reload_interval
+        ):
+            await self.load(db_session)
+            location = getattr(self, index).get(key)
+        return location
+
+    async def all(self, db_session: AsyncSession) -> list[models.Location]:
+        await self.ensure_loaded(db_session)
+        return list(self._by_id.values())
+
+    async def nearest(
+        self,
+        db_session: AsyncSession,
+        latitude: float,
+        longitude: float,
+        k: int | None = 1,
+        max_distance: float | None = None,
+    ) -> list[tuple[models.Location, float]]:
+        """See `LocationIndex.nearest`."""
+        index = await self.index(db_session)
+        return index.nearest(latitude, longitude, k, max_distance)
+
+    async def index(self, db_session: AsyncSession) -> LocationIndex:
+        """Return the `LocationIndex` of the current locations."""
+        await self.ensure_loaded(db_session)
+        if self._index is None:
+            self._index = LocationIndex(list(self._by_id.values()))
+        return self._index
+
+    async def get_by_id(
+        self, db_session: AsyncSession, location_id: int
+    ) -> models.Location | None:
+        return await self._get(db_session, "_by_id", location_id)
+
+    async def get_by_name(
+        self, db_session: AsyncSession, name: str
+    ) -> models.Location | None:
+        return await self._get(db_session, "_by_name", name.lower())
+
+    async def get_by_slug(
+        self, db_session: AsyncSession, slug: str
+    ) -> models.Location | None:
+        return await self._get(db_session, "_by_slug", slug.lower())
+
+
+location_registry = LocationRegistry()
+# the scraper may have saved new locations
+generation.on_change(location_registry.clear)
+
+
+async def upsert_location(
     db_session: AsyncSession,
-    slug: str,
-) -> models.Location | None:
-    query = select(models.Location).where(
-        func.lower(models.Location.slug) == func.lower(slug)
+    name: str,
+    latitude: float,
+    longitude: float,
+) -> models.Location:
+    """Insert a location or return the existing location of the same name."""
+    timestamp = now()
+    query = (
+        insert(models.Location)
+        .values(
+            name=name,
+            slug=slugify(name),
+            latitude=latitude,
+            longitude=longitude,
+            created_at=timestamp,
+            updated_at=timestamp,
+        )
+        .on_conflict_do_update(
+            index_elements=[models.Location.name],
+            set_=dict(updated_at=timestamp),
+        )
+        .returning(models.Location)
     )
-    location = (await db_session.execute(query.limit(1))).scalar()
+    location = (await db_session.execute(query)).scalar_one()
+    db_session.expunge(location)
     return location
 
 
@@ -51,11 +232,15 @@ async def save_forecast_location(
     latitude: float,
     longitude: float,
 ) -> models.Location:
-    location_object = await get_location_by_name(db_session, name)
+    location_object = await location_registry.get_by_name(db_session, name)
     if location_object is None:
-        location_object = models.Location(name, latitude, longitude)
-        db_session.add(location_object)
-        # await db_session.commit()
-        await db_session.flush()
-        await db_session.refresh(location_object)
+        location_object = await upsert_location(db_session, name, latitude, longitude)
+        location_registry.add(location_object)
+        # the location is gone again if the transaction is rolled back
+        event.listen(
+            db_session.sync_session,
+            "after_rollback",
+            lambda _: location_registry.clear(),
+            once=True,
+        )
     return location_object
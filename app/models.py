@@ -1,9 +1,19 @@
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String
+import numpy as np
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+)
 from sqlalchemy.orm import relationship, synonym
 from app.config import ROOT_DIR, VMGD_IMAGE_PATH
 
@@ -18,11 +28,16 @@ if TYPE_CHECKING:
 
 class Session(Base):
     __tablename__ = "session"
+    __table_args__ = (
+        Index("ix_session_name_started_at", "name", "started_at"),
+        Index("ix_session_name_completed_at", "name", "completed_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     _name = Column("name", String, nullable=False)
     started_at = Column(UTCDateTime(), nullable=False, default=now)
     completed_at = Column(UTCDateTime())
+    status = Column(String)
     # error handling or record keeping in the session instead of a different table?
     # _errors = Column("errors", String)
     # count = Column(Integer)
@@ -38,6 +53,28 @@ class Session(Base):
     fetched_at = synonym("started_at")
 
 
+class LatestSession(Base):
+    """Latest completed session of each session name.
+    Written in the transaction that completes the session so the latest session is a
+    point lookup instead of sorting the `session` table.
+    """
+
+    __tablename__ = "latest_session"
+
+    name = Column(String, primary_key=True)
+    session_id = Column(Integer, ForeignKey("session.id"), nullable=False)
+    completed_at = Column(UTCDateTime(), nullable=False)
+
+
+class Generation(Base):
+    """Single row counter bumped by every transaction that completes a session."""
+
+    __tablename__ = "generation"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False)
+
+
 class Page(Base):
     __tablename__ = "page"
 
@@ -72,6 +109,22 @@ class Page(Base):
         self._raw_data = json.dumps(data)
 
 
+class PageState(Base):
+    """Validators of the last fetch of a page used to skip unchanged pages."""
+
+    __tablename__ = "page_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    updated_at = Column(UTCDateTime(), nullable=False, default=now, onupdate=now)
+
+    url = Column(String, nullable=False, unique=True)
+    etag = Column(String)
+    last_modified = Column(String)
+    html_hash = Column(String, nullable=False)
+    page_id = Column(Integer, ForeignKey("page.id"), nullable=False)
+    page = relationship("Page", lazy="joined")
+
+
 class PageError(Base):
     __tablename__ = "page_error"
 
@@ -160,6 +213,17 @@ class Location(Base):
 
 class ForecastDaily(Base):
     __tablename__ = "forecast_daily"
+    __table_args__ = (
+        Index(
+            "ix_forecast_daily_session_id_location_id_date",
+            "session_id",
+            "location_id",
+            "date",
+        ),
+        Index("ix_forecast_daily_date_location_id", "date", "location_id"),
+        # keyset pagination of the history
+        Index("ix_forecast_daily_issued_at_id", "issued_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("session.id"), nullable=False)
@@ -175,13 +239,123 @@ class ForecastDaily(Base):
     maxTemp = Column(Integer, nullable=False)
     minHumi = Column(Integer, nullable=False)
     maxHumi = Column(Integer, nullable=False)
-    # below values are available in 6 hour increments so we would have to calculate a daily average for each
-    # windSpeed = Column(Integer, nullable=False)
-    # windDir = Column(Float, nullable=False)
+    # below values are aggregated from the 6 hourly values of `ForecastInterval`
+    windSpeed = Column(Float)  # mean
+    windDirection = Column(Float)  # circular mean
+    weatherCondition = Column(Integer)  # most frequent
+
+
+class ForecastInterval(Base):
+    """6 hourly forecast values of a location packed into arrays; one row per session.
+    Values the VMGD does not forecast keep their `MISSING_VALUE` of -999.
+    """
+
+    __tablename__ = "forecast_interval"
+
+    # little-endian dtypes the arrays are packed with
+    TIMES_DTYPE = np.dtype("<i8")  # seconds since the epoch
+    WEATHER_CONDITIONS_DTYPE = np.dtype("<i2")
+    WIND_DIRECTIONS_DTYPE = np.dtype("<f4")
+    WIND_SPEEDS_DTYPE = np.dtype("<i2")
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("session.id"), nullable=False, index=True)
+    session = relationship("Session", lazy="joined")
+
+    location_id = Column(Integer, ForeignKey("location.id"), nullable=False)
+    location = relationship("Location", lazy="joined")
+
+    issued_at = Column(UTCDateTime(), nullable=False, index=True)
+    _times = Column("times", LargeBinary, nullable=False)
+    _weather_conditions = Column("weather_conditions", LargeBinary, nullable=False)
+    _wind_directions = Column("wind_directions", LargeBinary, nullable=False)
+    _wind_speeds = Column("wind_speeds", LargeBinary, nullable=False)
+
+    def __init__(
+        self,
+        session_id: int,
+        location_id: int,
+        issued_at: datetime,
+        times: list[datetime],
+        weather_conditions: list[int],
+        wind_directions: list[float],
+        wind_speeds: list[int],
+    ):
+        for key, value in self.row_values(
+            session_id,
+            location_id,
+            issued_at,
+            times,
+            weather_conditions,
+            wind_directions,
+            wind_speeds,
+        ).items():
+            setattr(self, key, value)
+
+    @classmethod
+    def row_values(
+        cls,
+        session_id: int,
+        location_id: int,
+        issued_at: datetime,
+        times: list[datetime],
+        weather_conditions: list[int],
+        wind_directions: list[float],
+        wind_speeds: list[int],
+    ) -> dict[str, Any]:
+        """Values of a new row keyed by attribute as used by `bulk_insert`."""
+        assert (
+            len(times)
+            == len(weather_conditions)
+            == len(wind_directions)
+            == len(wind_speeds)
+        ), "Interval arrays differ in length"
+        return dict(
+            session_id=session_id,
+            location_id=location_id,
+            issued_at=issued_at,
+            _times=np.array(
+                [dt.timestamp() for dt in times], dtype=cls.TIMES_DTYPE
+            ).tobytes(),
+            _weather_conditions=np.array(
+                weather_conditions, dtype=cls.WEATHER_CONDITIONS_DTYPE
+            ).tobytes(),
+            _wind_directions=np.array(
+                wind_directions, dtype=cls.WIND_DIRECTIONS_DTYPE
+            ).tobytes(),
+            _wind_speeds=np.array(wind_speeds, dtype=cls.WIND_SPEEDS_DTYPE).tobytes(),
+        )
+
+    @property
+    def times(self) -> list[datetime]:
+        return [
+            datetime.fromtimestamp(ts, tz=timezone.utc)
+            for ts in np.frombuffer(self._times, dtype=self.TIMES_DTYPE).tolist()
+        ]
+
+    @property
+    def weather_conditions(self) -> list[int]:
+        return np.frombuffer(
+            self._weather_conditions, dtype=self.WEATHER_CONDITIONS_DTYPE
+        ).tolist()
+
+    @property
+    def wind_directions(self) -> list[float]:
+        return np.frombuffer(
+            self._wind_directions, dtype=self.WIND_DIRECTIONS_DTYPE
+        ).tolist()
+
+    @property
+    def wind_speeds(self) -> list[int]:
+        return np.frombuffer(self._wind_speeds, dtype=self.WIND_SPEEDS_DTYPE).tolist()
 
 
 class ForecastMedia(Base):
     __tablename__ = "forecast_media"
+    __table_args__ = (
+        Index("ix_forecast_media_session_id", "session_id"),
+        Index("ix_forecast_media_issued_at", "issued_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("session.id"), nullable=False)
@@ -202,12 +376,22 @@ class Image(Base):
     _server_filepath = Column("filepath", String, nullable=False, unique=True)
 
     def __init__(self, session_id: int, issued_at: datetime, filepath: Path) -> None:
-        self.session_id = session_id
-        self.issued_at = issued_at
+        for key, value in self.row_values(session_id, issued_at, filepath).items():
+            setattr(self, key, value)
+
+    @staticmethod
+    def row_values(
+        session_id: int, issued_at: datetime, filepath: Path
+    ) -> dict[str, Any]:
+        """Values of a new row keyed by attribute as used by `bulk_insert`."""
         assert filepath.relative_to(
             VMGD_IMAGE_PATH
         ), "Image filepath is not subdirectory of root VMGD images directory"
-        self._server_filepath = str(filepath.relative_to(VMGD_IMAGE_PATH))
+        return dict(
+            session_id=session_id,
+            issued_at=issued_at,
+            _server_filepath=str(filepath.relative_to(VMGD_IMAGE_PATH)),
+        )
 
     @property
     def filepath(self):
@@ -216,6 +400,11 @@ class Image(Base):
 
 class WeatherWarning(Base):
     __tablename__ = "warning"
+    __table_args__ = (
+        Index("ix_warning_session_id_date", "session_id", "date"),
+        # keyset pagination of the history
+        Index("ix_warning_issued_at_id", "issued_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("session.id"), nullable=False)
@@ -229,8 +418,18 @@ class WeatherWarning(Base):
     def __init__(
         self, session_id: int, issued_at: datetime, date: datetime, body: str = None
     ):
-        self.session_id = session_id
-        self.issued_at = issued_at
-        self.date = date
-        self.no_current_warning = body is None  # no body, no current warning; simple as
-        self.body = body
+        for key, value in self.row_values(session_id, issued_at, date, body).items():
+            setattr(self, key, value)
+
+    @staticmethod
+    def row_values(
+        session_id: int, issued_at: datetime, date: datetime, body: str = None
+    ) -> dict[str, Any]:
+        """Values of a new row keyed by attribute as used by `bulk_insert`."""
+        return dict(
+            session_id=session_id,
+            issued_at=issued_at,
+            date=date,
+            no_current_warning=body is None,  # no body, no current warning; simple as
+            body=body,
+        )
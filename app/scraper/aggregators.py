@@ -1,23 +1,27 @@
 """Functions that handle the messy work of aggregating and cleaning the results of scrapers."""
 
 import re
+from collections import defaultdict
+from collections.abc import Iterable
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
 
 from loguru import logger
+import numpy as np
 
-from app.database import AsyncSession
+from app.database import AsyncSession, bulk_insert
 from app.locations import save_forecast_location
 from app.models import (
     ForecastDaily,
+    ForecastInterval,
     ForecastMedia,
     Location,
     Page,
     Session,
     WeatherWarning,
 )
-from app.scraper.schemas import WeatherObject
+from app.scraper.schemas import MISSING_VALUE, WeatherObject
 from app.scraper.scrapers import NO_CURRENT_WARNING
 from app.utils.datetime import TZ_VU, as_utc, as_vu, as_vu_to_utc, now
 
@@ -31,17 +35,40 @@ class ForecastDailyCreate:
     maxTemp: int
     minHumi: int
     maxHumi: int
+    windSpeed: float | None
+    windDirection: float | None
+    weatherCondition: int | None
 
 
-async def handle_location(l: Location, wo: WeatherObject, d2):
+async def handle_location(
+    l: Location,
+    wo: WeatherObject,
+    d2,
+    wind_speeds: list[float | None],
+    wind_directions: list[float | None],
+    weather_conditions: list[int | None],
+):
     forecasts = []
-    for date, minTemp, maxTemp, minHumi, maxHumi, x in zip(
+    for (
+        date,
+        minTemp,
+        maxTemp,
+        minHumi,
+        maxHumi,
+        x,
+        windSpeed,
+        windDirection,
+        weatherCondition,
+    ) in zip(
         wo.dates,
         wo.minTemp,
         wo.maxTemp,
         wo.minHumi,
         wo.maxHumi,
         d2,
+        wind_speeds,
+        wind_directions,
+        weather_conditions,
     ):
         assert x["date"] == date, "d mismatch"
         forecast = ForecastDailyCreate(
@@ -52,6 +79,9 @@ async def handle_location(l: Location, wo: WeatherObject, d2):
             maxTemp=max(x["maxTemp"], maxTemp),
             minHumi=minHumi,
             maxHumi=maxHumi,
+            windSpeed=windSpeed,
+            windDirection=windDirection,
+            weatherCondition=weatherCondition,
         )
         forecasts.append(forecast)
     return forecasts
@@ -99,6 +129,126 @@ def convert_to_datetime(date_string: str, issued_at: datetime) -> datetime:
     return as_vu_to_utc(dt)
 
 
+def convert_dates_to_datetimes(
+    date_strings: Iterable[str],
+    issued_at: datetime,
+    memo: dict[tuple[str, datetime], datetime] | None = None,
+) -> list[datetime]:
+    """Convert a batch of date strings with `convert_to_datetime`.
+    Each distinct `(date_string, issued_at)` is only converted once; pass the same `memo`
+    to share the conversions between batches.
+    """
+    if memo is None:
+        memo = {}
+    datetimes = []
+    for date_string in date_strings:
+        key = (date_string, issued_at)
+        dt = memo.get(key)
+        if dt is None:
+            dt = memo[key] = convert_to_datetime(date_string, issued_at)
+        datetimes.append(dt)
+    return datetimes
+
+
+def convert_date_hours(
+    date_hours: list[str], dates: dict[str, datetime]
+) -> list[datetime]:
+    """Convert `dateHour` strings in local timezone such as `Wed 05 06:00` to datetimes in UTC.
+    The day of each string is looked up in `dates` which maps the date strings of the
+    forecast to their already converted and verified datetimes. A string whose day is
+    not one of `dates` is `None`.
+    """
+    datetimes = []
+    for date_hour in date_hours:
+        date_string, time_string = date_hour.rsplit(" ", 1)
+        if date_string not in dates:
+            logger.warning(f"Forecast interval {date_hour} is not on a forecast date")
+            datetimes.append(None)
+            continue
+        hour, minute = map(int, time_string.split(":"))
+        datetimes.append(dates[date_string] + timedelta(hours=hour, minutes=minute))
+    return datetimes
+
+
+def drop_unknown_intervals(wo: WeatherObject, times: list[datetime | None]) -> None:
+    """Set the `dateHour` of `wo` to `times` without the intervals whose time is `None`."""
+    keep = [i for i, dt in enumerate(times) if dt is not None]
+    if len(keep) < len(times):
+        wo.conds = [wo.conds[i] for i in keep]
+        wo.wd = [wo.wd[i] for i in keep]
+        wo.ws = [wo.ws[i] for i in keep]
+    wo.dateHour = [times[i] for i in keep]
+
+
+def _nan_as_none(values: np.ndarray, shape: tuple[int, int]) -> list[list]:
+    return np.where(np.isnan(values), None, values).reshape(shape).tolist()
+
+
+def aggregate_daily_intervals(
+    weather_objects: list[WeatherObject],
+) -> tuple[list[list[float | None]], list[list[float | None]], list[list[int | None]]]:
+    """Aggregate the 6 hourly values of every location into daily values in one numpy pass.
+    The `dates` and `dateHour` of the weather objects must already be datetimes.
+
+    Returns the mean wind speed, circular mean wind direction and most frequent weather
+    condition as `[location][date]` lists. A value is `None` when every 6 hourly value of
+    the date is missing and ties between weather conditions go to the lower condition.
+    """
+    n_locations = len(weather_objects)
+    n_days = len(weather_objects[0].dates)
+    n_bins = n_locations * n_days
+
+    # bin each 6 hourly value by its location and the date it falls on; locations may
+    # have a different number of values so the values of all locations are flattened
+    locations = np.repeat(
+        np.arange(n_locations), [len(wo.dateHour) for wo in weather_objects]
+    )
+    first_dates = np.array([wo.dates[0].timestamp() for wo in weather_objects])
+    times = np.array(
+        [dt.timestamp() for wo in weather_objects for dt in wo.dateHour],
+        dtype=np.float64,
+    )
+    days = ((times - first_dates[locations]) // 86400).astype(np.intp)
+    bins = locations * n_days + days
+
+    def flatten(field: str) -> list:
+        return [value for wo in weather_objects for value in getattr(wo, field)]
+
+    speeds = np.array(flatten("ws"), dtype=np.float64)
+    valid = speeds != MISSING_VALUE
+    counts = np.bincount(bins[valid], minlength=n_bins)
+    totals = np.bincount(bins[valid], weights=speeds[valid], minlength=n_bins)
+    with np.errstate(invalid="ignore"):
+        mean_speeds = totals / counts
+
+    directions = np.array(flatten("wd"), dtype=np.float64)
+    valid = directions != MISSING_VALUE
+    radians = np.radians(directions[valid])
+    sines = np.bincount(bins[valid], weights=np.sin(radians), minlength=n_bins)
+    cosines = np.bincount(bins[valid], weights=np.cos(radians), minlength=n_bins)
+    mean_directions = np.round(np.degrees(np.arctan2(sines, cosines)), 1) % 360
+    mean_directions[np.bincount(bins[valid], minlength=n_bins) == 0] = np.nan
+
+    conditions = np.array(flatten("conds"), dtype=np.intp)
+    valid = conditions != MISSING_VALUE
+    n_conditions = conditions[valid].max() + 1 if valid.any() else 1
+    condition_counts = np.bincount(
+        bins[valid] * n_conditions + conditions[valid],
+        minlength=n_bins * n_conditions,
+    ).reshape(n_bins, n_conditions)
+    dominant_conditions = condition_counts.argmax(axis=1)
+    dominant_conditions = np.where(
+        condition_counts.any(axis=1), dominant_conditions, None
+    )
+
+    shape = (n_locations, n_days)
+    return (
+        _nan_as_none(mean_speeds, shape),
+        _nan_as_none(mean_directions, shape),
+        dominant_conditions.reshape(shape).tolist(),
+    )
+
+
 def is_date_series_sequential(dates_list: list[datetime]):
     """Checks dates are sequentially ordered."""
     prev_date = dates_list[0]
@@ -116,13 +266,24 @@ def verify_date_series(dates_list: list[datetime]) -> list[datetime]:
     if is_date_series_sequential(dates_list):
         return dates_list
     logger.debug("Dates are not sequential - attempting to fix common ambiguity issue")
-    dl = list(dates_list)
-    for i in range(len(dates_list) - 1):
-        dl[i] = dl[i] - relativedelta(months=1)
-        if is_date_series_sequential(dl):
-            return dl
-    else:
-        raise RuntimeError("Can not fix non-sequential dates")
+    # Find the shortest prefix that is sequential once moved back a month and is
+    # followed by the sequential remainder of the series
+    n = len(dates_list)
+    day = timedelta(days=1)
+    sequential_from = [False] * n  # dates_list[i:] is sequential
+    sequential_from[-1] = True
+    for i in range(n - 2, -1, -1):
+        sequential_from[i] = (
+            sequential_from[i + 1] and dates_list[i] + day == dates_list[i + 1]
+        )
+    shifted = []
+    for i in range(n - 1):
+        shifted.append(dates_list[i] - relativedelta(months=1))
+        if i > 0 and shifted[i - 1] + day != shifted[i]:
+            break
+        if shifted[i] + day == dates_list[i + 1] and sequential_from[i + 1]:
+            return shifted + dates_list[i + 1 :]
+    raise RuntimeError("Can not fix non-sequential dates")
 
 
 async def aggregate_forecast_week(
@@ -130,8 +291,6 @@ async def aggregate_forecast_week(
 ):
     """Handles data which currently comprises of 7-day forecast and 3 day forecast.
     Together the two pages can form a coherent weekly forecast."""
-    location_cache = {}
-
     weather_objects = list(map(lambda obj: WeatherObject(*obj), pages[0].raw_data))
     data_2 = pages[1].raw_data
 
@@ -144,35 +303,77 @@ async def aggregate_forecast_week(
         map(lambda d: d["location"], data_2)
     )
 
-    # convert string dates to datetimes
+    # convert string dates to datetimes; locations mostly share the same dates so
+    # each distinct date string and series of date strings is only converted once
+    memo = {}
+    verified_series = {}
     for wo in weather_objects:
-        datetimes = list(map(lambda d: convert_to_datetime(d, issued_at), wo.dates))
-        datetimes = verify_date_series(datetimes)
+        date_strings = tuple(wo.dates)
+        if date_strings not in verified_series:
+            datetimes = convert_dates_to_datetimes(date_strings, issued_at, memo)
+            verified_series[date_strings] = verify_date_series(datetimes)
+        datetimes = list(verified_series[date_strings])
+        times = convert_date_hours(wo.dateHour, dict(zip(wo.dates, datetimes)))
+        # an interval off the forecast dates is dropped, not the whole forecast
+        drop_unknown_intervals(wo, times)
         wo.dates = datetimes
-    for d in data_2:
-        d["date"] = convert_to_datetime(d["date"], issued_at)
+    for d, dt in zip(
+        data_2,
+        convert_dates_to_datetimes((d["date"] for d in data_2), issued_at, memo),
+    ):
+        d["date"] = dt
         # TODO verify_date_series for each location in data_2
 
-    for wo in weather_objects:
-        if wo.location in location_cache:
-            location = location_cache[wo.location]
-        else:
-            location = await save_forecast_location(
-                db_session,
-                wo.location,
-                wo.latitude,
-                wo.longitude,
+    # index the 7-day forecasts by location once to join them in linear time
+    data_2_by_location = defaultdict(list)
+    for d in data_2:
+        data_2_by_location[d["location"].lower()].append(d)
+
+    wind_speeds, wind_directions, weather_conditions = aggregate_daily_intervals(
+        weather_objects
+    )
+
+    forecasts = []
+    intervals = []
+    for wo, wo_wind_speeds, wo_wind_directions, wo_weather_conditions in zip(
+        weather_objects, wind_speeds, wind_directions, weather_conditions
+    ):
+        location = await save_forecast_location(
+            db_session,
+            wo.location,
+            wo.latitude,
+            wo.longitude,
+        )
+        ldata2 = data_2_by_location.get(location.name.lower(), [])
+        location_forecasts = await handle_location(
+            location,
+            wo,
+            ldata2,
+            wo_wind_speeds,
+            wo_wind_directions,
+            wo_weather_conditions,
+        )
+        for forecast_create in location_forecasts:
+            forecasts.append(
+                dict(
+                    asdict(forecast_create),
+                    issued_at=issued_at,
+                    session_id=session.id,
+                )
+            )
+        intervals.append(
+            ForecastInterval.row_values(
+                session_id=session.id,
+                location_id=location.id,
+                issued_at=issued_at,
+                times=wo.dateHour,
+                weather_conditions=wo.conds,
+                wind_directions=wo.wd,
+                wind_speeds=wo.ws,
             )
-            location_cache[wo.location] = location
-        ldata2 = list(
-            filter(lambda x: x["location"].lower() == location.name.lower(), data_2)
         )
-        forecasts = await handle_location(location, wo, ldata2)
-        for forecast_create in forecasts:
-            forecast = ForecastDaily(**asdict(forecast_create))
-            forecast.issued_at = issued_at
-            forecast.session_id = session.id
-            db_session.add(forecast)
+    await bulk_insert(db_session, ForecastDaily, forecasts)
+    await bulk_insert(db_session, ForecastInterval, intervals)
 
 
 async def aggregate_forecast_media(
@@ -217,19 +418,21 @@ async def aggregate_weather_warnings(
     issued_at = pages[0].issued_at
     raw_data = pages[0].raw_data
     if raw_data == NO_CURRENT_WARNING:
-        new_warning = WeatherWarning(
-            session_id=session.id,
-            issued_at=issued_at,
-            date=now(),
-        )
-        db_session.add(new_warning)
+        warnings = [
+            WeatherWarning.row_values(
+                session_id=session.id,
+                issued_at=issued_at,
+                date=now(),
+            )
+        ]
     else:
-        for warning_object in raw_data:
-            date = convert_warning_at_to_datetime(warning_object["date"])
-            new_warning = WeatherWarning(
+        warnings = [
+            WeatherWarning.row_values(
                 session_id=session.id,
                 issued_at=issued_at,
-                date=date,
+                date=convert_warning_at_to_datetime(warning_object["date"]),
                 body=warning_object["body"],
             )
-            db_session.add(new_warning)
+            for warning_object in raw_data
+        ]
+    await bulk_insert(db_session, WeatherWarning, warnings)
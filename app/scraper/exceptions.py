@@ -45,6 +45,10 @@ class ScrapingError(Exception):
         self.raw_data = raw_data
         self.errors = errors
 
+    def __reduce__(self):
+        # scrapers may run in another process so errors must survive pickling
+        return self.__class__, (self.html, self.raw_data, self.errors)
+
 
 class ScrapingNotFoundError(ScrapingError):
     pass
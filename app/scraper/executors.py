@@ -0,0 +1,56 @@
+"""Executors that run the CPU bound scrapers off the event loop."""
+
+import asyncio
+import enum
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from app import config
+from app.scraper.scrapers import ScrapeResult
+
+
+class ScraperExecutor(str, enum.Enum):
+    PROCESS = "process"
+    THREAD = "thread"
+    INLINE = "inline"  # run on the event loop
+
+
+_executor: Executor | None = None
+
+
+def create_executor(
+    kind: ScraperExecutor | str, max_workers: int | None = None
+) -> Executor | None:
+    kind = ScraperExecutor(kind)
+    if kind is ScraperExecutor.PROCESS:
+        # spawn so workers do not inherit the event loop or database connections
+        return ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    elif kind is ScraperExecutor.THREAD:
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scraper")
+    return None
+
+
+def get_executor() -> Executor | None:
+    """Return the configured executor shared by the whole process, created on first use."""
+    global _executor
+    if _executor is None:
+        _executor = create_executor(config.SCRAPER_EXECUTOR, config.SCRAPER_POOL_SIZE)
+    return _executor
+
+
+async def run_scraper(
+    scraper: Callable[[str], ScrapeResult],
+    html: str,
+    executor: Executor | None = None,
+) -> ScrapeResult:
+    """Run `scraper` in `executor`, the configured executor by default.
+    With a process pool the scraper must be a module level function.
+    """
+    executor = executor or get_executor()
+    if executor is None:
+        return scraper(html)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, scraper, html)
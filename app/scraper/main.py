@@ -1,4 +1,5 @@
 import base64
+from dataclasses import dataclass
 from pathlib import Path
 import uuid
 import anyio
@@ -7,7 +8,8 @@ from loguru import logger
 
 from app import models
 from app.config import VMGD_IMAGE_PATH
-from app.database import AsyncSession, async_session
+from app.database import async_session, bulk_insert
+from app.scraper.executors import run_scraper
 from app.scraper.exceptions import (
     PageNotFoundError,
     PageUnavailableError,
@@ -16,10 +18,17 @@ from app.scraper.exceptions import (
     ScrapingNotFoundError,
     ScrapingValidationError,
 )
-from app.scraper.pages import PageMapping, handle_page_error
-from app.scraper.sessions import SessionMapping, session_mappings
-from app.scraper.utils import fetch_page
-from app.utils.datetime import now
+from app.scraper.pages import (
+    PageMapping,
+    PagePath,
+    get_page_states,
+    handle_page_error,
+    save_page_state,
+)
+from app.scraper.scrapers import ScrapeResult
+from app.scraper.sessions import SessionMapping, SessionStatus, session_mappings
+from app.scraper.utils import FetchResult, create_client, fetch_page
+from app.scraper_sessions import complete_session
 
 
 async def handle_processing_page_mapping_error(
@@ -38,28 +47,45 @@ async def handle_processing_page_mapping_error(
     raise exc
 
 
-async def process_page_mapping(db_session: AsyncSession, mapping: PageMapping):
-    error = None
+@dataclass
+class PageMappingResult:
+    fetched: FetchResult | None = None
+    scraped: ScrapeResult | None = None
+    error: tuple[PageErrorTypeEnum, Exception] | None = None
+
+    @property
+    def unchanged(self) -> bool:
+        return self.fetched is not None and self.fetched.unchanged
+
 
+async def scrape_page_mapping(
+    client: httpx.AsyncClient,
+    mapping: PageMapping,
+    page_state: models.PageState | None = None,
+) -> PageMappingResult:
+    """Fetch and process a single page without touching the database.
+    Processing is skipped when the page is unchanged since `page_state` was saved.
+    Returns the scraping result or the error to be recorded by the caller.
+    """
     # grab the HTML
     try:
-        html = await fetch_page(mapping)
+        fetched = await fetch_page(client, mapping, page_state)
     except httpx.TimeoutException as e:
-        error = (PageErrorTypeEnum.TIMEOUT, e)
+        return PageMappingResult(error=(PageErrorTypeEnum.TIMEOUT, e))
     except PageUnavailableError as e:
-        error = (PageErrorTypeEnum.UNAUHTORIZED, e)
-    except PageNotFoundError:
-        error = (PageErrorTypeEnum.NOT_FOUND, e)
+        return PageMappingResult(error=(PageErrorTypeEnum.UNAUHTORIZED, e))
+    except PageNotFoundError as e:
+        return PageMappingResult(error=(PageErrorTypeEnum.NOT_FOUND, e))
     except Exception as e:
         logger.exception("Unexpected error fetching page: %s" % str(e))
-        error = (PageErrorTypeEnum.INTERNAL_ERROR, e)
+        return PageMappingResult(error=(PageErrorTypeEnum.INTERNAL_ERROR, e))
 
-    if error:
-        await handle_processing_page_mapping_error(db_session, mapping, error)
+    if fetched.unchanged:
+        return PageMappingResult(fetched=fetched)
 
     # process the HTML
     try:
-        scraping_result = await mapping.process(html)
+        scraping_result = await run_scraper(mapping.process, fetched.html)
     except ScrapingNotFoundError as e:
         error = (PageErrorTypeEnum.DATA_NOT_FOUND, e)
     except ScrapingValidationError as e:
@@ -69,19 +95,39 @@ async def process_page_mapping(db_session: AsyncSession, mapping: PageMapping):
     except Exception as e:
         logger.exception("Unexpected error processing page: %s" % str(e))
         error = (PageErrorTypeEnum.INTERNAL_ERROR, e)
+    else:
+        return PageMappingResult(fetched=fetched, scraped=scraping_result)
+    return PageMappingResult(fetched=fetched, error=error)
+
+
+async def scrape_page_mappings(
+    client: httpx.AsyncClient,
+    mappings: list[PageMapping],
+    page_states: dict[PagePath, models.PageState] | None = None,
+) -> list[PageMappingResult]:
+    """Fetch and process pages concurrently.
+    Results keep the order of `mappings` as aggregators rely on the page order.
+    """
+    page_states = page_states or {}
+    results = [None] * len(mappings)
+
+    async def _scrape(idx: int, mapping: PageMapping) -> None:
+        logger.info(f"page url {mapping.url}")
+        results[idx] = await scrape_page_mapping(
+            client, mapping, page_states.get(mapping.path)
+        )
 
-    if error:
-        await handle_processing_page_mapping_error(db_session, mapping, error)
-
-    return scraping_result
+    async with anyio.create_task_group() as tg:
+        for idx, mapping in enumerate(mappings):
+            tg.start_soon(_scrape, idx, mapping)
+    return results
 
 
 # async def handle_processing_session_mapping_error ???
 
 
-async def process_page_image(page, elem) -> Path:
-    """Save contents of image element to local storage."""
-    src = elem["src"]
+async def process_page_image(page, src: str | None) -> Path:
+    """Save contents of image element `src` to local storage."""
     assert src is not None, "image element must have a src attribute"
 
     file_id = uuid.uuid4()
@@ -99,7 +145,9 @@ async def process_page_image(page, elem) -> Path:
     return filepath
 
 
-async def process_session_mapping(session_mapping: SessionMapping):
+async def process_session_mapping(
+    session_mapping: SessionMapping, client: httpx.AsyncClient
+):
     # TODO do I want to check if session completed recently then ignore due to rate limits?
 
     # create session
@@ -109,15 +157,37 @@ async def process_session_mapping(session_mapping: SessionMapping):
         await db_session.commit()
         await db_session.flush()
         await db_session.refresh(session)
+        page_states = await get_page_states(
+            db_session, [mapping.path for mapping in session_mapping.pages]
+        )
 
     # process page set -- do work
     try:
+        results = await scrape_page_mappings(client, session_mapping.pages, page_states)
         async with async_session() as db_session, db_session.begin():
+            for mapping, result in zip(session_mapping.pages, results):
+                if result.error:
+                    await handle_processing_page_mapping_error(
+                        db_session, mapping, result.error
+                    )
+
+            if all(result.unchanged for result in results):
+                # nothing new to save; the API keeps serving the last session with data
+                logger.info(f"Session {session_mapping.name.value} pages are unchanged")
+                await complete_session(db_session, session, SessionStatus.UNCHANGED)
+                return
+
             pages = []
-            # TODO fetch each url async in task group
-            for mapping in session_mapping.pages:
-                logger.info(f"page url {mapping.url}")
-                scraping_result = await process_page_mapping(db_session, mapping)
+            images = []
+            for mapping, result in zip(session_mapping.pages, results):
+                page_state = page_states.get(mapping.path)
+                scraping_result = result.scraped
+                if result.unchanged:
+                    # reuse the data of the last time the page was processed
+                    scraping_result = ScrapeResult(
+                        raw_data=page_state.page.raw_data,
+                        issued_at=page_state.page.issued_at,
+                    )
                 if (
                     scraping_result.issued_at is None
                 ):  # page did not provide issued_at; assume page is up-to-date
@@ -129,27 +199,30 @@ async def process_session_mapping(session_mapping: SessionMapping):
                     issued_at=scraping_result.issued_at,
                 )
                 db_session.add(page)
+                await db_session.flush()
                 pages.append(page)
+                await save_page_state(
+                    db_session, page_state, mapping.path, result.fetched, page.id
+                )
 
                 if scraping_result.images is not None:
                     # TODO store list of all images, pass images to `process` in case we add image OCR or other
                     # also could delete images on failure of the session
-                    for image_elem in scraping_result.images:
-                        image_fp = await process_page_image(page, image_elem)
+                    for image_src in scraping_result.images:
+                        image_fp = await process_page_image(page, image_src)
                         # XXX maybe this could be in the `process` function
-                        image = models.Image(
-                            session_id=session.id,
-                            issued_at=scraping_result.issued_at,
-                            filepath=image_fp,
+                        images.append(
+                            models.Image.row_values(
+                                session_id=session.id,
+                                issued_at=scraping_result.issued_at,
+                                filepath=image_fp,
+                            )
                         )
-                        db_session.add(image)
+            await bulk_insert(db_session, models.Image, images)
 
             await session_mapping.process(db_session, session, pages)
 
-            # complete the session
-            session.completed_at = now()
-            db_session.add(session)
-            await db_session.flush()
+            await complete_session(db_session, session)
     except Exception as exc:
         # handle any errors - maybe add `errors` and `count` to Session table
         # TODO better handling
@@ -160,15 +233,22 @@ async def process_session_mapping(session_mapping: SessionMapping):
 
 async def run_process_all_sessions() -> None:
     """CLI entrypoint."""
-    async with anyio.create_task_group() as tg:
-        for session_mapping in session_mappings:
-            tg.start_soon(process_session_mapping, session_mapping)
+    await process_all_sessions()
+
 
+async def process_all_sessions(client: httpx.AsyncClient | None = None) -> None:
+    """Process every session mapping concurrently.
+    A single pooled `client` is shared by all sessions of the run; one is created
+    (and closed) for the run when not given.
+    """
+    if client is None:
+        async with create_client() as client:
+            await process_all_sessions(client)
+        return
 
-async def process_all_sessions() -> None:
     async with anyio.create_task_group() as tg:
         for session_mapping in session_mappings:
-            tg.start_soon(process_session_mapping, session_mapping)
+            tg.start_soon(process_session_mapping, session_mapping, client)
 
 
 if __name__ == "__main__":
@@ -9,7 +9,7 @@ from loguru import logger
 from app import config, models
 from app.database import AsyncSession
 from app.utils.datetime import now
-from app.scraper.utils import _save_html
+from app.scraper.utils import FetchResult, _save_html
 
 
 class PagePath(enum.Enum):
@@ -26,7 +26,6 @@ class PagePath(enum.Enum):
 class PageMapping:
     path: PagePath
     process: callable
-    scraper: callable = None
     # process_images: callable | None  # TODO decide how to handle pages that have images.
 
     @property
@@ -88,3 +87,32 @@ async def handle_page_error(
         )
         db_session.add(page_error)
         await db_session.commit()
+
+
+async def get_page_states(
+    db_session: AsyncSession, paths: list[PagePath]
+) -> dict[PagePath, models.PageState]:
+    """Return the validators of the last successful fetch of each page."""
+    query = select(models.PageState).where(
+        models.PageState.url.in_([path.value for path in paths])
+    )
+    page_states = (await db_session.execute(query)).scalars().all()
+    return {PagePath(page_state.url): page_state for page_state in page_states}
+
+
+async def save_page_state(
+    db_session: AsyncSession,
+    page_state: models.PageState | None,
+    path: PagePath,
+    fetched: FetchResult,
+    page_id: int,
+) -> models.PageState:
+    """Create or update the validators of a page after it is successfully processed."""
+    if page_state is None:
+        page_state = models.PageState(url=path.value)
+    page_state.etag = fetched.etag
+    page_state.last_modified = fetched.last_modified
+    page_state.html_hash = fetched.html_hash
+    page_state.page_id = page_id
+    db_session.add(page_state)
+    return page_state
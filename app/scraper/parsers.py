@@ -0,0 +1,18 @@
+"""HTML parser backends used by the scrapers to build their soup."""
+
+import enum
+
+from bs4 import BeautifulSoup
+
+from app import config
+
+
+class HtmlParser(str, enum.Enum):
+    HTML_PARSER = "html.parser"  # pure python, slowest
+    LXML = "lxml"  # lxml's libxml2 based tree builder
+
+
+def make_soup(html: str, parser: HtmlParser | str | None = None) -> BeautifulSoup:
+    """Parse `html` with the given parser backend or the configured one."""
+    parser = HtmlParser(parser or config.SCRAPER_HTML_PARSER)
+    return BeautifulSoup(html, parser.value)
@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from datetime import datetime
 
+# value of the forecast arrays for times the VMGD does not forecast
+MISSING_VALUE = -999
+
 
 @dataclass
 class WeatherObject:
@@ -1,11 +1,10 @@
 from dataclasses import dataclass
 from typing import Any
 from datetime import datetime
+from html import unescape
 import json
+import re
 
-from bs4 import BeautifulSoup
-from cerberus_list_schema import Validator as ListValidator
-from cerberus import Validator, SchemaError
 from loguru import logger
 
 from app.scraper.exceptions import (
@@ -14,22 +13,32 @@ from app.scraper.exceptions import (
     ScrapingNotFoundError,
     ScrapingValidationError,
 )
+from app.scraper.parsers import make_soup
 from app.scraper.schemas import (
     WeatherObject,
     process_public_forecast_7_day_schema,
     process_forecast_schema,
 )
 from app.scraper.utils import strip_html_text
+from app.scraper.validators import CompiledListValidator, CompiledValidator
 from app.utils.datetime import as_vu_to_utc
 
 
 @dataclass
 class ScrapeResult:
+    """Result of a scraper; must be picklable as scrapers may run in another process."""
+
     raw_data: Any | None = None
     issued_at: datetime | None = None
     images: list[str] | None = None
 
 
+forecast_validator = CompiledListValidator(process_forecast_schema)
+public_forecast_7_day_validator = CompiledValidator(
+    process_public_forecast_7_day_schema
+)
+
+
 def process_issued_at(
     text: str, delimiter_start: str, delimiter_end: str = "(utc time"
 ) -> datetime:
@@ -60,16 +69,71 @@ def process_issued_at(
     return as_vu_to_utc(issued_at)
 
 
-async def scrape_forecast(html: str) -> ScrapeResult:
-    """The main forecast page with daily temperature and humidity information and 6 hour
-    interval resolution for weather condition, wind speed/direction.
-    All information is encoded in a special `<script>` that contains a `var weathers`
-    array which contains everything needed to reconstruct the information found in the
-    forecast map.
-    The specifics of how to decode the `weathers` array is found in the `xmlForecast.js`
-    file that is on the page.
+_JSON_DECODER = json.JSONDecoder()
+_WHITESPACE_RE = re.compile(r"\s*")
+# string values are matched first so commas inside them are kept
+_TRAILING_COMMA_RE = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[\]}])')
+_ARRAY_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]]')
+
+
+def find_array_end(text: str, start: int) -> int:
+    """Index just past the bracket closing the array opened at `start` of `text`.
+    Brackets inside string values are skipped.
+    """
+    depth = 0
+    for match in _ARRAY_TOKEN_RE.finditer(text, start):
+        token = match.group()
+        if token == "[":
+            depth += 1
+        elif token == "]":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError("unterminated array")
+
+
+def parse_js_array(text: str, start: int = 0) -> list:
+    """Parse the JS array literal at index `start` of `text` ignoring anything after it.
+    Line breaks and trailing commas, as found in pretty printed pages, are tolerated.
+    `text` is decoded in place so the rest of a large page is not copied.
+    """
+    start = _WHITESPACE_RE.match(text, start).end()
+    try:
+        return _JSON_DECODER.raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        # strip trailing commas from the text of the array only
+        array_text = text[start : find_array_end(text, start)]
+        return json.loads(
+            _TRAILING_COMMA_RE.sub(lambda m: m.group(1) or m.group(2), array_text)
+        )
+
+
+_WEATHERS_SCRIPT_RE = re.compile(r"<script[^>]{0,200}>\s{0,200}var weathers = ")
+_ISSUE_DATE_RE = re.compile(
+    r'<div[^>]{0,200}\bid="issueDate"[^>]{0,200}>(.{0,1000}?)</div>', re.S
+)
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def extract_forecast_from_html(html: str) -> tuple[list, str] | None:
+    """Pull the `weathers` array and issue date text straight out of the raw HTML
+    without building a DOM. Returns `None` if either can not be found.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    weathers_match = _WEATHERS_SCRIPT_RE.search(html)
+    issue_date_match = _ISSUE_DATE_RE.search(html)
+    if weathers_match is None or issue_date_match is None:
+        return None
+    try:
+        weathers = parse_js_array(html, weathers_match.end())
+    except ValueError:
+        return None
+    issued_str = unescape(_TAG_RE.sub("", issue_date_match.group(1)))
+    return weathers, issued_str
+
+
+def extract_forecast_from_soup(html: str) -> tuple[list, str | None]:
+    """Find the `weathers` array and issue date text in the full soup of the page."""
+    soup = make_soup(html)
     # Find JSON containing script tag
     weathers_script = None
     for script in soup.find_all("script"):
@@ -80,30 +144,44 @@ async def scrape_forecast(html: str) -> ScrapeResult:
         raise ScrapingNotFoundError(html)
 
     # grab JSON data from script tag
-    try:
-        weathers_line = weathers_script.text.strip().split("\n", 1)[0]
-        weathers_array_string = weathers_line.split(" = ", 1)[1].rsplit(";", 1)[0]
-        weathers = json.loads(weathers_array_string)
-        v = ListValidator(process_forecast_schema)
-        errors = []
-        for location in weathers:
-            if not v.validate(location):
-                errors.append(v.errors)
-        if errors:
-            raise ScrapingValidationError(html, weathers, errors)
-        # XXX this makes it hard to serialize into database for `Page` model
-        # weathers = list(map(lambda w: WeatherObject(*w), weathers))
-    except SchemaError as exc:
-        raise ScrapingValidationError(html, weathers, str(exc))
-    # I believe catching a general exception here negates the use of raising the error above
-    # except Exception as exc:
-    #     logger.exception("Failed to grab data: %s", str(exc))
-    #     raise ScrapingNotFoundError(html)
+    weathers_array_string = weathers_script.text.strip().split(" = ", 1)[1]
+    weathers = parse_js_array(weathers_array_string)
+
+    issue_date = soup.find("div", id="issueDate")
+    return weathers, issue_date.text if issue_date is not None else None
+
+
+def scrape_forecast(html: str) -> ScrapeResult:
+    """The main forecast page with daily temperature and humidity information and 6 hour
+    interval resolution for weather condition, wind speed/direction.
+    All information is encoded in a special `<script>` that contains a `var weathers`
+    array which contains everything needed to reconstruct the information found in the
+    forecast map.
+    The specifics of how to decode the `weathers` array is found in the `xmlForecast.js`
+    file that is on the page.
+
+    The page is large so the values are first pulled from the raw HTML and only when that
+    fails is the full soup built.
+    """
+    extracted = extract_forecast_from_html(html)
+    if extracted is None:
+        logger.debug("Targeted extraction failed - falling back to full soup")
+        extracted = extract_forecast_from_soup(html)
+    weathers, issued_str = extracted
+
+    errors = list(filter(None, map(forecast_validator.errors, weathers)))
+    if errors:
+        raise ScrapingValidationError(html, weathers, errors)
+    # XXX this makes it hard to serialize into database for `Page` model
+    # weathers = list(map(lambda w: WeatherObject(*w), weathers))
 
     # grab issued at datetime
     try:
-        issued_str = soup.find("div", id="issueDate").text
-        issued_at = process_issued_at(issued_str, "Forecast Issue Date:")
+        if issued_str is None:
+            raise ValueError("issue date not found")
+        issued_at = process_issued_at(
+            " ".join(issued_str.split()), "Forecast Issue Date:"
+        )
     except (IndexError, ValueError) as exc:
         raise ScrapingIssuedAtError(html)
     return ScrapeResult(raw_data=weathers, issued_at=issued_at)
@@ -113,7 +191,7 @@ async def scrape_forecast(html: str) -> ScrapeResult:
 #################
 
 
-async def scrape_public_forecast(html: str) -> ScrapeResult:
+def scrape_public_forecast(html: str) -> ScrapeResult:
     """The about page of the weather forecast section.
 
     TODO collect the text from table element with `<article class="item-page">` and
@@ -125,7 +203,7 @@ async def scrape_public_forecast(html: str) -> ScrapeResult:
     raise NotImplementedError
 
 
-async def scrape_public_forecast_policy(html: str) -> ScrapeResult:
+def scrape_public_forecast_policy(html: str) -> ScrapeResult:
     # TODO hash text contents of `<table class="forecastPublic">` to make a sanity
     # check that data presented or how data is processed is not changed. Only store
     # copies of the page that show a new hash value... I think. But maybe this is
@@ -133,9 +211,9 @@ async def scrape_public_forecast_policy(html: str) -> ScrapeResult:
     raise NotImplementedError
 
 
-async def scrape_severe_weather_outlook(html: str) -> ScrapeResult:
+def scrape_severe_weather_outlook(html: str) -> ScrapeResult:
     raise NotImplementedError
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html)
     table = soup.find("table", class_="severeTable")
     # TODO assert table
     # TODO assert tablerows are 4
@@ -146,45 +224,38 @@ async def scrape_severe_weather_outlook(html: str) -> ScrapeResult:
     # any additional trX should be alerted and accounted for in future
 
 
-async def scrape_public_forecast_tc_outlook(html: str) -> ScrapeResult:
+def scrape_public_forecast_tc_outlook(html: str) -> ScrapeResult:
     raise NotImplementedError
 
 
-async def scrape_public_forecast_7_day(html: str) -> ScrapeResult:
+def scrape_public_forecast_7_day(html: str) -> ScrapeResult:
     """Simple weekly forecast for all locations containing daily low/high temperature,
     and weather condition summary.
     """
     forecasts = []
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html)
     # grab data for each location from individual tables
-    try:
-        for table in soup.article.find_all("table"):
-            for count, tr in enumerate(table.find_all("tr")):
-                if count == 0:
-                    location = tr.text.strip()
-                    continue
-                date, forecast = tr.text.strip().split(" : ")
-                summary = forecast.split(".", 1)[0]
-                minTemp = int(forecast.split("Min:", 1)[1].split("&", 1)[0].strip())
-                maxTemp = int(forecast.split("Max:", 1)[1].split("&", 1)[0].strip())
-                forecasts.append(
-                    dict(
-                        location=location,
-                        date=date,
-                        summary=summary,
-                        minTemp=minTemp,
-                        maxTemp=maxTemp,
-                    )
+    for table in soup.article.find_all("table"):
+        for count, tr in enumerate(table.find_all("tr")):
+            if count == 0:
+                location = tr.text.strip()
+                continue
+            date, forecast = tr.text.strip().split(" : ")
+            summary = forecast.split(".", 1)[0]
+            minTemp = int(forecast.split("Min:", 1)[1].split("&", 1)[0].strip())
+            maxTemp = int(forecast.split("Max:", 1)[1].split("&", 1)[0].strip())
+            forecasts.append(
+                dict(
+                    location=location,
+                    date=date,
+                    summary=summary,
+                    minTemp=minTemp,
+                    maxTemp=maxTemp,
                 )
-        v = Validator(process_public_forecast_7_day_schema)
-        errors = []
-        for location in forecasts:
-            if not v.validate(location):
-                errors.append(v.errors)
-        if errors:
-            raise ScrapingValidationError(html, forecasts, errors)
-    except SchemaError as exc:
-        raise ScrapingValidationError(html, forecasts, str(exc))
+            )
+    errors = list(filter(None, map(public_forecast_7_day_validator.errors, forecasts)))
+    if errors:
+        raise ScrapingValidationError(html, forecasts, errors)
 
     # grab issued at datetime
     try:
@@ -197,8 +268,8 @@ async def scrape_public_forecast_7_day(html: str) -> ScrapeResult:
     return ScrapeResult(raw_data=forecasts, issued_at=issued_at)
 
 
-async def scrape_public_forecast_media(html: str) -> ScrapeResult:
-    soup = BeautifulSoup(html, "html.parser")
+def scrape_public_forecast_media(html: str) -> ScrapeResult:
+    soup = make_soup(html)
     try:
         table = soup.find("table", class_="forecastPublic")
         assert table is not None, "public forecast table is missing"
@@ -206,7 +277,8 @@ async def scrape_public_forecast_media(html: str) -> ScrapeResult:
         raise ScrapingNotFoundError(html, errors=str(exc))
 
     try:
-        images = table.find_all("img")
+        # keep only the `src` of each image so the result can be pickled
+        images = [img.get("src") for img in table.find_all("img")]
         # TODO maybe allow no images
         assert len(images) > 0, "public forecast media images missing"
     except AssertionError as exc:
@@ -240,10 +312,10 @@ NO_CURRENT_WARNING = "no current warning"
 NoCurrentWarningsResult = ScrapeResult(raw_data=NO_CURRENT_WARNING)
 
 
-async def scrape_current_bulletin(html: str) -> ScrapeResult:
+def scrape_current_bulletin(html: str) -> ScrapeResult:
     """Special bulletin board for warnins that seems to have a unique layout compared to the other warning pages.
     I do not have an example of warnings yet so I can not implement it yet."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html)
     try:
         warnings_table = soup.find("div", class_="foreWarning")
         if "no latest warning" in strip_html_text(warnings_table.h4.text):
@@ -251,7 +323,7 @@ async def scrape_current_bulletin(html: str) -> ScrapeResult:
             return NoCurrentWarningsResult
         else:
             raise NotImplementedError
-        
+
         # if warnings_table:
         #     logger.debug("No warnings table found")
         #     assert "no latest warning" in strip_html_text(warnings_table.text), "Exepcted `no latest warning` in text"
@@ -268,8 +340,8 @@ async def scrape_current_bulletin(html: str) -> ScrapeResult:
     # TODO get issued_at
 
 
-async def scrape_weather_warnings(html: str) -> ScrapeResult:
-    soup = BeautifulSoup(html, "html.parser")
+def scrape_weather_warnings(html: str) -> ScrapeResult:
+    soup = make_soup(html)
     # grab data for each warning from table
     try:
         warnings_table = soup.find("table", class_="marineFrontTabOne")
@@ -23,6 +23,11 @@ class SessionMapping:
     process: callable  # processes results from PageMappings
 
 
+class SessionStatus(str, enum.Enum):
+    COMPLETED = "completed"
+    UNCHANGED = "unchanged"  # every page was unchanged so no new data was saved
+
+
 class ForecastSession(str, enum.Enum):
     FORECAST_GENERAL = "forecast_general"
     FORECAST_MEDIA = "forecast_media"
@@ -1,8 +1,13 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, AsyncIterator
 import base64
+import hashlib
 from pathlib import Path
+import time
 
+import anyio
 import httpx
 from loguru import logger
 
@@ -15,6 +20,7 @@ from app.scraper.exceptions import (
 from app.utils.datetime import as_vu_to_utc
 
 if TYPE_CHECKING:
+    from app.models import PageState
     from app.scraper.pages import PageMapping
 
 
@@ -40,19 +46,128 @@ def _save_html(html: str, fp: Path) -> None:
 #     fp.write_bytes(png_data)
 
 
-async def fetch(url: str) -> str:
+@dataclass
+class _HostLimit:
+    in_flight: anyio.Semaphore
+    lock: anyio.Lock
+    tokens: float
+    updated_at: float
+
+
+class HostRateLimiter:
+    """Token bucket plus a cap on requests in flight, kept separately for each host.
+    The bucket holds up to `max_in_flight` tokens and refills at `rate` tokens per second.
+    """
+
+    def __init__(self, rate: float, max_in_flight: int) -> None:
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+        self._hosts: dict[str, _HostLimit] = {}
+
+    def _get_host_limit(self, host: str) -> _HostLimit:
+        if host not in self._hosts:
+            self._hosts[host] = _HostLimit(
+                in_flight=anyio.Semaphore(self.max_in_flight),
+                lock=anyio.Lock(),
+                tokens=float(self.max_in_flight),
+                updated_at=time.monotonic(),
+            )
+        return self._hosts[host]
+
+    async def _take_token(self, host_limit: _HostLimit) -> None:
+        async with host_limit.lock:
+            while True:
+                current = time.monotonic()
+                elapsed = current - host_limit.updated_at
+                host_limit.tokens = min(
+                    self.max_in_flight, host_limit.tokens + elapsed * self.rate
+                )
+                host_limit.updated_at = current
+                if host_limit.tokens >= 1:
+                    host_limit.tokens -= 1
+                    return
+                await anyio.sleep((1 - host_limit.tokens) / self.rate)
+
+    @asynccontextmanager
+    async def limit(self, host: str) -> AsyncIterator[None]:
+        host_limit = self._get_host_limit(host)
+        async with host_limit.in_flight:
+            await self._take_token(host_limit)
+            yield
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Transport that holds every request to the `limiter` of its host."""
+
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport, limiter: HostRateLimiter
+    ) -> None:
+        self.transport = transport
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        async with self.limiter.limit(request.url.host):
+            response = await self.transport.handle_async_request(request)
+            # read the body while holding the limit so in-flight counts whole requests
+            await response.aread()
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def create_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client shared by every fetch of a scraper run.
+    Connections to the VMGD website are kept alive (and multiplexed over HTTP/2 when
+    available) so each page does not pay for a new TCP+TLS handshake. Every request
+    made with the client goes through one per-host rate limiter.
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=config.VMGD_HTTP2,
+        limits=httpx.Limits(
+            max_connections=config.VMGD_MAX_CONNECTIONS,
+            max_keepalive_connections=config.VMGD_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.VMGD_KEEPALIVE_EXPIRY,
+        ),
+    )
+    limiter = HostRateLimiter(
+        rate=config.VMGD_REQUESTS_PER_SECOND,
+        max_in_flight=config.VMGD_MAX_REQUESTS_IN_FLIGHT,
+    )
+    return httpx.AsyncClient(
+        transport=RateLimitedTransport(transport, limiter),
+        timeout=config.VMGD_TIMEOUT,
+        headers={
+            "User-Agent": config.USER_AGENT,
+        },
+        follow_redirects=True,
+    )
+
+
+@dataclass
+class FetchResult:
+    html: str | None
+    html_hash: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    unchanged: bool = False
+
+
+def hash_html(html: str) -> str:
+    """Hash of the HTML with whitespace normalised so reformatting alone is not a change."""
+    return hashlib.sha256(" ".join(html.split()).encode("utf-8")).hexdigest()
+
+
+async def fetch(
+    client: httpx.AsyncClient, url: str, headers: dict[str, str] | None = None
+) -> httpx.Response:
     logger.info(f"Fetching {url}")
 
-    async with httpx.AsyncClient(timeout=config.VMGD_TIMEOUT) as client:
-        resp = await client.get(
-            url,
-            headers={
-                "User-Agent": config.USER_AGENT,
-            },
-            follow_redirects=True,
-        )
+    resp = await client.get(url, headers=headers)
 
-    if resp.status_code in [401, 403]:
+    if resp.status_code == 304:
+        return resp
+    elif resp.status_code in [401, 403]:
         raise PageUnavailableError(url, resp)
     elif resp.status_code == 404:
         raise PageNotFoundError(url, resp)
@@ -62,7 +177,7 @@ async def fetch(url: str) -> str:
     except httpx.HTTPError as http_error:
         raise FetchError(url, resp) from http_error
 
-    return resp.text
+    return resp
 
 
 def check_cache(page: "PageMapping") -> str | None:
@@ -75,15 +190,49 @@ def check_cache(page: "PageMapping") -> str | None:
     return html, cache_file
 
 
-async def fetch_page(page: "PageMapping"):
+async def fetch_page(
+    client: httpx.AsyncClient,
+    page: "PageMapping",
+    page_state: "PageState | None" = None,
+) -> FetchResult:
+    """Fetch the page HTML.
+    When the `page_state` of the previous fetch is given a conditional request is made and
+    the result is flagged `unchanged` if the server or the HTML hash says so.
+    """
     cache_file = None
     if config.DEBUG and config.USE_PAGE_CACHE:
         html, cache_file = check_cache(page)
         if html:
-            return html
-
-    html = await fetch(page.url)
+            return FetchResult(html=html, html_hash=hash_html(html))
+
+    headers = {}
+    if page_state is not None:
+        if page_state.etag:
+            headers["If-None-Match"] = page_state.etag
+        if page_state.last_modified:
+            headers["If-Modified-Since"] = page_state.last_modified
+
+    resp = await fetch(client, page.url, headers=headers)
+
+    if resp.status_code == 304:
+        logger.info(f"Page not modified {page.url}")
+        return FetchResult(
+            html=None,
+            html_hash=page_state.html_hash,
+            etag=resp.headers.get("ETag", page_state.etag),
+            last_modified=resp.headers.get("Last-Modified", page_state.last_modified),
+            unchanged=True,
+        )
 
+    html = resp.text
     if config.DEBUG and config.USE_PAGE_CACHE:
         cache_file.write_text(html)
-    return html
+
+    html_hash = hash_html(html)
+    return FetchResult(
+        html=html,
+        html_hash=html_hash,
+        etag=resp.headers.get("ETag"),
+        last_modified=resp.headers.get("Last-Modified"),
+        unchanged=page_state is not None and page_state.html_hash == html_hash,
+    )
@@ -0,0 +1,118 @@
+"""Validators compiled once from the Cerberus style schemas found in `schemas`.
+
+Each rule is turned into a check function when the schema is compiled so validating a
+document no longer walks the schema. The `errors` produced have the same structure and
+messages as the Cerberus validators these replace, which is what
+`ScrapingValidationError` stores. Only the rules used by our schemas are supported.
+"""
+
+from collections.abc import Sequence, Sized
+from typing import Any, Callable
+
+# a check returns the errors of a value; an empty list when the value is valid
+Check = Callable[[Any], list]
+
+NULL_ERROR = "null value not allowed"
+EMPTY_ERROR = "empty values not allowed"
+UNKNOWN_FIELD_ERROR = "unknown field"
+
+_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int),
+    "float": lambda value: isinstance(value, (float, int)),
+    "number": lambda value: isinstance(value, (float, int)),
+    "boolean": lambda value: isinstance(value, bool),
+    "list": lambda value: isinstance(value, Sequence) and not isinstance(value, str),
+}
+
+_SUPPORTED_RULES = {"type", "items", "empty", "coerce", "name"}
+
+
+def _compile_rule(rule: dict) -> Check:
+    unsupported = set(rule) - _SUPPORTED_RULES
+    if unsupported:
+        raise ValueError(f"Unsupported schema rules {unsupported}")
+
+    type_name = rule["type"]
+    type_check = _TYPE_CHECKS[type_name]
+    type_error = f"must be of {type_name} type"
+    allow_empty = rule.get("empty", True)
+    item_checks = None
+    if "items" in rule:
+        item_checks = [_compile_rule(item_rule) for item_rule in rule["items"]]
+        length_error = f"length of list should be {len(item_checks)}, it is %d"
+
+    def check(value: Any) -> list:
+        if value is None:
+            return [NULL_ERROR]
+        if not type_check(value):
+            return [type_error]
+        if not allow_empty and isinstance(value, Sized) and len(value) == 0:
+            return [EMPTY_ERROR]
+        if item_checks is not None:
+            if len(value) != len(item_checks):
+                return [length_error % len(value)]
+            item_errors = {}
+            for idx, (item_check, item) in enumerate(zip(item_checks, value)):
+                errors = item_check(item)
+                if errors:
+                    item_errors[idx] = errors
+            if item_errors:
+                return [item_errors]
+        return []
+
+    return check
+
+
+def _compile_field(field: str, rule: dict) -> Check:
+    check = _compile_rule(rule)
+    coerce = rule.get("coerce")
+    if coerce is None:
+        return check
+
+    def coerce_and_check(value: Any) -> list:
+        try:
+            value = coerce(value)
+        except (TypeError, ValueError) as exc:
+            return [f"field '{field}' cannot be coerced: {exc}", *check(value)]
+        return check(value)
+
+    return coerce_and_check
+
+
+class CompiledValidator:
+    """Validates dict documents like `cerberus.Validator`.
+    Holds no state between documents so it can be shared, unlike a Cerberus validator.
+    """
+
+    def __init__(self, schema: dict) -> None:
+        self._checks = {
+            field: _compile_field(field, rule) for field, rule in schema.items()
+        }
+
+    def errors(self, document: dict) -> dict:
+        """Return the errors of `document`; empty when it is valid."""
+        errors = {}
+        for field in sorted(document):
+            check = self._checks.get(field)
+            if check is None:
+                errors[field] = [UNKNOWN_FIELD_ERROR]
+                continue
+            field_errors = check(document[field])
+            if field_errors:
+                errors[field] = field_errors
+        return errors
+
+
+class CompiledListValidator:
+    """Validates list documents like `cerberus_list_schema.Validator`.
+    Holds no state between documents so it can be shared, unlike a Cerberus validator.
+    """
+
+    def __init__(self, schema: dict) -> None:
+        self._check = _compile_rule(schema)
+
+    def errors(self, document: list) -> dict:
+        """Return the errors of `document`; empty when it is valid."""
+        errors = self._check(document)
+        return {"_schema": errors} if errors else {}
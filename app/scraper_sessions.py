@@ -1,14 +1,54 @@
 """Actions related to the VMGD scraping sessions."""
 
 from datetime import datetime
+from typing import Iterable
 
 from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
 from loguru import logger
 
 from app import models
 from app.database import AsyncSession
+from app.generation import bump_generation
 
-from app.scraper.sessions import ForecastSession, WarningSession
+from app.scraper.sessions import ForecastSession, SessionStatus, WarningSession
+from app.utils.datetime import now
+
+
+def latest_session_id(
+    session_name: ForecastSession | WarningSession | None = None,
+    dt: datetime | None = None,
+):
+    """Subquery of the id of the latest completed session, as of `dt`.
+    Sessions that failed or found every page unchanged are never latest.
+    """
+    if dt:
+        # a range search of `ix_session_name_completed_at` back from `dt`
+        query = select(models.Session.id).where(
+            models.Session.completed_at <= dt,
+            models.Session.status.is_distinct_from(SessionStatus.UNCHANGED.value),
+        )
+        if session_name is not None:
+            query = query.where(models.Session._name == session_name.value)
+        query = query.order_by(models.Session.completed_at.desc())
+    else:
+        query = select(models.LatestSession.session_id)
+        if session_name is not None:
+            query = query.where(models.LatestSession.name == session_name.value)
+        query = query.order_by(models.LatestSession.completed_at.desc())
+    return query.limit(1).scalar_subquery()
+
+
+async def get_latest_session_stamps(
+    db_session: AsyncSession,
+    session_names: Iterable[ForecastSession | WarningSession],
+    dt: datetime | None = None,
+) -> list[tuple[int, datetime]]:
+    """Return the id and completion time of the latest completed session of each name."""
+    query = select(models.Session.id, models.Session.completed_at).where(
+        models.Session.id.in_([latest_session_id(name, dt) for name in session_names])
+    )
+    return [tuple(row) for row in await db_session.execute(query)]
 
 
 async def get_latest_scraper_session(
@@ -18,13 +58,55 @@ async def get_latest_scraper_session(
     successful_run_only: bool = False,
     dt: datetime | None = None,
 ) -> models.Session:
-    """Return latest scraper session."""
-    query = select(models.Session)
+    """Return latest scraper session.
+    Sessions that found every page unchanged are skipped as they saved no data.
+    """
+    if successful_run_only:
+        query = select(models.Session).where(
+            models.Session.id == latest_session_id(session_name, dt)
+        )
+        return (await db_session.execute(query)).scalar()
+
+    query = select(models.Session).where(
+        models.Session.status.is_distinct_from(SessionStatus.UNCHANGED.value)
+    )
     if session_name is not None:
         query = query.where(models.Session._name == session_name.value)
-    if successful_run_only:
-        query = query.where(models.Session.completed_at is not None)
     if dt:
         query = query.where(models.Session.started_at <= dt)
     query = query.order_by(models.Session.started_at.desc()).limit(1)
     return (await db_session.execute(query)).scalar()
+
+
+async def complete_session(
+    db_session: AsyncSession,
+    session: models.Session,
+    status: SessionStatus = SessionStatus.COMPLETED,
+) -> None:
+    """Mark `session` completed and bump the generation for the caches of the API.
+    A completed session becomes the latest session of its name in the same transaction;
+    an unchanged session saved no data so the latest stays as is.
+    """
+    session.status = status.value
+    session.completed_at = now()
+    db_session.add(session)
+    await db_session.flush()
+    await bump_generation(db_session)
+    if status != SessionStatus.COMPLETED:
+        return
+
+    query = (
+        insert(models.LatestSession)
+        .values(
+            name=session._name,
+            session_id=session.id,
+            completed_at=session.completed_at,
+        )
+        .on_conflict_do_update(
+            index_elements=[models.LatestSession.name],
+            set_=dict(session_id=session.id, completed_at=session.completed_at),
+            # never move back to an older session
+            where=models.LatestSession.completed_at < session.completed_at,
+        )
+    )
+    await db_session.execute(query)
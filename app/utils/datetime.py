@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional
 
-from fastapi import Depends, Query
+from fastapi import Depends, HTTPException, Query
 from pydantic import BaseModel, validator, ValidationError
 import sqlalchemy as sa
 
@@ -80,3 +80,22 @@ def get_datetime_dependency(date: str = Query(None)):
 
 
 DateDep = Annotated[datetime, Depends(get_datetime_dependency)]
+
+
+def get_date_range_dependency(start: str = Query(None), end: str = Query(None)):
+    """
+    Returns UTC datetimes of the ISO formatted `start` and `end` in query.
+    """
+    try:
+        start = DateTimeQuery(date=start).date
+        end = DateTimeQuery(date=end).date
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid date format")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start is after end")
+    return start, end
+
+
+DateRangeDep = Annotated[
+    tuple[Optional[datetime], Optional[datetime]], Depends(get_date_range_dependency)
+]
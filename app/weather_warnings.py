@@ -1,33 +1,62 @@
 """Actions related to the VMGD weather warnings."""
 
-from datetime import datetime, timedelta
-from sqlalchemy import select
+from datetime import datetime
+from sqlalchemy import Select, select, tuple_
 from loguru import logger
 
 from app import models
 from app.database import AsyncSession
 from app.scraper.sessions import WarningSession
+from app.scraper_sessions import latest_session_id
 
 
-async def _get_latest_weather_warning_session_subquery(
-    session_name: WarningSession,
-    dt: datetime | None,
-):
-    subquery = (
-        select(models.Session.id)
-        .join(models.Session.weather_warnings)
-        .filter(models.Session.completed_at is not None)
-        .filter(models.Session._name == session_name.value)
+def weather_warning_history_query(
+    session_name: WarningSession | None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> Select:
+    """Query the weather warnings of every session between `start` and `end` as plain
+    rows in the order they were saved."""
+    query = select(
+        models.WeatherWarning.session_id,
+        models.Session._name.label("name"),
+        models.WeatherWarning.issued_at,
+        models.WeatherWarning.date,
+        models.WeatherWarning.body,
+    ).join(models.Session, models.WeatherWarning.session_id == models.Session.id)
+    if session_name is not None:
+        query = query.where(models.Session._name == session_name.value)
+    if start:
+        query = query.where(models.WeatherWarning.date >= start)
+    if end:
+        query = query.where(models.WeatherWarning.date <= end)
+    return query.order_by(models.WeatherWarning.id)
+
+
+async def get_weather_warning_history(
+    db_session: AsyncSession,
+    session_name: WarningSession | None,
+    after: tuple[datetime, int] | None,
+    limit: int,
+) -> list[models.WeatherWarning]:
+    """Return up to `limit` weather warnings of completed sessions in `(issued_at, id)`
+    order after the key `after`, as `get_forecast_history`."""
+    completed = select(models.Session.id).where(
+        models.Session.id == models.WeatherWarning.session_id,
+        models.Session.completed_at.is_not(None),
     )
-    if dt:
-        start = dt.replace(hour=0, minute=0, second=0, microsecond=0)
-        end = start + timedelta(days=1)
-        subquery = subquery.filter(
-            models.WeatherWarning.date >= start, models.WeatherWarning.date < end
+    if session_name is not None:
+        completed = completed.where(models.Session._name == session_name.value)
+    query = select(models.WeatherWarning).where(completed.exists())
+    if after:
+        query = query.where(
+            tuple_(models.WeatherWarning.issued_at, models.WeatherWarning.id) > after
         )
-    return (
-        subquery.order_by(models.Session.completed_at.desc()).limit(1).scalar_subquery()
-    )
+    query = query.order_by(
+        models.WeatherWarning.issued_at, models.WeatherWarning.id
+    ).limit(limit)
+    warnings = (await db_session.execute(query)).scalars().all()
+    return warnings
 
 
 async def get_latest_weather_warning(
@@ -35,15 +64,14 @@ async def get_latest_weather_warning(
     session_name: WarningSession,
     dt: datetime | None = None,
 ) -> models.WeatherWarning | None:
-    subquery = await _get_latest_weather_warning_session_subquery(session_name, dt)
-    query = select(models.WeatherWarning).where(
-        models.WeatherWarning.session_id == subquery
+    """Return the weather warning of the latest completed session as of `dt`.
+    The warning is not limited to the day of `dt` as a session that found the page
+    unchanged saves no new warning and the last one saved still stands.
+    """
+    query = (
+        select(models.WeatherWarning)
+        .where(models.WeatherWarning.session_id == latest_session_id(session_name, dt))
+        .order_by(models.WeatherWarning.id)
     )
-    if dt:
-        start = dt.replace(hour=0, minute=0, second=0, microsecond=0)
-        end = start + timedelta(days=1)
-        query = query.where(
-            models.WeatherWarning.date >= start, models.WeatherWarning.date < end
-        )
     ww = (await db_session.execute(query)).scalars().first()
     return ww
@@ -0,0 +1,115 @@
+"""Time to load and serialize the 7-day forecasts of every location with one
+`/v1/forecasts` lookup per location and with the single query of `/v1/forecasts/batch`.
+
+The forecasts of a year of daily sessions, 13 locations with 7 daily forecasts each,
+are written to a temporary database, not the configured one.
+
+Usage:
+    python -m benchmarks.bench_batch_forecasts --days 365 --rounds 50
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import anyio
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.api import serializers
+from app.database import Base, bulk_insert
+from app.forecasts import get_latest_forecasts, get_latest_forecasts_by_location
+from app.scraper_sessions import complete_session
+from benchmarks.bench_bulk_insert import N_DAYS, N_LOCATIONS, make_rows
+
+
+async def backfill(make_session, days: int) -> list[models.Location]:
+    async with make_session() as db_session, db_session.begin():
+        locations = [
+            models.Location(f"Location {i}", -17.7, 168.3)
+            for i in range(1, N_LOCATIONS + 1)
+        ]
+        db_session.add_all(locations)
+    start = datetime(2023, 1, 1, 18, tzinfo=timezone.utc)
+    for day in range(days):
+        async with make_session() as db_session, db_session.begin():
+            session = models.Session("forecast_general")
+            db_session.add(session)
+            await db_session.flush()
+            rows = make_rows(session.id, session.id, start + timedelta(days=day))
+            await bulk_insert(
+                db_session, models.ForecastDaily, rows[models.ForecastDaily]
+            )
+            await complete_session(db_session, session)
+    return locations
+
+
+async def per_location(db_session: AsyncSession, locations) -> bytes:
+    body = b""
+    for location in locations:
+        forecasts = await get_latest_forecasts(db_session, location)
+        body += serializers.dump_vmgd_api_response(
+            list(map(serializers.forecast_data, forecasts)),
+            issued=forecasts[0].issued_at,
+            fetched=forecasts[0].session.fetched_at,
+        )
+    return body
+
+
+async def single_location(db_session: AsyncSession, locations) -> bytes:
+    return await per_location(db_session, locations[:1])
+
+
+async def batch(db_session: AsyncSession, locations) -> bytes:
+    forecasts = await get_latest_forecasts_by_location(db_session, None)
+    first = next(iter(forecasts.values()))[0]
+    return serializers.dump_vmgd_api_response(
+        serializers.location_forecasts_data(forecasts),
+        issued=first.issued_at,
+        fetched=first.session.fetched_at,
+    )
+
+
+async def run(days: int, rounds: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'db.sqlite'}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        make_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        locations = await backfill(make_session, days)
+        print(f"{days} sessions of {N_LOCATIONS} locations with {N_DAYS} forecasts")
+
+        for label, load in [
+            ("1 location", single_location),
+            (f"{N_LOCATIONS} locations", per_location),
+            ("batch", batch),
+        ]:
+            timings = []
+            for _ in range(rounds):
+                # a new session per round as per request
+                async with make_session() as db_session:
+                    start = time.perf_counter()
+                    await load(db_session, locations)
+                    timings.append(time.perf_counter() - start)
+            print(
+                f"{label:>13}: median {statistics.median(timings) * 1000:8.3f}ms"
+                f" over {rounds} rounds"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    logger.remove()
+    anyio.run(run, args.days, args.rounds)
@@ -0,0 +1,145 @@
+"""Time to backfill a year of forecast and warning sessions with `db_session.add()` per
+row and with `bulk_insert`.
+
+Every synthetic session writes the rows of the recorded forecast page, 13 locations
+with 7 daily forecasts and 16 interval values each, plus a session of 3 warnings.
+The rows are written to a temporary database, not the configured one.
+
+Usage:
+    python -m benchmarks.bench_bulk_insert --days 365
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import anyio
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base, bulk_insert
+
+N_LOCATIONS = 13
+N_DAYS = 7
+N_INTERVALS = 16
+N_WARNINGS = 3
+
+
+def make_rows(session_id: int, warning_session_id: int, issued_at: datetime) -> dict:
+    """Arguments of each model's constructor for the rows of a day."""
+    forecasts = [
+        dict(
+            session_id=session_id,
+            location_id=location_id,
+            issued_at=issued_at,
+            date=issued_at + timedelta(days=d),
+            summary="Partly cloudy",
+            minTemp=21,
+            maxTemp=28,
+            minHumi=70,
+            maxHumi=75,
+            windSpeed=11.25,
+            windDirection=106.9,
+            weatherCondition=3,
+        )
+        for location_id in range(1, N_LOCATIONS + 1)
+        for d in range(N_DAYS)
+    ]
+    intervals = [
+        dict(
+            session_id=session_id,
+            location_id=location_id,
+            issued_at=issued_at,
+            times=[issued_at + timedelta(hours=6 * i) for i in range(N_INTERVALS)],
+            weather_conditions=[3] * N_INTERVALS,
+            wind_directions=[112.5] * N_INTERVALS,
+            wind_speeds=[15] * N_INTERVALS,
+        )
+        for location_id in range(1, N_LOCATIONS + 1)
+    ]
+    warnings = [
+        dict(
+            session_id=warning_session_id,
+            issued_at=issued_at,
+            date=issued_at,
+            body=f"Warning {i}",
+        )
+        for i in range(N_WARNINGS)
+    ]
+    return {
+        models.ForecastDaily: forecasts,
+        models.ForecastInterval: intervals,
+        models.WeatherWarning: warnings,
+    }
+
+
+async def write_with_add(db_session: AsyncSession, rows: dict) -> None:
+    for model, model_rows in rows.items():
+        for row in model_rows:
+            db_session.add(model(**row))
+    await db_session.flush()
+
+
+async def write_with_bulk_insert(db_session: AsyncSession, rows: dict) -> None:
+    await bulk_insert(db_session, models.ForecastDaily, rows[models.ForecastDaily])
+    for model in [models.ForecastInterval, models.WeatherWarning]:
+        await bulk_insert(
+            db_session, model, [model.row_values(**row) for row in rows[model]]
+        )
+
+
+async def backfill(db_path: Path, days: int, write) -> float:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    make_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    start = datetime(2023, 1, 1, 18, tzinfo=timezone.utc)
+    elapsed = 0.0
+    for day in range(days):
+        # like a scraper run each session is saved in its own transaction
+        async with make_session() as db_session, db_session.begin():
+            forecast_session = models.Session("forecast_general")
+            warning_session = models.Session("warning_marine")
+            db_session.add_all([forecast_session, warning_session])
+            await db_session.flush()
+            rows = make_rows(
+                forecast_session.id,
+                warning_session.id,
+                start + timedelta(days=day),
+            )
+            start_time = time.perf_counter()
+            await write(db_session, rows)
+            elapsed += time.perf_counter() - start_time
+
+    async with make_session() as db_session:
+        count = await db_session.scalar(select(func.count(models.ForecastDaily.id)))
+        assert count == days * N_LOCATIONS * N_DAYS
+    await engine.dispose()
+    return elapsed
+
+
+async def run(days: int) -> None:
+    rows_per_day = N_LOCATIONS * N_DAYS + N_LOCATIONS + N_WARNINGS
+    print(f"{days} days of {rows_per_day} rows")
+    for label, write in [
+        ("add", write_with_add),
+        ("bulk_insert", write_with_bulk_insert),
+    ]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            elapsed = await backfill(Path(tmp_dir) / "db.sqlite", days, write)
+        print(f"{label:>12}: {elapsed * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    logger.remove()
+    anyio.run(run, args.days)
@@ -0,0 +1,163 @@
+"""Latency of API reads while the scraper writes, with the default SQLite setup and with
+WAL, the tuned pragmas and a read-only engine for the API.
+
+Like the scraper the writer runs in its own process and saves `--scrapes` forecast
+sessions, each a transaction of the 13 locations with 7 daily forecasts of the recorded
+forecast page, while `--readers` tasks query the latest forecasts of a location like the
+`/v1/forecasts` endpoint. The rows are written to a temporary database, not the
+configured one.
+
+Usage:
+    python -m benchmarks.bench_concurrent_reads --scrapes 500 --readers 4
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import anyio
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base, begin_immediate, bulk_insert, set_sqlite_pragmas
+from app.forecasts import get_latest_forecasts
+from app.scraper.sessions import ForecastSession
+
+N_LOCATIONS = 13
+N_DAYS = 7
+LOCATION = models.Location("Port Vila", -17.7333, 168.3273)
+LOCATION.id = 1
+
+
+def make_forecasts(session_id: int, issued_at: datetime) -> list[dict]:
+    return [
+        dict(
+            session_id=session_id,
+            location_id=location_id,
+            issued_at=issued_at,
+            date=issued_at + timedelta(days=d),
+            summary="Partly cloudy",
+            minTemp=21,
+            maxTemp=28,
+            minHumi=70,
+            maxHumi=75,
+        )
+        for location_id in range(1, N_LOCATIONS + 1)
+        for d in range(N_DAYS)
+    ]
+
+
+async def scrape(make_session, issued_at: datetime) -> None:
+    async with make_session() as db_session, db_session.begin():
+        session = models.Session(ForecastSession.FORECAST_GENERAL.value)
+        db_session.add(session)
+        await db_session.flush()
+        await bulk_insert(
+            db_session, models.ForecastDaily, make_forecasts(session.id, issued_at)
+        )
+        session.completed_at = issued_at
+
+
+def make_engines(db_path: Path, tuned: bool) -> tuple:
+    writer = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}", connect_args={"timeout": 15}
+    )
+    reader = writer
+    if tuned:
+        set_sqlite_pragmas(writer.sync_engine)
+        begin_immediate(writer.sync_engine)
+        reader = create_async_engine(
+            f"sqlite+aiosqlite:///file:{db_path}?mode=ro&uri=true",
+            connect_args={"timeout": 15},
+        )
+        set_sqlite_pragmas(reader.sync_engine, read_only=True)
+    return writer, reader
+
+
+async def write(db_path: Path, tuned: bool, scrapes: int) -> None:
+    writer, _ = make_engines(db_path, tuned)
+    make_session = sessionmaker(writer, class_=AsyncSession, expire_on_commit=False)
+    start = datetime(2023, 1, 1, 18, tzinfo=timezone.utc)
+    for i in range(1, scrapes + 1):
+        await scrape(make_session, start + timedelta(days=i))
+    await writer.dispose()
+
+
+def run_writer(db_path: Path, tuned: bool, scrapes: int) -> None:
+    logger.remove()
+    anyio.run(write, db_path, tuned, scrapes)
+
+
+async def read(make_session, writer_process, timings: list[float]) -> None:
+    while writer_process.is_alive():
+        start_time = time.perf_counter()
+        async with make_session() as db_session:
+            forecasts = await get_latest_forecasts(db_session, LOCATION)
+        timings.append(time.perf_counter() - start_time)
+        assert forecasts
+
+
+async def measure(db_path: Path, tuned: bool, scrapes: int, readers: int) -> list:
+    writer, reader = make_engines(db_path, tuned)
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    # so the readers have something to read from the start
+    await scrape(
+        sessionmaker(writer, class_=AsyncSession, expire_on_commit=False),
+        datetime(2023, 1, 1, 18, tzinfo=timezone.utc),
+    )
+    await writer.dispose()
+    make_session = sessionmaker(reader, class_=AsyncSession, expire_on_commit=False)
+    # the first connection of an engine initializes the dialect under a lock that
+    # concurrent tasks can deadlock on
+    async with make_session() as db_session:
+        await get_latest_forecasts(db_session, LOCATION)
+
+    timings = []
+    # spawned as a forked child would inherit the running event loop
+    writer_process = multiprocessing.get_context("spawn").Process(
+        target=run_writer, args=(db_path, tuned, scrapes)
+    )
+    writer_process.start()
+    async with anyio.create_task_group() as tg:
+        for _ in range(readers):
+            tg.start_soon(read, make_session, writer_process, timings)
+    writer_process.join()
+    await reader.dispose()
+    return timings
+
+
+def percentile(timings: list[float], p: int) -> float:
+    return statistics.quantiles(timings, n=100)[p - 1]
+
+
+async def run(scrapes: int, readers: int) -> None:
+    rows = N_LOCATIONS * N_DAYS
+    print(f"{scrapes} scrapes of {rows} rows with {readers} readers")
+    for label, tuned in [("default", False), ("tuned", True)]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            timings = await measure(
+                Path(tmp_dir) / "db.sqlite", tuned, scrapes, readers
+            )
+        print(
+            f"{label:>8}: {len(timings):6} reads"
+            f"  p50 {percentile(timings, 50) * 1000:7.2f}ms"
+            f"  p99 {percentile(timings, 99) * 1000:7.2f}ms"
+            f"  max {max(timings) * 1000:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--scrapes", type=int, default=500)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    logger.remove()
+    anyio.run(run, args.scrapes, args.readers)
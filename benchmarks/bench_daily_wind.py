@@ -0,0 +1,110 @@
+"""Time to aggregate the 6 hourly wind and weather condition values of a synthetic
+multi-year backfill into daily values, with python loops per location and with
+`aggregate_daily_intervals`.
+
+Every synthetic session has the shape of the recorded forecast page: 13 locations,
+8 dates and 16 irregular 6 hourly values with the occasional `MISSING_VALUE`.
+
+Usage:
+    python -m benchmarks.bench_daily_wind --years 3 --sessions-per-day 1
+"""
+
+import argparse
+import math
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+
+from app.scraper.aggregators import aggregate_daily_intervals
+from app.scraper.schemas import MISSING_VALUE, WeatherObject
+
+N_LOCATIONS = 13
+N_DAYS = 8
+# hour offsets of the 16 values from the first date, as on the recorded page
+HOUR_OFFSETS = [0, 6, 12, 18, 24, 30, 36, 42, 48, 54, 60, 72, 96, 120, 144, 168]
+
+
+def make_session(rng: random.Random, start: datetime) -> list[WeatherObject]:
+    def value(make):
+        return MISSING_VALUE if rng.random() < 0.05 else make()
+
+    return [
+        WeatherObject(
+            location=f"Location {i}",
+            latitude=-17.7,
+            longitude=168.3,
+            dates=[start + timedelta(days=d) for d in range(N_DAYS)],
+            minTemp=[],
+            maxTemp=[],
+            minHumi=[],
+            maxHumi=[],
+            conds=[value(lambda: rng.randint(1, 8)) for _ in HOUR_OFFSETS],
+            wd=[value(lambda: rng.randrange(16) * 22.5) for _ in HOUR_OFFSETS],
+            ws=[value(lambda: rng.randrange(0, 40, 5)) for _ in HOUR_OFFSETS],
+            dtFlag=0,
+            currentDate="",
+            dateHour=[start + timedelta(hours=h) for h in HOUR_OFFSETS],
+        )
+        for i in range(N_LOCATIONS)
+    ]
+
+
+def aggregate_with_loops(weather_objects: list[WeatherObject]) -> tuple:
+    wind_speeds, wind_directions, weather_conditions = [], [], []
+    for wo in weather_objects:
+        days = [[] for _ in wo.dates]
+        for dt, cond, wd, ws in zip(wo.dateHour, wo.conds, wo.wd, wo.ws):
+            days[(dt - wo.dates[0]).days].append((cond, wd, ws))
+        speeds, directions, conditions = [], [], []
+        for values in days:
+            ws = [v[2] for v in values if v[2] != MISSING_VALUE]
+            speeds.append(sum(ws) / len(ws) if ws else None)
+            wd = [math.radians(v[1]) for v in values if v[1] != MISSING_VALUE]
+            if wd:
+                mean = math.degrees(
+                    math.atan2(sum(map(math.sin, wd)), sum(map(math.cos, wd)))
+                )
+                directions.append(round(mean, 1) % 360)
+            else:
+                directions.append(None)
+            counts = Counter(v[0] for v in values if v[0] != MISSING_VALUE)
+            conditions.append(
+                min(counts, key=lambda c: (-counts[c], c)) if counts else None
+            )
+        wind_speeds.append(speeds)
+        wind_directions.append(directions)
+        weather_conditions.append(conditions)
+    return wind_speeds, wind_directions, weather_conditions
+
+
+def run(years: int, sessions_per_day: int) -> None:
+    rng = random.Random(0)
+    start = datetime(2021, 1, 1, 13, tzinfo=timezone.utc)
+    sessions = [
+        make_session(rng, start + timedelta(days=i // sessions_per_day))
+        for i in range(years * 365 * sessions_per_day)
+    ]
+    print(f"{len(sessions)} sessions of {N_LOCATIONS} locations")
+
+    for label, aggregate in [
+        ("loops", aggregate_with_loops),
+        ("numpy", aggregate_daily_intervals),
+    ]:
+        start_time = time.perf_counter()
+        for weather_objects in sessions:
+            aggregate(weather_objects)
+        elapsed = time.perf_counter() - start_time
+        print(f"{label:>6}: {elapsed * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--sessions-per-day", type=int, default=1)
+    args = parser.parse_args()
+
+    logger.remove()
+    run(args.years, args.sessions_per_day)
@@ -0,0 +1,122 @@
+"""Resident memory while exporting millions of synthetic daily forecasts as NDJSON with
+`stream_rows`, and optionally after loading them all at once for comparison.
+
+The rows are written to a temporary database, not the configured one. The RSS is
+sampled as the chunks are consumed; a streamed export should stay flat. Loading all
+rows takes gigabytes of memory for millions of rows.
+
+Usage:
+    python -m benchmarks.bench_export --rows 2000000 --chunk-size 1000
+    python -m benchmarks.bench_export --rows 300000 --load-all
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import anyio
+from loguru import logger
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.api import exports
+from app.api.exports import ExportFormat, stream_rows
+from app.database import Base
+from app.forecasts import forecast_history_query
+
+N_LOCATIONS = 13
+INSERT_BATCH = 50_000
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE / 2**20
+
+
+def write_rows(db_path: Path, n_rows: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    start = datetime(2000, 1, 1, 13, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        for offset in range(0, n_rows, INSERT_BATCH):
+            rows = []
+            for i in range(offset, min(offset + INSERT_BATCH, n_rows)):
+                issued_at = start + timedelta(days=i // (N_LOCATIONS * 7))
+                rows.append(
+                    dict(
+                        session_id=i // (N_LOCATIONS * 7) + 1,
+                        location_id=i % N_LOCATIONS + 1,
+                        issued_at=issued_at,
+                        date=issued_at + timedelta(days=i // N_LOCATIONS % 7),
+                        summary="Partly cloudy with isolated showers",
+                        minTemp=21,
+                        maxTemp=28,
+                        minHumi=70,
+                        maxHumi=75,
+                        windSpeed=11.25,
+                        windDirection=106.9,
+                        weatherCondition=3,
+                    )
+                )
+            conn.execute(insert(models.ForecastDaily), rows)
+    engine.dispose()
+
+
+async def run(n_rows: int, chunk_size: int, load_all: bool) -> None:
+    exports.EXPORT_CHUNK_SIZE = chunk_size
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "db.sqlite"
+        write_rows(db_path, n_rows)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        make_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        query = forecast_history_query(None)
+
+        async with make_session() as db_session:
+            # warm up the connection before the baseline
+            await db_session.execute(query.limit(1))
+            baseline = rss_mb()
+            print(f"{n_rows} rows, {chunk_size} rows per chunk, RSS {baseline:.1f}MB")
+
+            samples = []
+            n_bytes = 0
+            start = time.perf_counter()
+            async for chunk in stream_rows(db_session, query, ExportFormat.NDJSON):
+                n_bytes += len(chunk)
+                samples.append(rss_mb())
+            elapsed = time.perf_counter() - start
+        # RSS after each tenth of the chunks
+        deciles = [samples[len(samples) * q // 10 - 1] for q in range(1, 11)]
+        print(
+            f"{'streamed':>9}: {n_bytes / 2**20:8.1f}MB in {elapsed:6.1f}s, RSS"
+            f" {' '.join(f'{rss:.1f}' for rss in deciles)}MB"
+            f" (max +{max(samples) - baseline:.1f}MB)"
+        )
+
+        if load_all:
+            async with make_session() as db_session:
+                start = time.perf_counter()
+                rows = (await db_session.execute(query)).all()
+                body = exports._ndjson_chunk(list(rows[0]._fields), rows)
+                elapsed = time.perf_counter() - start
+            print(
+                f"{'loaded':>9}: {len(body) / 2**20:8.1f}MB in {elapsed:6.1f}s, RSS"
+                f" +{rss_mb() - baseline:.1f}MB"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--load-all", action="store_true")
+    args = parser.parse_args()
+
+    logger.remove()
+    anyio.run(run, args.rows, args.chunk_size, args.load_all)
@@ -0,0 +1,62 @@
+"""Time and peak memory to pull the `weathers` array out of the recorded forecast page,
+with the targeted extraction from the raw HTML and with the full soup.
+
+Usage:
+    python -m benchmarks.bench_forecast_extraction --rounds 5
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from loguru import logger
+
+from app import config
+from app.scraper.parsers import HtmlParser
+from app.scraper.scrapers import extract_forecast_from_html, extract_forecast_from_soup
+
+HTML_EXAMPLES = Path(__file__).parent.parent / "tests" / "html_examples"
+
+CORPUS = ["forecast-division-20240606.html"]
+
+
+def measure(func, html: str, rounds: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def run(rounds: int) -> None:
+    for filename in CORPUS:
+        html = (HTML_EXAMPLES / filename).read_text()
+        print(f"{filename} ({len(html) / 1024:.0f} KiB)")
+        elapsed, peak = measure(extract_forecast_from_html, html, rounds)
+        print(
+            f"  {'targeted':>18}: {elapsed * 1000:7.1f}ms peak {peak / 2**20:6.1f}MiB"
+        )
+        for parser in HtmlParser:
+            config.SCRAPER_HTML_PARSER = parser.value
+            elapsed, peak = measure(extract_forecast_from_soup, html, rounds)
+            print(
+                f"  {'soup ' + parser.value:>18}: {elapsed * 1000:7.1f}ms "
+                f"peak {peak / 2**20:6.1f}MiB"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    logger.remove()
+    run(args.rounds)
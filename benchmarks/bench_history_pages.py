@@ -0,0 +1,100 @@
+"""Time to fetch a page of `/v1/forecasts/history` at increasing depths, with the keyset
+of `get_forecast_history` and with an offset.
+
+The forecasts of years of daily sessions, 13 locations with 7 daily forecasts each,
+are written to a temporary database, not the configured one.
+
+Usage:
+    python -m benchmarks.bench_history_pages --days 1095 --limit 100 --rounds 20
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import anyio
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.forecasts import get_forecast_history
+from benchmarks.bench_batch_forecasts import backfill
+
+DEPTHS = [0, 0.25, 0.5, 0.75, 0.99]
+
+
+async def page_with_offset(
+    db_session: AsyncSession, offset: int, limit: int
+) -> list[models.ForecastDaily]:
+    query = (
+        select(models.ForecastDaily)
+        .order_by(models.ForecastDaily.issued_at, models.ForecastDaily.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    return (await db_session.execute(query)).scalars().all()
+
+
+async def run(days: int, limit: int, rounds: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'db.sqlite'}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        make_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        await backfill(make_session, days)
+
+        async with make_session() as db_session:
+            n_rows = await db_session.scalar(
+                select(func.count(models.ForecastDaily.id))
+            )
+            keys = (
+                await db_session.execute(
+                    select(
+                        models.ForecastDaily.issued_at, models.ForecastDaily.id
+                    ).order_by(models.ForecastDaily.issued_at, models.ForecastDaily.id)
+                )
+            ).all()
+        print(f"{n_rows} forecasts, pages of {limit}")
+
+        for depth in DEPTHS:
+            offset = int(n_rows * depth)
+            # the cursor of the page before is the key of its last row
+            cursor = tuple(keys[offset - 1]) if offset else None
+            timings = {"keyset": [], "offset": []}
+            async with make_session() as db_session:
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    by_keyset = await get_forecast_history(
+                        db_session, None, cursor, limit
+                    )
+                    timings["keyset"].append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    by_offset = await page_with_offset(db_session, offset, limit)
+                    timings["offset"].append(time.perf_counter() - start)
+            assert [f.id for f in by_keyset] == [f.id for f in by_offset]
+            print(
+                f"row {offset:>8}: "
+                + ", ".join(
+                    f"{label} {statistics.median(t) * 1000:7.2f}ms"
+                    for label, t in timings.items()
+                )
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    logger.remove()
+    anyio.run(run, args.days, args.limit, args.rounds)
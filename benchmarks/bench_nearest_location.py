@@ -0,0 +1,67 @@
+"""Latency of nearest location lookups with `LocationIndex` at random points over Vanuatu.
+
+Usage:
+    python -m benchmarks.bench_nearest_location --locations 13 1000 --lookups 10000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from loguru import logger
+
+from app import models
+from app.locations import LocationIndex
+
+# bounding box of Vanuatu
+LATITUDES = (-20.5, -13.0)
+LONGITUDES = (166.5, 170.5)
+
+
+def make_locations(rng: random.Random, n: int) -> list[models.Location]:
+    locations = []
+    for location_id in range(1, n + 1):
+        location = models.Location(
+            f"Location {location_id}",
+            rng.uniform(*LATITUDES),
+            rng.uniform(*LONGITUDES),
+        )
+        location.id = location_id
+        locations.append(location)
+    return locations
+
+
+def run(location_counts: list[int], lookups: int, k: int) -> None:
+    rng = random.Random(0)
+    points = [
+        (rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)) for _ in range(lookups)
+    ]
+    for n in location_counts:
+        locations = make_locations(rng, n)
+        start = time.perf_counter()
+        index = LocationIndex(locations)
+        build = time.perf_counter() - start
+
+        timings = []
+        for latitude, longitude in points:
+            start = time.perf_counter()
+            index.nearest(latitude, longitude, k=k, max_distance=100)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(
+            f"{n:>6} locations: build {build * 1000:6.2f}ms, lookup "
+            f"median {statistics.median(timings) * 1e6:6.1f}us "
+            f"p99 {timings[int(len(timings) * 0.99)] * 1e6:6.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--locations", type=int, nargs="+", default=[13, 1000])
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    logger.remove()
+    run(args.locations, args.lookups, args.k)
@@ -0,0 +1,91 @@
+"""Event loop lag while pages are parsed inline, in a thread pool or in a process pool.
+
+A ticker coroutine sleeps for `--tick-ms` in a loop and records how late it wakes up
+while the recorded forecast page is scraped `--pages` times concurrently.
+
+Usage:
+    python -m benchmarks.bench_parse_offload --pages 6 --pool-size 2
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import anyio
+from loguru import logger
+
+from app.scraper.executors import ScraperExecutor, create_executor, run_scraper
+from app.scraper.scrapers import scrape_forecast
+
+HTML_FILE = (
+    Path(__file__).parent.parent
+    / "tests"
+    / "html_examples"
+    / "forecast-division-20240606.html"
+)
+
+
+async def measure(
+    executor_kind: ScraperExecutor, pages: int, pool_size: int, tick_ms: int
+):
+    html = HTML_FILE.read_text()
+    executor = create_executor(executor_kind, pool_size)
+    lags = []
+    done = anyio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await anyio.sleep(tick_ms / 1000)
+            lags.append(time.perf_counter() - start - tick_ms / 1000)
+
+    async def scrape():
+        try:
+            if executor is None:
+                scrape_forecast(html)
+            else:
+                await run_scraper(scrape_forecast, html, executor)
+        except Exception:
+            pass  # only the time spent parsing matters here
+
+    if executor is not None:
+        # warm up every worker of the pool so process start up is not measured
+        async with anyio.create_task_group() as warm_up:
+            for _ in range(pool_size):
+                warm_up.start_soon(scrape)
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(ticker)
+        async with anyio.create_task_group() as scrapers:
+            for _ in range(pages):
+                scrapers.start_soon(scrape)
+        done.set()
+    elapsed = time.perf_counter() - start
+
+    if executor is not None:
+        executor.shutdown()
+
+    lags.sort()
+    print(
+        f"{executor_kind.value:>8}: wall {elapsed * 1000:8.1f}ms "
+        f"lag median {statistics.median(lags) * 1000:7.1f}ms "
+        f"max {lags[-1] * 1000:7.1f}ms over {len(lags)} ticks"
+    )
+
+
+async def run(pages: int, pool_size: int, tick_ms: int) -> None:
+    for executor_kind in ScraperExecutor:
+        await measure(executor_kind, pages, pool_size, tick_ms)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--tick-ms", type=int, default=5)
+    args = parser.parse_args()
+
+    logger.remove()
+    anyio.run(run, args.pages, args.pool_size, args.tick_ms)
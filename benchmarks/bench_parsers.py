@@ -0,0 +1,67 @@
+"""Per page parse time of each HTML parser backend over the recorded pages.
+
+Reports the time to build the soup alone and to run the page's full scraper. The
+forecast page is scraped from the raw HTML, so its soup fallback is timed instead.
+
+Usage:
+    python -m benchmarks.bench_parsers --rounds 5
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from app import config
+from app.scraper.parsers import HtmlParser, make_soup
+from app.scraper.scrapers import (
+    extract_forecast_from_soup,
+    scrape_public_forecast_7_day,
+    scrape_public_forecast_media,
+    scrape_weather_warnings,
+)
+
+HTML_EXAMPLES = Path(__file__).parent.parent / "tests" / "html_examples"
+
+CORPUS = [
+    ("forecast-division-20240606.html", extract_forecast_from_soup),
+    ("public-forecast-7-day.html", scrape_public_forecast_7_day),
+    ("public-forecast-media.html", scrape_public_forecast_media),
+    ("marine-warning.html", scrape_weather_warnings),
+]
+
+
+def time_rounds(rounds: int, func, *args) -> tuple[float, float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def run(rounds: int) -> None:
+    for filename, scraper in CORPUS:
+        html = (HTML_EXAMPLES / filename).read_text()
+        print(f"{filename} ({len(html) / 1024:.0f} KiB)")
+        for parser in HtmlParser:
+            config.SCRAPER_HTML_PARSER = parser.value
+            soup_min, soup_median = time_rounds(rounds, make_soup, html)
+            scrape_min, scrape_median = time_rounds(rounds, scraper, html)
+            print(
+                f"  {parser.value:>12}: soup {soup_median * 1000:7.1f}ms "
+                f"(min {soup_min * 1000:7.1f}ms) "
+                f"{scraper.__name__} {scrape_median * 1000:7.1f}ms "
+                f"(min {scrape_min * 1000:7.1f}ms)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    logger.remove()
+    run(args.rounds)
@@ -0,0 +1,119 @@
+"""Wall-clock time of `process_all_sessions` against a local stand-in for the VMGD website.
+
+The stand-in server answers every path with a recorded page and delays each *new*
+connection by `--handshake-ms` to mimic the TCP+TLS set up cost to vmgd.gov.vu.
+The "per-fetch" run disables keep-alive on the client which reproduces the old
+behaviour of opening a new `httpx.AsyncClient` for every page; both runs go
+through the same host rate limiter.
+
+NOTE sessions are written to the configured database so run this against a
+development database only.
+
+Usage:
+    python -m benchmarks.bench_scraper_client --rounds 5 --handshake-ms 150
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+import anyio
+import httpx
+from loguru import logger
+
+from app import config
+from app.database import Base, async_engine
+from app.scraper.main import process_all_sessions
+from app.scraper.utils import HostRateLimiter, RateLimitedTransport, create_client
+
+HTML_FILE = (
+    Path(__file__).parent.parent
+    / "tests"
+    / "html_examples"
+    / "forecast-division-20240606.html"
+)
+
+
+async def serve_stand_in(handshake_ms: int, body: bytes) -> asyncio.AbstractServer:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        await asyncio.sleep(handshake_ms / 1000)
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                if not request:
+                    break
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: text/html; charset=utf-8\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+                if b"connection: close" in request.lower():
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def run(rounds: int, handshake_ms: int) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    server = await serve_stand_in(handshake_ms, HTML_FILE.read_bytes())
+    host, port = server.sockets[0].getsockname()[:2]
+    config.VMGD_BASE_URL = f"http://{host}:{port}/vmgd/index.php"
+
+    def per_fetch_client() -> httpx.AsyncClient:
+        limiter = HostRateLimiter(
+            rate=config.VMGD_REQUESTS_PER_SECOND,
+            max_in_flight=config.VMGD_MAX_REQUESTS_IN_FLIGHT,
+        )
+        return httpx.AsyncClient(
+            transport=RateLimitedTransport(
+                httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(max_keepalive_connections=0)
+                ),
+                limiter,
+            ),
+            timeout=config.VMGD_TIMEOUT,
+            headers={"User-Agent": config.USER_AGENT},
+            follow_redirects=True,
+        )
+
+    results = {}
+    for label, make_client in [
+        ("per-fetch", per_fetch_client),
+        ("pooled", create_client),
+    ]:
+        timings = []
+        for _ in range(rounds):
+            async with make_client() as client:
+                start = time.perf_counter()
+                await process_all_sessions(client)
+                timings.append(time.perf_counter() - start)
+        results[label] = timings
+
+    server.close()
+    await server.wait_closed()
+
+    for label, timings in results.items():
+        print(
+            f"{label:>10}: median {statistics.median(timings) * 1000:8.1f}ms "
+            f"min {min(timings) * 1000:8.1f}ms over {rounds} rounds"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--handshake-ms", type=int, default=150)
+    args = parser.parse_args()
+
+    logger.remove()
+    anyio.run(run, args.rounds, args.handshake_ms)
@@ -0,0 +1,120 @@
+"""Time to render the response of `/v1/forecasts` for all locations through the
+Pydantic response models and with the serializers writing rows straight to JSON.
+
+The rows are the 13 locations with 7 daily forecasts each of the recorded forecast
+page, built in memory as they are loaded from the database.
+
+Usage:
+    python -m benchmarks.bench_serialization --rounds 200
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import anyio
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from loguru import logger
+
+from app import models
+from app.api import responses, serializers
+
+N_LOCATIONS = 13
+N_DAYS = 7
+
+
+def make_forecasts(issued_at: datetime) -> list[models.ForecastDaily]:
+    session = models.Session("forecast_general")
+    session.fetched_at = issued_at
+    forecasts = []
+    for location_id in range(1, N_LOCATIONS + 1):
+        location = models.Location(f"Location {location_id}", -17.7, 168.3)
+        location.id = location_id
+        for d in range(N_DAYS):
+            forecast = models.ForecastDaily(
+                session_id=1,
+                location_id=location_id,
+                issued_at=issued_at,
+                date=issued_at + timedelta(days=d),
+                summary="Partly cloudy with isolated showers",
+                minTemp=21,
+                maxTemp=28,
+                minHumi=70,
+                maxHumi=75,
+                windSpeed=11.25,
+                windDirection=106.9,
+                weatherCondition=3,
+            )
+            forecast.location = location
+            forecast.session = session
+            forecasts.append(forecast)
+    return forecasts
+
+
+async def render_with_pydantic(forecasts: list[models.ForecastDaily]) -> bytes:
+    # as the endpoint did before the serializers
+    data = [
+        responses.ForecastResponseData(
+            location=forecast.location.id,
+            date=forecast.date,
+            summary=forecast.summary,
+            minTemp=forecast.minTemp,
+            maxTemp=forecast.maxTemp,
+            minHumi=forecast.minHumi,
+            maxHumi=forecast.maxHumi,
+            windSpeed=forecast.windSpeed,
+            windDirection=forecast.windDirection,
+            weatherCondition=forecast.weatherCondition,
+        )
+        for forecast in forecasts
+    ]
+    response = responses.VmgdApiForecastResponse(
+        meta=responses.VmgdApiResponseMeta(
+            issued=forecasts[0].issued_at.replace(microsecond=0),
+            fetched=forecasts[0].session.fetched_at.replace(microsecond=0),
+        ),
+        data=data,
+    )
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+async def render_with_serializers(forecasts: list[models.ForecastDaily]) -> bytes:
+    return serializers.dump_vmgd_api_response(
+        list(map(serializers.forecast_data, forecasts)),
+        issued=forecasts[0].issued_at,
+        fetched=forecasts[0].session.fetched_at,
+    )
+
+
+async def run(rounds: int) -> None:
+    forecasts = make_forecasts(datetime(2024, 6, 4, 18, tzinfo=timezone.utc))
+    print(f"{len(forecasts)} forecasts per response")
+    results = {}
+    bodies = set()
+    for label, render in [
+        ("pydantic", render_with_pydantic),
+        ("serializers", render_with_serializers),
+    ]:
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            body = await render(forecasts)
+            timings.append(time.perf_counter() - start)
+        bodies.add(body)
+        results[label] = statistics.median(timings)
+        print(
+            f"{label:>12}: median {results[label] * 1000:8.3f}ms over {rounds} rounds"
+        )
+    assert len(bodies) == 1, "the responses differ"
+    print(f"{'speedup':>12}: {results['pydantic'] / results['serializers']:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    logger.remove()
+    anyio.run(run, args.rounds)
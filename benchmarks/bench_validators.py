@@ -0,0 +1,70 @@
+"""Time to validate the `weathers` array of the recorded forecast page with the
+Cerberus validators and with the compiled validators.
+
+Usage:
+    python -m benchmarks.bench_validators --rounds 50
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from cerberus_list_schema import Validator as ListValidator
+from loguru import logger
+
+from app.scraper.schemas import process_forecast_schema
+from app.scraper.scrapers import extract_forecast_from_html
+from app.scraper.validators import CompiledListValidator
+
+HTML_FILE = (
+    Path(__file__).parent.parent
+    / "tests"
+    / "html_examples"
+    / "forecast-division-20240606.html"
+)
+
+
+def validate_cerberus(weathers: list) -> list:
+    # the old scraper built a validator per page
+    validator = ListValidator(process_forecast_schema)
+    errors = []
+    for w in weathers:
+        if not validator.validate(w):
+            errors.append(validator.errors)
+    return errors
+
+
+_compiled = CompiledListValidator(process_forecast_schema)
+
+
+def validate_compiled(weathers: list) -> list:
+    return list(filter(None, map(_compiled.errors, weathers)))
+
+
+def run(rounds: int) -> None:
+    weathers, _ = extract_forecast_from_html(HTML_FILE.read_text())
+    results = {}
+    for label, func in [
+        ("cerberus", validate_cerberus),
+        ("compiled", validate_compiled),
+    ]:
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func(weathers)
+            timings.append(time.perf_counter() - start)
+        results[label] = statistics.median(timings)
+        print(
+            f"{label:>10}: median {results[label] * 1000:8.3f}ms over {rounds} rounds"
+        )
+    print(f"{'speedup':>10}: {results['cerberus'] / results['compiled']:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    logger.remove()
+    run(args.rounds)
@@ -0,0 +1,27 @@
+import argparse
+from pathlib import Path
+
+from app.arrow_export import ArrowFormat, export_history
+from app.config import EXPORT_PATH
+from app.database import async_read_session
+
+import anyio
+
+
+async def export(directory: Path, export_format: ArrowFormat):
+    async with async_read_session() as db_session:
+        await export_history(db_session, directory, export_format)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Append the sessions completed since the last export to "
+        "partitioned Parquet or Arrow IPC files"
+    )
+    parser.add_argument(
+        "--format", choices=[f.value for f in ArrowFormat], default="parquet"
+    )
+    parser.add_argument("--directory", type=Path, default=EXPORT_PATH)
+    args = parser.parse_args()
+
+    anyio.run(export, args.directory, ArrowFormat(args.format))
@@ -6,21 +6,33 @@ from fastapi.testclient import TestClient
 
 from app.database import Base, async_engine, async_session, engine
 from app.api.main import app
+from app.api.cache import response_cache
+from app.generation import generation
+from app.locations import location_registry
 from tests.factories import _Session
 
 
+def _clear_caches() -> None:
+    location_registry.clear()
+    response_cache.clear()
+    generation.reset()
+
+
 @pytest_asyncio.fixture
 async def async_db_session():
+    _clear_caches()
     async with async_session() as session:
         async with async_engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         yield session
+        await session.close()
         async with async_engine.begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
 
 
 @pytest.fixture
 def db() -> Generator:
+    _clear_caches()
     Base.metadata.create_all(bind=engine)
     with _Session() as db_session:
         try:
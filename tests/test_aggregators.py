@@ -0,0 +1,212 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from app import models
+from app.forecasts import get_latest_forecast_intervals
+from app.scraper.aggregators import (
+    aggregate_daily_intervals,
+    aggregate_forecast_week,
+    aggregate_weather_warnings,
+)
+from app.scraper.pages import PagePath
+from app.scraper.schemas import MISSING_VALUE, WeatherObject
+from app.scraper.scrapers import NO_CURRENT_WARNING
+from app.utils.datetime import as_vu
+from app.scraper.scrapers import scrape_forecast
+from app.scraper_sessions import complete_session
+
+HTML_EXAMPLES = Path(__file__).parent / "html_examples"
+
+
+async def _aggregate_recorded_forecast(db_session, edit=None) -> models.Session:
+    result = scrape_forecast(
+        (HTML_EXAMPLES / "forecast-division-20240606.html").read_text()
+    )
+    if edit is not None:
+        edit(result.raw_data)
+    # the 7-day page is not recorded so build it from the same values
+    week = [
+        dict(
+            location=w[0],
+            date=date,
+            summary=f"{w[0]} {date}",
+            minTemp=min_temp,
+            maxTemp=max_temp,
+        )
+        for w in result.raw_data
+        for date, min_temp, max_temp in zip(w[3], w[4], w[5])
+    ]
+    session = models.Session("forecast_general")
+    db_session.add(session)
+    await db_session.flush()
+    pages = [
+        models.Page(
+            PagePath.FORECAST_MAP, result.raw_data, session.id, result.issued_at
+        ),
+        models.Page(PagePath.FORECAST_WEEK, week, session.id, result.issued_at),
+    ]
+    await aggregate_forecast_week(db_session, session, pages)
+    await complete_session(db_session, session)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_aggregate_forecast_week_saves_intervals(async_db_session):
+    session = await _aggregate_recorded_forecast(async_db_session)
+
+    intervals = await get_latest_forecast_intervals(async_db_session, None)
+    assert len(intervals) == 13
+    assert {i.session_id for i in intervals} == {session.id}
+
+    location = (
+        await async_db_session.execute(
+            select(models.Location).where(models.Location.name == "Anelcauhat")
+        )
+    ).scalar()
+    interval = next(i for i in intervals if i.location_id == location.id)
+    # `Wed 05 06:00` in VU time
+    assert interval.times[1].isoformat() == "2024-06-04T19:00:00+00:00"
+    assert interval.times[-1].isoformat() == "2024-06-11T13:00:00+00:00"
+    assert interval.weather_conditions[:4] == [3, 3, 3, 6]
+    assert interval.wind_directions[:2] == [90.0, 112.5]
+    assert interval.wind_speeds[-1] == 5
+    assert interval.wind_speeds[11] == -999
+
+
+@pytest.mark.asyncio
+async def test_aggregate_forecast_week_joins_7_day_forecasts(async_db_session):
+    await _aggregate_recorded_forecast(async_db_session)
+
+    forecasts = (
+        (await async_db_session.execute(select(models.ForecastDaily))).scalars().all()
+    )
+    assert len(forecasts) == 13 * 7
+    for forecast in forecasts:
+        date_string = as_vu(forecast.date).strftime("%a %d")
+        assert forecast.summary == f"{forecast.location.name} {date_string}"
+
+
+@pytest.mark.asyncio
+async def test_aggregate_forecast_week_saves_daily_wind(async_db_session):
+    await _aggregate_recorded_forecast(async_db_session)
+
+    forecasts = (
+        (
+            await async_db_session.execute(
+                select(models.ForecastDaily)
+                .join(models.ForecastDaily.location)
+                .where(models.Location.name == "Anelcauhat")
+                .order_by(models.ForecastDaily.date)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert len(forecasts) == 7
+    # Wed 05 has 4 values
+    assert forecasts[0].windSpeed == 11.25
+    assert forecasts[0].windDirection == 106.9
+    assert forecasts[0].weatherCondition == 3
+    # the single value of Sat 08 is missing
+    assert forecasts[3].windSpeed is None
+    assert forecasts[3].windDirection is None
+    assert forecasts[3].weatherCondition is None
+    assert forecasts[4].windSpeed == 15
+
+
+@pytest.mark.asyncio
+async def test_aggregate_forecast_week_drops_intervals_off_the_dates(async_db_session):
+    def edit(raw_data):
+        # the last interval of the first location falls after the last date
+        raw_data[0][-1][-1] = "Thu 13 00:00"
+
+    await _aggregate_recorded_forecast(async_db_session, edit)
+
+    forecasts = (
+        (await async_db_session.execute(select(models.ForecastDaily))).scalars().all()
+    )
+    assert len(forecasts) == 13 * 7
+    intervals = await get_latest_forecast_intervals(async_db_session, None)
+    lengths = sorted(len(i.times) for i in intervals)
+    assert lengths[0] == lengths[-1] - 1
+    assert lengths[1:] == [lengths[-1]] * 12
+    assert all(
+        len(i.times) == len(i.wind_speeds) == len(i.weather_conditions)
+        for i in intervals
+    )
+
+
+def test_aggregate_daily_intervals():
+    start = datetime(2024, 6, 4, 13, tzinfo=timezone.utc)
+    dates = [start, start + timedelta(days=1)]
+    wo = WeatherObject(
+        location="Port Vila",
+        latitude=-17.7,
+        longitude=168.3,
+        dates=dates,
+        minTemp=[],
+        maxTemp=[],
+        minHumi=[],
+        maxHumi=[],
+        conds=[6, 3, 6, 3, MISSING_VALUE],
+        wd=[350, 10, 350, 10, 90],
+        ws=[10, 20, MISSING_VALUE, 30, 5],
+        dtFlag=0,
+        currentDate="",
+        dateHour=[start + timedelta(hours=6 * i) for i in range(5)],
+    )
+    wind_speeds, wind_directions, weather_conditions = aggregate_daily_intervals(
+        [wo, wo]
+    )
+    assert wind_speeds == [[20.0, 5.0]] * 2
+    # the circular mean of 350 and 10 is north, not 180
+    assert wind_directions == [[0.0, 90.0]] * 2
+    # ties go to the lower condition and a day of missing values is None
+    assert weather_conditions == [[3, None]] * 2
+
+    # locations with fewer values
+    short = WeatherObject(**{**wo.__dict__})
+    short.conds, short.wd, short.ws = wo.conds[:2], wo.wd[:2], wo.ws[:2]
+    short.dateHour = wo.dateHour[:2]
+    wind_speeds, _, weather_conditions = aggregate_daily_intervals([short, wo])
+    assert wind_speeds == [[15.0, None], [20.0, 5.0]]
+    assert weather_conditions == [[3, None], [3, None]]
+
+
+@pytest.mark.asyncio
+async def test_aggregate_weather_warnings(async_db_session):
+    issued_at = datetime(2023, 5, 2, tzinfo=timezone.utc)
+    session = models.Session("warning_marine")
+    async_db_session.add(session)
+    await async_db_session.flush()
+    raw_data = [
+        {"date": "Issued at: Tuesday 2nd May, 2023", "body": "Strong wind warning"},
+        {"date": "Issued at: Friday 24th March, 2023", "body": "Gale warning"},
+    ]
+    page = models.Page(PagePath.WARNING_MARINE, raw_data, session.id, issued_at)
+    await aggregate_weather_warnings(async_db_session, session, [page])
+    page = models.Page(
+        PagePath.WARNING_MARINE, NO_CURRENT_WARNING, session.id, issued_at
+    )
+    await aggregate_weather_warnings(async_db_session, session, [page])
+
+    warnings = (
+        (
+            await async_db_session.execute(
+                select(models.WeatherWarning).order_by(models.WeatherWarning.id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    assert [w.body for w in warnings] == [
+        "Strong wind warning",
+        "Gale warning",
+        None,
+    ]
+    assert [w.no_current_warning for w in warnings] == [False, False, True]
+    assert warnings[0].date.isoformat() == "2023-05-01T13:00:00+00:00"
+    assert {w.session_id for w in warnings} == {session.id}
@@ -0,0 +1,156 @@
+from datetime import datetime, timezone
+
+import httpx
+import pyarrow.dataset as ds
+import pytest
+
+from app import models
+from app import arrow_export
+from app.api import endpoints
+from app.api.main import app
+from app.arrow_export import ArrowFormat, export_history, list_export_files
+from app.scraper_sessions import complete_session
+from tests.test_aggregators import _aggregate_recorded_forecast
+
+
+async def _save_warning(db_session) -> None:
+    date = datetime(2023, 5, 1, 13, tzinfo=timezone.utc)
+    session = models.Session("warning_marine")
+    db_session.add(session)
+    await db_session.flush()
+    db_session.add(models.WeatherWarning(session.id, date, date, "Strong wind"))
+    await complete_session(db_session, session)
+
+
+@pytest.mark.asyncio
+async def test_export_history_appends_new_sessions(async_db_session, tmp_path):
+    await _aggregate_recorded_forecast(async_db_session)
+    await _save_warning(async_db_session)
+
+    exported = await export_history(async_db_session, tmp_path, ArrowFormat.PARQUET)
+    assert exported == {"forecasts": 13 * 7, "warnings": 1}
+    files = list_export_files(tmp_path)
+    assert (tmp_path / "forecasts" / "year=2024" / "month=6" / "location_id=1").is_dir()
+    assert (
+        tmp_path / "warnings" / "year=2023" / "month=5" / "name=warning_marine"
+    ).is_dir()
+    forecasts = ds.dataset(tmp_path / "forecasts", partitioning="hive").to_table()
+    assert forecasts.num_rows == 13 * 7
+    assert {"location", "latitude", "fetched_at", "minTemp"} <= set(
+        forecasts.column_names
+    )
+    assert sorted(set(forecasts.column("month").to_pylist())) == [6]
+
+    # nothing new
+    exported = await export_history(async_db_session, tmp_path, ArrowFormat.PARQUET)
+    assert exported == {"forecasts": 0, "warnings": 0}
+    assert list_export_files(tmp_path) == files
+
+    session = await _aggregate_recorded_forecast(async_db_session)
+    exported = await export_history(async_db_session, tmp_path, ArrowFormat.PARQUET)
+    assert exported == {"forecasts": 13 * 7, "warnings": 0}
+    new_files = list_export_files(tmp_path)
+    # appended next to the files of the first export
+    assert set(files) < set(new_files)
+    forecasts = ds.dataset(tmp_path / "forecasts", partitioning="hive").to_table()
+    assert forecasts.num_rows == 2 * 13 * 7
+    assert forecasts.column("session_id").to_pylist().count(session.id) == 13 * 7
+
+
+@pytest.mark.asyncio
+async def test_export_history_in_chunks_with_legacy_sessions(
+    async_db_session, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(arrow_export, "EXPORT_CHUNK_SIZE", 10)
+    legacy = await _aggregate_recorded_forecast(async_db_session)
+    # completed before sessions had a status
+    legacy.status = None
+    await _aggregate_recorded_forecast(async_db_session)
+    await async_db_session.flush()
+
+    exported = await export_history(async_db_session, tmp_path, ArrowFormat.PARQUET)
+    assert exported == {"forecasts": 2 * 13 * 7, "warnings": 0}
+    forecasts = ds.dataset(tmp_path / "forecasts", partitioning="hive").to_table()
+    assert forecasts.num_rows == 2 * 13 * 7
+    assert forecasts.column("session_id").to_pylist().count(legacy.id) == 13 * 7
+    assert sorted(set(forecasts.column("location_id").to_pylist())) == list(
+        range(1, 14)
+    )
+
+
+@pytest.mark.asyncio
+async def test_export_history_failed_table_does_not_duplicate(
+    async_db_session, tmp_path, monkeypatch
+):
+    await _aggregate_recorded_forecast(async_db_session)
+    await _save_warning(async_db_session)
+    _, schema, partitions = arrow_export.TABLES["warnings"]
+
+    def fail(after, until):
+        raise RuntimeError("warnings failed")
+
+    monkeypatch.setitem(arrow_export.TABLES, "warnings", (fail, schema, partitions))
+    with pytest.raises(RuntimeError):
+        await export_history(async_db_session, tmp_path, ArrowFormat.PARQUET)
+    assert set(arrow_export.read_watermarks(tmp_path, ArrowFormat.PARQUET)) == {
+        "forecasts"
+    }
+
+    monkeypatch.undo()
+    exported = await export_history(async_db_session, tmp_path, ArrowFormat.PARQUET)
+    assert exported == {"forecasts": 0, "warnings": 1}
+    forecasts = ds.dataset(tmp_path / "forecasts", partitioning="hive").to_table()
+    assert forecasts.num_rows == 13 * 7
+    warnings = ds.dataset(tmp_path / "warnings", partitioning="hive").to_table()
+    assert warnings.num_rows == 1
+
+
+@pytest.mark.asyncio
+async def test_export_history_to_arrow_ipc(async_db_session, tmp_path):
+    await _aggregate_recorded_forecast(async_db_session)
+
+    await export_history(async_db_session, tmp_path, ArrowFormat.ARROW)
+    assert all(path.suffix == ".arrow" for path in list_export_files(tmp_path))
+    forecasts = ds.dataset(
+        tmp_path / "forecasts", format="ipc", partitioning="hive"
+    ).to_table()
+    assert forecasts.num_rows == 13 * 7
+
+    with pytest.raises(ValueError):
+        await export_history(async_db_session, tmp_path, ArrowFormat.PARQUET)
+
+
+@pytest.mark.asyncio
+async def test_export_files_endpoints(async_db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(endpoints, "EXPORT_PATH", tmp_path)
+    await _save_warning(async_db_session)
+    await export_history(async_db_session, tmp_path, ArrowFormat.PARQUET)
+    await async_db_session.commit()
+    (tmp_path / "secret.txt").write_text("secret")
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/v1/export/files")
+        assert response.status_code == 200
+        files = response.json()
+        assert len(files) == 1
+        path = files[0]["path"]
+        assert path.startswith("warnings/year=2023/month=5/name=warning_marine/part-")
+
+        response = await client.get(
+            "/v1/export/files", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert response.status_code == 304
+
+        response = await client.get(f"/v1/export/files/{path}")
+        assert response.status_code == 200
+        assert response.content == (tmp_path / path).read_bytes()
+        assert len(response.content) == files[0]["size"]
+        response = await client.get(
+            f"/v1/export/files/{path}",
+            headers={"If-Modified-Since": response.headers["last-modified"]},
+        )
+        assert response.status_code == 304
+
+        for path in ["secret.txt", "_export.json", "warnings/../secret.txt"]:
+            response = await client.get(f"/v1/export/files/{path}")
+            assert response.status_code == 404
@@ -0,0 +1,122 @@
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.api.cache import response_cache
+from app.api.main import app
+from app.database import async_read_engine
+from app.generation import generation
+from tests.test_aggregators import _aggregate_recorded_forecast
+
+
+@pytest.mark.asyncio
+async def test_forecasts_not_modified(async_db_session, monkeypatch):
+    monkeypatch.setattr(generation, "check_interval", 0)
+    await _aggregate_recorded_forecast(async_db_session)
+    await async_db_session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        params = {"locationId": 1}
+        response = await client.get("/v1/forecasts", params=params)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        last_modified = response.headers["last-modified"]
+        assert etag.startswith('"') and last_modified.endswith(" GMT")
+
+        # answered from the cached validators
+        response = await client.get(
+            "/v1/forecasts", params=params, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        # answered before the forecasts are read
+        response_cache.clear()
+        event.listen(async_read_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.get(
+                "/v1/forecasts", params=params, headers={"If-None-Match": etag}
+            )
+        finally:
+            event.remove(async_read_engine.sync_engine, "before_cursor_execute", record)
+        assert response.status_code == 304
+        assert not [s for s in statements if "forecast_daily" in s]
+
+        response = await client.get(
+            "/v1/forecasts",
+            params=params,
+            headers={"If-Modified-Since": last_modified},
+        )
+        assert response.status_code == 304
+        response = await client.get(
+            "/v1/forecasts",
+            params=params,
+            headers={"If-Modified-Since": "Mon, 03 Jun 2024 00:00:00 GMT"},
+        )
+        assert response.status_code == 200
+
+        response = await client.get("/v1/forecasts", params={"locationId": 2})
+        assert response.headers["etag"] != etag
+        response = await client.get("/v1/forecasts/intervals", params=params)
+        assert response.headers["etag"] not in {etag, None}
+        response = await client.get("/v1/locations")
+        assert "etag" in response.headers
+
+        # a new session is a new etag
+        await _aggregate_recorded_forecast(async_db_session)
+        await async_db_session.commit()
+        response = await client.get(
+            "/v1/forecasts", params=params, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_forecasts_history_not_modified(async_db_session, monkeypatch):
+    monkeypatch.setattr(generation, "check_interval", 0)
+    await _aggregate_recorded_forecast(async_db_session)
+    await async_db_session.commit()
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        params = {"limit": 50}
+        response = await client.get("/v1/forecasts/history", params=params)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert response.headers["last-modified"].endswith(" GMT")
+        next_params = {**params, "cursor": response.json()["meta"]["next"]}
+
+        response = await client.get(
+            "/v1/forecasts/history", params=params, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+        # every page has its own etag
+        response = await client.get(
+            "/v1/forecasts/history", params=next_params, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+        response = await client.get("/v1/export/forecasts")
+        export_etag = response.headers["etag"]
+        response = await client.get(
+            "/v1/export/forecasts", headers={"If-None-Match": export_etag}
+        )
+        assert response.status_code == 304
+
+        # a new session adds to the history
+        await _aggregate_recorded_forecast(async_db_session)
+        await async_db_session.commit()
+        response = await client.get(
+            "/v1/forecasts/history", params=params, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
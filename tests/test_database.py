@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import models
+from app.database import async_read_session
+
+
+@pytest.mark.asyncio
+async def test_writer_connection_pragmas(async_db_session):
+    async def pragma(name):
+        return (await async_db_session.execute(text(f"PRAGMA {name}"))).scalar()
+
+    assert await pragma("journal_mode") == "wal"
+    # NORMAL
+    assert await pragma("synchronous") == 1
+    assert await pragma("cache_size") == -65536
+    # MEMORY
+    assert await pragma("temp_store") == 2
+
+
+@pytest.mark.asyncio
+async def test_read_session_sees_commits_and_rejects_writes(async_db_session):
+    async_db_session.add(models.Session("forecast_general"))
+    await async_db_session.commit()
+
+    async with async_read_session() as db_session:
+        count = (
+            await db_session.execute(text("SELECT count(*) FROM session"))
+        ).scalar()
+        assert count == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            await db_session.execute(text("DELETE FROM session"))
@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app import models
+from app.api import exports
+from app.api.exports import ExportFormat, stream_rows
+from app.api.main import app
+from app.forecasts import forecast_history_query
+from tests.test_aggregators import _aggregate_recorded_forecast
+
+
+@pytest.mark.asyncio
+async def test_export_forecasts(async_db_session):
+    await _aggregate_recorded_forecast(async_db_session)
+    await _aggregate_recorded_forecast(async_db_session)
+    await async_db_session.commit()
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/v1/export/forecasts")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = list(map(json.loads, response.text.splitlines()))
+        # the history of both sessions
+        assert len(rows) == 2 * 13 * 7
+        assert rows[0]["date"] == "2024-06-05T00:00:00+11:00"
+        assert [r["date"] for r in rows] == sorted(r["date"] for r in rows)
+
+        response = await client.get(
+            "/v1/export/forecasts",
+            params={
+                "format": "csv",
+                "locationIds": "1",
+                "start": "2024-06-06T00:00:00+11:00",
+                "end": "2024-06-07T00:00:00+11:00",
+            },
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="forecasts.csv"' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 2 * 2
+        assert {r["location"] for r in rows} == {"1"}
+        assert rows[0]["date"] == "2024-06-06T00:00:00+11:00"
+        assert list(rows[0])[:4] == ["session_id", "issued_at", "location", "date"]
+
+        response = await client.get("/v1/export/forecasts", params={"format": "xml"})
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_export_weather_warnings(async_db_session):
+    date = datetime(2023, 5, 1, 13, tzinfo=timezone.utc)
+    for name in ["warning_marine", "warning_bulletin"]:
+        session = models.Session(name)
+        async_db_session.add(session)
+        await async_db_session.flush()
+        async_db_session.add(models.WeatherWarning(session.id, date, date, name))
+    await async_db_session.commit()
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(
+            "/v1/export/warnings", params={"name": "warning_marine"}
+        )
+        assert response.status_code == 200
+        assert list(map(json.loads, response.text.splitlines())) == [
+            {
+                "session_id": 1,
+                "name": "warning_marine",
+                "issued_at": "2023-05-02T00:00:00+11:00",
+                "date": "2023-05-02T00:00:00+11:00",
+                "body": "warning_marine",
+            }
+        ]
+
+        response = await client.get(
+            "/v1/export/warnings", params={"format": "csv", "end": "2023-05-01"}
+        )
+        assert response.text.splitlines() == ["session_id,name,issued_at,date,body"]
+
+
+@pytest.mark.asyncio
+async def test_stream_rows_in_chunks(async_db_session, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_CHUNK_SIZE", 10)
+    await _aggregate_recorded_forecast(async_db_session)
+
+    chunks = [
+        chunk
+        async for chunk in stream_rows(
+            async_db_session, forecast_history_query(None), ExportFormat.CSV
+        )
+    ]
+    # the header and 91 rows
+    assert len(chunks) == 1 + 10
+    assert b"".join(chunks).count(b"\n") == 1 + 91
+
+
+@pytest.mark.asyncio
+async def test_forecast_history_query_is_not_sorted(async_db_session):
+    query = forecast_history_query(None, datetime(2024, 6, 5, tzinfo=timezone.utc))
+    compiled = query.compile(compile_kwargs={"literal_binds": True})
+    conn = await async_db_session.connection()
+    plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+    details = [detail for *_, detail in plan]
+    # rows come out of the index so none are held back for a sort
+    assert not any("TEMP B-TREE" in detail for detail in details), details
@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app import models, scraper_sessions
+from app.api.main import app
+from app.database import async_read_engine
+from app.forecasts import get_latest_forecasts, interpolate_forecasts
+from app.locations import LocationIndex
+from tests.test_aggregators import _aggregate_recorded_forecast
+
+LOCATIONS = [
+    ("Port Vila", -17.7333, 168.3273),
+    ("Luganville", -15.5126, 167.1766),
+    ("Lenakel", -19.5333, 169.2667),
+    ("Lakatoro", -16.0998, 167.4164),
+    ("Sola", -13.8833, 167.55),
+]
+DATE = datetime(2024, 6, 5, 13, tzinfo=timezone.utc)
+
+
+def _index() -> LocationIndex:
+    locations = []
+    for location_id, (name, latitude, longitude) in enumerate(LOCATIONS, 1):
+        location = models.Location(name, latitude, longitude)
+        location.id = location_id
+        locations.append(location)
+    return LocationIndex(locations)
+
+
+def _forecast(location_id: int, date: datetime, temp: int) -> models.ForecastDaily:
+    return models.ForecastDaily(
+        location_id=location_id,
+        date=date,
+        minTemp=temp,
+        maxTemp=temp + 8,
+        minHumi=70,
+        maxHumi=80,
+    )
+
+
+def test_idw_weights_cached_per_query_cell():
+    index = _index()
+    weights = index.idw_weights(-17.741, 168.312)
+    assert index.idw_weights(-17.739, 168.308) is weights
+    assert index.idw_weights(-17.8, 168.312) is not weights
+    # only the 4 nearest locations are weighted; Sola is the furthest
+    assert weights[4] == 0
+    assert weights.argmax() == 0
+
+
+def test_interpolate_forecasts():
+    index = _index()
+    next_date = DATE + timedelta(days=1)
+    forecasts = [_forecast(i, DATE, 20 + i) for i in range(1, 6)] + [
+        _forecast(2, next_date, 25),
+        _forecast(3, next_date, 15),
+    ]
+
+    # at a location its own forecast takes (almost) all of the weight
+    data = interpolate_forecasts(forecasts, index, -17.7333, 168.3273)
+    assert [d["date"] for d in data] == [DATE, next_date]
+    assert data[0]["minTemp"] == 21.0
+    assert data[0]["maxHumi"] == 80.0
+    # the missing forecast of Port Vila gives its weight to the others
+    assert 15 < data[1]["minTemp"] < 25
+
+    between = interpolate_forecasts(forecasts, index, -18.6, 168.8)
+    assert 21 < between[0]["minTemp"] < 23
+
+
+@pytest.mark.asyncio
+async def test_interpolated_forecasts_endpoint(async_db_session):
+    await _aggregate_recorded_forecast(async_db_session)
+    await async_db_session.commit()
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(
+            "/v1/forecasts/interpolated", params={"lat": -17.74, "lon": 168.31}
+        )
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert len(data) == 7
+        assert data[0]["date"] == "2024-06-05T00:00:00+11:00"
+        assert set(data[0]) == {"date", "minTemp", "maxTemp", "minHumi", "maxHumi"}
+
+        response = await client.get(
+            "/v1/forecasts/interpolated",
+            params={"lat": 0, "lon": 0, "maxDistance": 100},
+        )
+        assert response.status_code == 404
+
+        response = await client.get("/v1/forecasts/interpolated")
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_forecasts_batch_endpoint(async_db_session, monkeypatch):
+    # completed on the day the recorded page was issued
+    monkeypatch.setattr(scraper_sessions, "now", lambda: DATE - timedelta(days=1))
+    await _aggregate_recorded_forecast(async_db_session)
+    await async_db_session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        event.listen(async_read_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.get("/v1/forecasts/batch")
+        finally:
+            event.remove(async_read_engine.sync_engine, "before_cursor_execute", record)
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert [d["location"] for d in data] == list(range(1, 14))
+        assert all(len(d["forecasts"]) == 7 for d in data)
+        assert {f["location"] for f in data[2]["forecasts"]} == {3}
+        assert len([s for s in statements if "FROM forecast_daily" in s]) == 1
+
+        response = await client.get(
+            "/v1/forecasts/batch",
+            params={
+                "locationIds": "2,1",
+                "start": "2024-06-06T00:00:00+11:00",
+                "end": "2024-06-08T00:00:00+11:00",
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert [d["location"] for d in data] == [1, 2]
+        assert [f["date"] for f in data[0]["forecasts"]] == [
+            "2024-06-06T00:00:00+11:00",
+            "2024-06-07T00:00:00+11:00",
+            "2024-06-08T00:00:00+11:00",
+        ]
+        # the same forecasts as one location at a time
+        single = await client.get("/v1/forecasts", params={"locationId": 1})
+        assert single.json()["data"][1:4] == data[0]["forecasts"]
+
+        # no session as of `start`
+        response = await client.get(
+            "/v1/forecasts/batch", params={"start": "2024-05-01T00:00:00+11:00"}
+        )
+        assert response.status_code == 404
+
+        response = await client.get(
+            "/v1/forecasts/batch", params={"locationIds": "1,99"}
+        )
+        assert response.status_code == 400
+        response = await client.get(
+            "/v1/forecasts/batch", params={"locationIds": "one"}
+        )
+        assert response.status_code == 400
+        response = await client.get(
+            "/v1/forecasts/batch",
+            params={"start": "2024-06-08T00:00:00", "end": "2024-06-06T00:00:00"},
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_forecasts_of_a_date_before_a_later_session_of_the_day(
+    async_db_session, monkeypatch
+):
+    day = datetime(2024, 6, 5, tzinfo=timezone.utc)
+    sessions = []
+    for hour in [1, 20]:
+        completed_at = day + timedelta(hours=hour)
+        monkeypatch.setattr(scraper_sessions, "now", lambda: completed_at)
+        sessions.append(await _aggregate_recorded_forecast(async_db_session))
+    await async_db_session.commit()
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        for hour in [2, 21]:
+            params = {
+                "locationId": 1,
+                "date": (day + timedelta(hours=hour)).isoformat(),
+            }
+            response = await client.get("/v1/forecasts", params=params)
+            assert response.status_code == 200
+            assert len(response.json()["data"]) == 1
+
+    for hour, session in zip([2, 21], sessions):
+        forecasts = await get_latest_forecasts(
+            async_db_session, None, day + timedelta(hours=hour)
+        )
+        assert {f.session_id for f in forecasts} == {session.id}
@@ -0,0 +1,83 @@
+import multiprocessing
+
+import anyio
+import pytest
+
+from app import models
+from app.database import async_read_session
+from app.generation import GenerationWatcher, bump_generation, generation
+from app.locations import location_registry, save_forecast_location
+from app.scraper_sessions import complete_session
+
+
+def _api_worker(conn) -> None:
+    """Report the generation and cached location names on every message."""
+
+    async def serve():
+        generation.check_interval = 0
+        while conn.recv():
+            async with async_read_session() as db_session:
+                await generation.check(db_session)
+                locations = await location_registry.all(db_session)
+            conn.send((generation.value, sorted(l.name for l in locations)))
+
+    anyio.run(serve)
+
+
+async def _scrape(db_session, location_name: str) -> None:
+    session = models.Session("forecast_general")
+    db_session.add(session)
+    await db_session.flush()
+    await save_forecast_location(db_session, location_name, -17.7, 168.3)
+    await complete_session(db_session, session)
+    await db_session.commit()
+
+
+def _ask(conns) -> list:
+    for conn in conns:
+        conn.send(True)
+    replies = []
+    for conn in conns:
+        assert conn.poll(30), "worker did not reply"
+        replies.append(conn.recv())
+    return replies
+
+
+@pytest.mark.asyncio
+async def test_workers_flush_caches_on_new_generation(async_db_session):
+    await _scrape(async_db_session, "Port Vila")
+
+    context = multiprocessing.get_context("spawn")
+    conns, workers = [], []
+    for _ in range(2):
+        conn, worker_conn = context.Pipe()
+        worker = context.Process(target=_api_worker, args=(worker_conn,))
+        worker.start()
+        conns.append(conn)
+        workers.append(worker)
+    try:
+        assert _ask(conns) == [(1, ["Port Vila"])] * 2
+        # the locations are cached now so only the new generation reveals Lenakel
+        await _scrape(async_db_session, "Lenakel")
+        assert _ask(conns) == [(2, ["Lenakel", "Port Vila"])] * 2
+    finally:
+        for conn in conns:
+            conn.send(False)
+        for worker in workers:
+            worker.join(10)
+    assert [worker.exitcode for worker in workers] == [0, 0]
+
+
+@pytest.mark.asyncio
+async def test_generation_read_at_most_once_per_interval(async_db_session):
+    watcher = GenerationWatcher(check_interval=60)
+    changes = []
+    watcher.on_change(lambda: changes.append(watcher.value))
+
+    await bump_generation(async_db_session)
+    assert await watcher.check(async_db_session) == 1
+    await bump_generation(async_db_session)
+    assert await watcher.check(async_db_session) == 1
+    watcher.check_interval = 0
+    assert await watcher.check(async_db_session) == 2
+    assert changes == [1, 2]
@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import event, func, select
+
+from app import models
+from app.database import async_engine
+from app.locations import LocationIndex, location_registry, save_forecast_location
+from tests.factories import LocationFactory
+
+
+@pytest.mark.asyncio
+async def test_location_registry_resolves_without_queries(async_db_session):
+    location = await save_forecast_location(async_db_session, "Port Vila", -17.7, 168.3)
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        by_id = await location_registry.get_by_id(async_db_session, location.id)
+        by_name = await location_registry.get_by_name(async_db_session, "PORT VILA")
+        by_slug = await location_registry.get_by_slug(async_db_session, "port-vila")
+        saved = await save_forecast_location(
+            async_db_session, "port vila", -17.7, 168.3
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert statements == []
+    assert by_id is by_name is by_slug is saved is location
+
+
+@pytest.mark.asyncio
+async def test_save_forecast_location_upserts_on_name(async_db_session):
+    await location_registry.load(async_db_session)
+    # inserted behind the back of the registry, e.g. by another process
+    async_db_session.add(models.Location("Luganville", -15.5, 167.2))
+    await async_db_session.flush()
+
+    location = await save_forecast_location(
+        async_db_session, "Luganville", -15.5, 167.2
+    )
+    count = await async_db_session.scalar(select(func.count(models.Location.id)))
+    assert count == 1
+    assert location.slug == "luganville"
+    assert await location_registry.get_by_id(async_db_session, location.id) is location
+
+
+@pytest.mark.asyncio
+async def test_location_registry_cleared_on_rollback(async_db_session):
+    location = await save_forecast_location(async_db_session, "Lenakel", -19.5, 169.3)
+    await async_db_session.rollback()
+
+    assert await location_registry.get_by_id(async_db_session, location.id) is None
+
+
+LOCATIONS = [
+    ("Port Vila", -17.7333, 168.3273),
+    ("Luganville", -15.5126, 167.1766),
+    ("Lenakel", -19.5333, 169.2667),
+]
+
+
+def test_location_index_nearest():
+    locations = []
+    for location_id, (name, latitude, longitude) in enumerate(LOCATIONS, 1):
+        location = models.Location(name, latitude, longitude)
+        location.id = location_id
+        locations.append(location)
+    index = LocationIndex(locations)
+
+    nearest = index.nearest(-17.74, 168.31)
+    assert [(l.name, round(d)) for l, d in nearest] == [("Port Vila", 2)]
+    nearest = index.nearest(-17.74, 168.31, k=None)
+    assert [l.name for l, _ in nearest] == ["Port Vila", "Lenakel", "Luganville"]
+    assert [round(d, -1) for _, d in nearest] == [0, 220, 280]
+    nearest = index.nearest(-17.74, 168.31, k=3, max_distance=250)
+    assert [l.name for l, _ in nearest] == ["Port Vila", "Lenakel"]
+    assert index.nearest(-17.74, 168.31, max_distance=1) == []
+    assert LocationIndex([]).nearest(-17.74, 168.31) == []
+
+
+def test_locations_by_coordinates(client):
+    for name, latitude, longitude in LOCATIONS:
+        LocationFactory(name=name, latitude=latitude, longitude=longitude)
+
+    response = client.get("/v1/locations", params={"lat": -15.5, "lon": 167.2, "k": 2})
+    assert response.status_code == 200
+    assert [l["name"] for l in response.json()] == ["Luganville", "Port Vila"]
+    assert response.json()[0]["distance"] < 5
+
+    response = client.get("/v1/locations", params={"lat": -15.5})
+    assert response.status_code == 400
+
+    response = client.get(
+        "/v1/forecasts", params={"lat": 0, "lon": 0, "maxDistance": 100}
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No location within this distance"
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app import models
+from app.api.main import app
+from app.api.pagination import decode_cursor, encode_cursor
+from app.scraper_sessions import complete_session
+from tests.test_aggregators import _aggregate_recorded_forecast
+
+ISSUED = datetime(2023, 5, 1, 13, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(ISSUED, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (ISSUED, 42)
+
+
+async def _page_through(client, url: str, params: dict) -> list[list[dict]]:
+    pages = []
+    while True:
+        response = await client.get(url, params=params)
+        assert response.status_code == 200
+        pages.append(response.json()["data"])
+        cursor = response.json()["meta"]["next"]
+        if cursor is None:
+            return pages
+        params = {**params, "cursor": cursor}
+
+
+@pytest.mark.asyncio
+async def test_forecasts_history(async_db_session):
+    await _aggregate_recorded_forecast(async_db_session)
+    await _aggregate_recorded_forecast(async_db_session)
+    # completed before sessions had a status
+    legacy = await _aggregate_recorded_forecast(async_db_session)
+    legacy.status = None
+    await async_db_session.commit()
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        pages = await _page_through(client, "/v1/forecasts/history", {"limit": 50})
+        assert [len(page) for page in pages] == [50, 50, 50, 50, 50, 23]
+        rows = [row for page in pages for row in page]
+        assert len({row["id"] for row in rows}) == 3 * 13 * 7
+        keys = [(row["issued_at"], row["id"]) for row in rows]
+        assert keys == sorted(keys)
+        assert {row["session_id"] for row in rows} == {1, 2, legacy.id}
+
+        pages = await _page_through(
+            client, "/v1/forecasts/history", {"limit": 7, "locationId": 3}
+        )
+        assert [len(page) for page in pages] == [7, 7, 7]
+        assert {row["location"] for page in pages for row in page} == {3}
+
+        response = await client.get(
+            "/v1/forecasts/history", params={"cursor": "not-a-cursor"}
+        )
+        assert response.status_code == 400
+        response = await client.get("/v1/forecasts/history", params={"limit": 0})
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_weather_warnings_history(async_db_session):
+    for i in range(3):
+        for name in ["warning_marine", "warning_bulletin"]:
+            session = models.Session(name)
+            async_db_session.add(session)
+            await async_db_session.flush()
+            issued_at = ISSUED + timedelta(days=i)
+            async_db_session.add(
+                models.WeatherWarning(session.id, issued_at, issued_at, name)
+            )
+            await complete_session(async_db_session, session)
+            if i == 0:
+                # completed before sessions had a status
+                session.status = None
+    await async_db_session.commit()
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        pages = await _page_through(
+            client, "/v1/warnings/history", {"limit": 2, "name": "warning_marine"}
+        )
+        assert [len(page) for page in pages] == [2, 1]
+        rows = [row for page in pages for row in page]
+        assert [row["issued_at"] for row in rows] == [
+            (ISSUED + timedelta(days=i)).isoformat() for i in range(3)
+        ]
+        assert {row["name"] for row in rows} == {"warning_marine"}
+
+        pages = await _page_through(client, "/v1/warnings/history", {"limit": 4})
+        assert [len(page) for page in pages] == [4, 2]
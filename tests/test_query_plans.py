@@ -0,0 +1,137 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app import models
+from app.database import async_engine
+from app.forecast_media import get_latest_forecast_media
+from app.forecasts import (
+    get_forecast_history,
+    get_latest_forecasts,
+    get_latest_forecasts_by_location,
+)
+from app.scraper.sessions import ForecastSession, WarningSession
+from app.scraper_sessions import complete_session, get_latest_scraper_session
+from app.weather_warnings import (
+    get_latest_weather_warning,
+    get_weather_warning_history,
+)
+
+DT = datetime(2024, 6, 5, 13, tzinfo=timezone.utc)
+# `SCAN forecast_daily` but neither `SCAN forecast_daily USING INDEX ...` nor the
+# scan of a subquery result or a constant row
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)\w+( AS \w+)?$")
+
+
+async def _query_plans(db_session, lookup) -> list[tuple[str, str]]:
+    """Run `lookup` and return each step of the query plans of its SQL with the SQL."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await lookup(db_session)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert statements, "no SQL was emitted"
+
+    conn = await db_session.connection()
+    steps = []
+    for statement, parameters in statements:
+        plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        steps.extend((detail, statement) for *_, detail in plan)
+    return steps
+
+
+async def _full_scans(db_session, lookup) -> list[str]:
+    """Run `lookup` and return the full table scans in the query plans of its SQL."""
+    return [
+        f"{detail} in {statement}"
+        for detail, statement in await _query_plans(db_session, lookup)
+        if FULL_SCAN.match(detail)
+    ]
+
+
+LOOKUPS = {
+    "forecasts": lambda s, location: get_latest_forecasts(s, None),
+    "forecasts_location": lambda s, location: get_latest_forecasts(s, location),
+    "forecasts_dt": lambda s, location: get_latest_forecasts(s, None, DT),
+    "forecasts_location_dt": lambda s, location: get_latest_forecasts(s, location, DT),
+    "forecasts_by_location": lambda s, location: get_latest_forecasts_by_location(
+        s, [location], DT, DT + timedelta(days=6)
+    ),
+    "forecasts_by_location_all": lambda s, location: get_latest_forecasts_by_location(
+        s, None
+    ),
+    "forecast_history": lambda s, location: get_forecast_history(s, None, None, 100),
+    "forecast_history_page": lambda s, location: get_forecast_history(
+        s, location, (DT, 1000), 100
+    ),
+    "forecast_media": lambda s, location: get_latest_forecast_media(s),
+    "forecast_media_dt": lambda s, location: get_latest_forecast_media(s, DT),
+    "weather_warning": lambda s, location: get_latest_weather_warning(
+        s, WarningSession.WARNING_MARINE
+    ),
+    "weather_warning_dt": lambda s, location: get_latest_weather_warning(
+        s, WarningSession.WARNING_MARINE, DT
+    ),
+    "weather_warning_history_page": lambda s, location: get_weather_warning_history(
+        s, WarningSession.WARNING_MARINE, (DT, 1000), 100
+    ),
+    "scraper_session": lambda s, location: get_latest_scraper_session(
+        s, session_name=ForecastSession.FORECAST_GENERAL
+    ),
+    "scraper_session_successful": lambda s, location: get_latest_scraper_session(
+        s, session_name=ForecastSession.FORECAST_GENERAL, successful_run_only=True
+    ),
+}
+
+
+async def _save_sessions(db_session) -> models.Location:
+    location = models.Location("Port Vila", -17.7, 168.3)
+    db_session.add(location)
+    for session_name in [*ForecastSession, *WarningSession]:
+        session = models.Session(session_name.value)
+        db_session.add(session)
+        await db_session.flush()
+        await complete_session(db_session, session)
+    return location
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", LOOKUPS)
+async def test_latest_lookups_use_indexes(async_db_session, name):
+    location = await _save_sessions(async_db_session)
+
+    lookup = LOOKUPS[name]
+    assert await _full_scans(async_db_session, lambda s: lookup(s, location)) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "name, index",
+    [
+        ("forecast_history_page", "ix_forecast_daily_issued_at_id"),
+        ("weather_warning_history_page", "ix_warning_issued_at_id"),
+    ],
+)
+async def test_history_pages_search_the_keyset_index(async_db_session, name, index):
+    location = await _save_sessions(async_db_session)
+
+    lookup = LOOKUPS[name]
+    steps = [
+        detail
+        for detail, _ in await _query_plans(
+            async_db_session, lambda s: lookup(s, location)
+        )
+    ]
+    # a range of the index from the cursor and no sort, so every page reads `limit`
+    # rows however deep it is
+    assert any(
+        step.endswith(f"USING INDEX {index} (issued_at>?)") for step in steps
+    ), steps
+    assert not any("TEMP B-TREE" in step for step in steps), steps
@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.api.cache import ResponseCache, date_bucket
+from app.api.main import app
+from app.database import async_read_engine
+from app.generation import generation
+from tests.test_aggregators import _aggregate_recorded_forecast
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_size=2)
+    keys = [cache.key("forecasts", location=i) for i in range(3)]
+    assert cache.get(keys[0]) is None
+
+    response = cache.store(keys[0], b'{"value":0}')
+    assert response.media_type == "application/json"
+    cache.store(keys[1], b'{"value":1}')
+    assert cache.get(keys[0]).body == b'{"value":0}'
+    cache.store(keys[2], b'{"value":2}')
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]).body == b'{"value":2}'
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_date_bucket():
+    dt = datetime(2024, 6, 5, 13, 42, 7, 123, tzinfo=timezone.utc)
+    assert date_bucket(dt) == datetime(2024, 6, 5, 13, tzinfo=timezone.utc)
+    assert date_bucket(None) is None
+
+
+@pytest.mark.asyncio
+async def test_cached_forecasts_skip_sql(async_db_session, monkeypatch):
+    monkeypatch.setattr(generation, "check_interval", 0)
+    await _aggregate_recorded_forecast(async_db_session)
+    await async_db_session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_read_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            params = {"locationId": 1}
+            response = await client.get("/v1/forecasts", params=params)
+            assert response.status_code == 200
+            statements.clear()
+
+            cached = await client.get("/v1/forecasts", params=params)
+            assert cached.content == response.content
+            assert cached.headers["content-type"] == "application/json"
+            # only the generation is read
+            assert len(statements) == 1
+            statements.clear()
+
+            # a new session is a new generation so the forecasts are read again
+            await _aggregate_recorded_forecast(async_db_session)
+            await async_db_session.commit()
+            response = await client.get("/v1/forecasts", params=params)
+            assert response.status_code == 200
+            assert len(statements) > 1
+    finally:
+        event.remove(async_read_engine.sync_engine, "before_cursor_execute", record)
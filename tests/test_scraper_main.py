@@ -0,0 +1,166 @@
+import pickle
+import time
+
+import anyio
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app import config, models
+from app.scraper import executors
+from app.scraper.exceptions import ScrapingValidationError
+from app.scraper.main import process_session_mapping, scrape_page_mappings
+from app.scraper.pages import PageMapping, PagePath
+from app.scraper.scrapers import ScrapeResult
+from app.scraper.sessions import ForecastSession, SessionMapping, SessionStatus
+from app.scraper.utils import HostRateLimiter, RateLimitedTransport
+
+
+def _echo_path(html: str) -> ScrapeResult:
+    return ScrapeResult(raw_data=html)
+
+
+@pytest.mark.asyncio
+async def test_scrape_page_mappings_keeps_page_order():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        # make the first page the slowest to respond
+        if request.url.path.endswith(PagePath.FORECAST_MAP.value):
+            await anyio.sleep(0.05)
+        return httpx.Response(200, text=request.url.path)
+
+    transport = RateLimitedTransport(
+        httpx.MockTransport(handler), HostRateLimiter(rate=100, max_in_flight=2)
+    )
+    mappings = [
+        PageMapping(PagePath.FORECAST_MAP, _echo_path),
+        PageMapping(PagePath.FORECAST_WEEK, _echo_path),
+    ]
+    async with httpx.AsyncClient(transport=transport) as client:
+        results = await scrape_page_mappings(client, mappings)
+
+    assert [result.error for result in results] == [None, None]
+    assert [result.scraped.raw_data for result in results] == [
+        "/vmgd/index.php" + PagePath.FORECAST_MAP.value,
+        "/vmgd/index.php" + PagePath.FORECAST_WEEK.value,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_host_rate_limiter_delays_requests_over_the_burst():
+    rate, burst, n_requests = 50, 2, 7
+    limiter = HostRateLimiter(rate=rate, max_in_flight=burst)
+    started = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def request(host: str) -> None:
+        nonlocal in_flight, max_in_flight
+        async with limiter.limit(host):
+            started.append(time.monotonic())
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await anyio.sleep(0)
+            in_flight -= 1
+
+    start = time.monotonic()
+    async with anyio.create_task_group() as tg:
+        for _ in range(n_requests):
+            tg.start_soon(request, "vmgd.gov.vu")
+    elapsed = time.monotonic() - start
+
+    assert len(started) == n_requests
+    assert max_in_flight <= burst
+    # the burst goes through at once, every request after it waits for a token
+    assert started[burst - 1] - start < 1 / rate
+    assert elapsed >= (n_requests - burst) / rate * 0.9
+
+    # each host has its own bucket
+    start = time.monotonic()
+    await request("example.com")
+    assert time.monotonic() - start < 1 / rate
+
+
+@pytest.mark.asyncio
+async def test_process_session_mapping_reuses_unchanged_pages(
+    async_db_session, monkeypatch
+):
+    monkeypatch.setattr(config, "SCRAPER_EXECUTOR", "inline")
+    monkeypatch.setattr(executors, "_executor", None)
+    html = {
+        PagePath.FORECAST_MAP.value: "map 1",
+        PagePath.FORECAST_WEEK.value: "week 1",
+    }
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        text = html[request.url.path.removeprefix("/vmgd/index.php")]
+        etag = f'"{text}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, text=text, headers={"ETag": etag})
+
+    processed = []
+
+    async def process(db_session, session, pages):
+        processed.append([page.raw_data for page in pages])
+
+    session_mapping = SessionMapping(
+        name=ForecastSession.FORECAST_GENERAL,
+        pages=[
+            PageMapping(PagePath.FORECAST_MAP, _echo_path),
+            PageMapping(PagePath.FORECAST_WEEK, _echo_path),
+        ],
+        process=process,
+    )
+
+    async def run() -> models.Session:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await process_session_mapping(session_mapping, client)
+        query = select(models.Session).order_by(models.Session.id.desc()).limit(1)
+        session = (await async_db_session.execute(query)).scalar()
+        await async_db_session.commit()
+        return session
+
+    async def count_pages() -> int:
+        count = await async_db_session.scalar(select(func.count(models.Page.id)))
+        await async_db_session.commit()
+        return count
+
+    first = await run()
+    assert first.status == SessionStatus.COMPLETED.value
+    assert processed == [["map 1", "week 1"]]
+    assert await count_pages() == 2
+
+    # every page unchanged: nothing is processed or saved
+    unchanged = await run()
+    assert unchanged.status == SessionStatus.UNCHANGED.value
+    assert unchanged.completed_at is not None
+    assert len(processed) == 1
+    assert await count_pages() == 2
+
+    # one page changed: the unchanged page is given the data of its last page
+    html[PagePath.FORECAST_WEEK.value] = "week 2"
+    changed = await run()
+    assert changed.status == SessionStatus.COMPLETED.value
+    assert processed[-1] == ["map 1", "week 2"]
+    pages = (
+        await async_db_session.execute(
+            select(models.Page).where(models.Page.session_id == changed.id)
+        )
+    ).scalars()
+    assert sorted(page.raw_data for page in pages) == ["map 1", "week 2"]
+    page_state = await async_db_session.scalar(
+        select(models.PageState).where(
+            models.PageState.url == PagePath.FORECAST_WEEK.value
+        )
+    )
+    assert page_state.etag == '"week 2"'
+
+
+def test_scraping_errors_survive_pickling():
+    exc = ScrapingValidationError("<html></html>", [1, 2], [{0: ["bad"]}])
+    unpickled = pickle.loads(pickle.dumps(exc))
+    assert type(unpickled) is ScrapingValidationError
+    assert unpickled.html == exc.html
+    assert unpickled.raw_data == exc.raw_data
+    assert unpickled.errors == exc.errors
+    assert str(unpickled) == str(exc)
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app import models, scraper_sessions
+from app.scraper.sessions import ForecastSession, SessionStatus
+from app.scraper_sessions import (
+    complete_session,
+    get_latest_scraper_session,
+    latest_session_id,
+)
+
+START = datetime(2024, 6, 4, 6, tzinfo=timezone.utc)
+
+
+async def _run_session(db_session, monkeypatch, completed_at, status=None):
+    session = models.Session(ForecastSession.FORECAST_GENERAL.value)
+    db_session.add(session)
+    await db_session.flush()
+    if status is not None:
+        monkeypatch.setattr(scraper_sessions, "now", lambda: completed_at)
+        await complete_session(db_session, session, status)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_latest_session_skips_failed_and_unchanged(async_db_session, monkeypatch):
+    completed = await _run_session(
+        async_db_session, monkeypatch, START, SessionStatus.COMPLETED
+    )
+    await _run_session(
+        async_db_session,
+        monkeypatch,
+        START + timedelta(hours=1),
+        SessionStatus.UNCHANGED,
+    )
+    # failed so never completed
+    failed = await _run_session(async_db_session, monkeypatch, None)
+
+    latest = await get_latest_scraper_session(
+        async_db_session,
+        session_name=ForecastSession.FORECAST_GENERAL,
+        successful_run_only=True,
+    )
+    assert latest is completed
+    latest_run = await get_latest_scraper_session(
+        async_db_session, session_name=ForecastSession.FORECAST_GENERAL
+    )
+    assert latest_run is failed
+
+
+@pytest.mark.asyncio
+async def test_latest_session_as_of_a_date(async_db_session, monkeypatch):
+    sessions = [
+        await _run_session(async_db_session, monkeypatch, completed_at, status)
+        for completed_at, status in [
+            (START, SessionStatus.COMPLETED),
+            (START + timedelta(hours=6), SessionStatus.COMPLETED),
+            (START + timedelta(hours=8), SessionStatus.UNCHANGED),
+            (START + timedelta(days=2), SessionStatus.COMPLETED),
+        ]
+    ]
+
+    async def latest_id(dt=None):
+        query = select(latest_session_id(ForecastSession.FORECAST_GENERAL, dt))
+        return (await async_db_session.execute(query)).scalar()
+
+    assert await latest_id() == sessions[3].id
+    # the session of the same day completed later is not latest yet
+    assert await latest_id(START + timedelta(hours=1)) == sessions[0].id
+    assert await latest_id(START + timedelta(hours=9)) == sessions[1].id
+    assert await latest_id(START + timedelta(days=1)) == sessions[1].id
+    assert await latest_id(START + timedelta(days=3)) == sessions[3].id
+    assert await latest_id(START - timedelta(days=1)) is None
+
+
+@pytest.mark.asyncio
+async def test_latest_session_of_a_session_completed_before_status(
+    async_db_session, monkeypatch
+):
+    # completed before sessions had a status
+    legacy = await _run_session(
+        async_db_session, monkeypatch, START, SessionStatus.COMPLETED
+    )
+    legacy.status = None
+    await async_db_session.flush()
+
+    query = select(
+        latest_session_id(ForecastSession.FORECAST_GENERAL, START + timedelta(hours=1))
+    )
+    assert (await async_db_session.execute(query)).scalar() == legacy.id
@@ -0,0 +1,164 @@
+from pathlib import Path
+
+import pytest
+
+from app import config
+from app.scraper.parsers import HtmlParser
+from app.scraper.exceptions import ScrapingValidationError
+from app.scraper.scrapers import (
+    NO_CURRENT_WARNING,
+    extract_forecast_from_html,
+    extract_forecast_from_soup,
+    parse_js_array,
+    scrape_forecast,
+    scrape_public_forecast_7_day,
+    scrape_public_forecast_media,
+    scrape_weather_warnings,
+)
+
+HTML_EXAMPLES = Path(__file__).parent / "html_examples"
+
+# pages and the scraper for each; only the forecast page is a recording, the others
+# are small hand written pages following the layout the scrapers expect.
+# `scrape_forecast` reads the raw HTML, so its soup fallback is compared instead
+CORPUS = [
+    ("forecast-division-20240606.html", extract_forecast_from_soup),
+    ("public-forecast-7-day.html", scrape_public_forecast_7_day),
+    ("public-forecast-media.html", scrape_public_forecast_media),
+    ("marine-warning.html", scrape_weather_warnings),
+    ("severe-weather-warning.html", scrape_weather_warnings),
+]
+
+
+@pytest.mark.parametrize("parser", list(HtmlParser))
+@pytest.mark.parametrize("filename, scraper", CORPUS)
+def test_parser_backends_give_identical_results(monkeypatch, filename, scraper, parser):
+    html = (HTML_EXAMPLES / filename).read_text()
+    monkeypatch.setattr(config, "SCRAPER_HTML_PARSER", HtmlParser.HTML_PARSER.value)
+    expected = scraper(html)
+    monkeypatch.setattr(config, "SCRAPER_HTML_PARSER", parser.value)
+    assert scraper(html) == expected
+
+
+def test_scrape_forecast_recorded_page():
+    html = (HTML_EXAMPLES / "forecast-division-20240606.html").read_text()
+    result = scrape_forecast(html)
+    assert result.issued_at.isoformat() == "2024-06-05T18:28:00+00:00"
+    assert len(result.raw_data) == 13
+    assert result.raw_data[0][:3] == ["Anelcauhat", -20.23063, 169.781685]
+
+
+@pytest.mark.parametrize("parser", list(HtmlParser))
+def test_scrape_public_forecast_7_day(monkeypatch, parser):
+    monkeypatch.setattr(config, "SCRAPER_HTML_PARSER", parser.value)
+    html = (HTML_EXAMPLES / "public-forecast-7-day.html").read_text()
+    result = scrape_public_forecast_7_day(html)
+    assert result.issued_at.isoformat() == "2024-06-05T18:28:00+00:00"
+    assert result.raw_data == [
+        dict(
+            location="Port Vila",
+            date="Friday 7",
+            summary="Partly cloudy",
+            minTemp=21,
+            maxTemp=27,
+        ),
+        dict(
+            location="Port Vila",
+            date="Saturday 8",
+            summary="Sunny periods",
+            minTemp=20,
+            maxTemp=26,
+        ),
+        dict(
+            location="Luganville",
+            date="Friday 7",
+            summary="Showers",
+            minTemp=22,
+            maxTemp=29,
+        ),
+        dict(
+            location="Luganville",
+            date="Saturday 8",
+            summary="Cloudy periods with showers",
+            minTemp=22,
+            maxTemp=28,
+        ),
+    ]
+
+
+@pytest.mark.parametrize("parser", list(HtmlParser))
+def test_scrape_public_forecast_media(monkeypatch, parser):
+    monkeypatch.setattr(config, "SCRAPER_HTML_PARSER", parser.value)
+    html = (HTML_EXAMPLES / "public-forecast-media.html").read_text()
+    result = scrape_public_forecast_media(html)
+    assert result.issued_at.isoformat() == "2024-06-05T18:28:00+00:00"
+    assert result.raw_data == (
+        "Forecast for Vanuatu High pressure system south of the group is weakening."
+        " Moderate southeast winds over the group."
+    )
+    assert result.images == [
+        "data:image/png;base64,iVBORw0KGgo=",
+        "data:image/png;base64,AAAA",
+    ]
+
+
+@pytest.mark.parametrize("parser", list(HtmlParser))
+def test_scrape_weather_warnings(monkeypatch, parser):
+    monkeypatch.setattr(config, "SCRAPER_HTML_PARSER", parser.value)
+    html = (HTML_EXAMPLES / "marine-warning.html").read_text()
+    result = scrape_weather_warnings(html)
+    assert result.issued_at.isoformat() == "2024-06-05T18:28:00+00:00"
+    assert result.raw_data == [
+        dict(
+            date="Thursday 6th June 2024",
+            body="Strong wind warning for all coastal watersof Vanuatu.",
+        ),
+        dict(
+            date="Friday 7th June 2024",
+            body="Strong wind warning remains in force for southern waters.",
+        ),
+    ]
+
+
+@pytest.mark.parametrize("parser", list(HtmlParser))
+def test_scrape_weather_warnings_no_current_warning(monkeypatch, parser):
+    monkeypatch.setattr(config, "SCRAPER_HTML_PARSER", parser.value)
+    html = (HTML_EXAMPLES / "severe-weather-warning.html").read_text()
+    result = scrape_weather_warnings(html)
+    assert result.raw_data == NO_CURRENT_WARNING
+    assert result.issued_at is None
+
+
+@pytest.mark.parametrize("parser", list(HtmlParser))
+def test_forecast_targeted_extraction_matches_soup(monkeypatch, parser):
+    monkeypatch.setattr(config, "SCRAPER_HTML_PARSER", parser.value)
+    html = (HTML_EXAMPLES / "forecast-division-20240606.html").read_text()
+    weathers, issued_str = extract_forecast_from_html(html)
+    soup_weathers, soup_issued_str = extract_forecast_from_soup(html)
+    assert weathers == soup_weathers
+    assert issued_str.split() == soup_issued_str.split()
+
+
+def test_scrape_forecast_falls_back_to_soup():
+    html = (
+        "<html><body>"
+        "<div id='issueDate'><strong>Forecast Issue Date: Thu 06th June, 2024 at 05:28"
+        " (UTC Time:18:28)</strong></div>"
+        '<script>var weathers = [["Port Vila", -17.7, 168.3]];</script>'
+        "</body></html>"
+    )
+    # single quoted id is not matched by the targeted extraction
+    assert extract_forecast_from_html(html) is None
+    with pytest.raises(ScrapingValidationError) as exc_info:
+        scrape_forecast(html)
+    assert exc_info.value.raw_data == [["Port Vila", -17.7, 168.3]]
+
+
+def test_parse_js_array_from_index():
+    text = 'var weathers = [["Port Vila", -17.7, 168.3]];\nvar other = [1];'
+    assert parse_js_array(text, text.index("=") + 1) == [["Port Vila", -17.7, 168.3]]
+
+
+def test_parse_js_array_trailing_commas():
+    text = '[\n  ["Port Vila ], x,]", [1, 2,],],\n];\nvar note = "a, ]";'
+    assert parse_js_array(text) == [["Port Vila ], x,]", [1, 2]]]
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import models
+from app.api import responses, serializers
+from app.api.main import app
+from app.forecasts import get_latest_forecast_intervals, get_latest_forecasts
+from tests.test_aggregators import _aggregate_recorded_forecast
+
+ISSUED = datetime(2024, 6, 4, 18, 30, 12, 345, tzinfo=timezone.utc)
+
+
+async def _pydantic_body(data, response_class) -> bytes:
+    """Body of the response as FastAPI renders the Pydantic models."""
+    meta = responses.VmgdApiResponseMeta(
+        issued=ISSUED.replace(microsecond=0), fetched=ISSUED.replace(microsecond=0)
+    )
+    response = response_class(meta=meta, data=data)
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+@pytest.mark.asyncio
+async def test_forecast_data_matches_pydantic(async_db_session):
+    await _aggregate_recorded_forecast(async_db_session)
+    forecasts = await get_latest_forecasts(async_db_session, None)
+    assert len(forecasts) == 13 * 7
+
+    expected = await _pydantic_body(
+        [
+            responses.ForecastResponseData(
+                location=f.location.id,
+                date=f.date,
+                summary=f.summary,
+                minTemp=f.minTemp,
+                maxTemp=f.maxTemp,
+                minHumi=f.minHumi,
+                maxHumi=f.maxHumi,
+                windSpeed=f.windSpeed,
+                windDirection=f.windDirection,
+                weatherCondition=f.weatherCondition,
+            )
+            for f in forecasts
+        ],
+        responses.VmgdApiForecastResponse,
+    )
+    body = serializers.dump_vmgd_api_response(
+        list(map(serializers.forecast_data, forecasts)), issued=ISSUED, fetched=ISSUED
+    )
+    assert body == expected
+
+
+@pytest.mark.asyncio
+async def test_forecast_interval_data_matches_pydantic(async_db_session):
+    await _aggregate_recorded_forecast(async_db_session)
+    intervals = await get_latest_forecast_intervals(async_db_session, None)
+
+    data = [d for i in intervals for d in serializers.forecast_interval_data(i)]
+    # the recorded page has missing wind speeds
+    assert any(d["windSpeed"] is None for d in data)
+    expected = await _pydantic_body(
+        [responses.ForecastIntervalResponseData(**d) for d in data],
+        responses.VmgdApiForecastIntervalResponse,
+    )
+    body = serializers.dump_vmgd_api_response(data, issued=ISSUED, fetched=ISSUED)
+    assert body == expected
+
+
+@pytest.mark.asyncio
+async def test_weather_warning_data_matches_pydantic():
+    session = models.Session("warning_marine")
+    warnings = []
+    for body in ["Strong wind warning for all coastal waters", None]:
+        ww = models.WeatherWarning(1, ISSUED, ISSUED, body)
+        ww.session = session
+        warnings.append(ww)
+
+    expected = await _pydantic_body(
+        [
+            responses.WeatherWarningResponseData(
+                date=w.date, name=w.session._name, body=w.body
+            )
+            for w in warnings
+        ],
+        responses.VmgdApiWeatherWarningsResponse,
+    )
+    body = serializers.dump_vmgd_api_response(
+        list(map(serializers.weather_warning_data, warnings)),
+        issued=ISSUED,
+        fetched=ISSUED,
+    )
+    assert body == expected
+
+
+def test_openapi_keeps_response_models():
+    paths = app.openapi()["paths"]
+
+    def schema_ref(path: str) -> str:
+        content = paths[path]["get"]["responses"]["200"]["content"]
+        return content["application/json"]["schema"]["$ref"]
+
+    assert schema_ref("/v1/forecasts").endswith("/VmgdApiForecastResponse")
+    assert schema_ref("/v1/forecasts/intervals").endswith(
+        "/VmgdApiForecastIntervalResponse"
+    )
+    assert schema_ref("/v1/media").endswith("/VmgdApiForecastMediaResponse")
+    assert schema_ref("/v1/warnings").endswith("/VmgdApiWeatherWarningsResponse")
@@ -0,0 +1,93 @@
+import copy
+from pathlib import Path
+
+import pytest
+from cerberus import Validator
+from cerberus_list_schema import Validator as ListValidator
+
+from app.scraper.schemas import (
+    process_forecast_schema,
+    process_public_forecast_7_day_schema,
+)
+from app.scraper.scrapers import extract_forecast_from_html
+from app.scraper.validators import CompiledListValidator, CompiledValidator
+
+HTML_EXAMPLES = Path(__file__).parent / "html_examples"
+
+WEATHERS, _ = extract_forecast_from_html(
+    (HTML_EXAMPLES / "forecast-division-20240606.html").read_text()
+)
+
+
+def _mutate(index, value):
+    def mutate(row):
+        row[index] = value
+        return row
+
+    return mutate
+
+
+def _mutate_item(index, item, value):
+    def mutate(row):
+        row[index][item] = value
+        return row
+
+    return mutate
+
+
+FORECAST_MUTATIONS = [
+    lambda row: row,
+    _mutate(0, 12),
+    _mutate(0, None),
+    _mutate(1, "-17.7"),
+    _mutate(1, 17),
+    _mutate(3, "2024-06-06"),
+    _mutate_item(4, 2, "22"),
+    _mutate_item(4, 2, None),
+    _mutate_item(8, 0, 1.5),
+    _mutate(9, [1.0] * 15),
+    _mutate(10, []),
+    lambda row: row[:-1],
+    lambda row: [*row, "extra"],
+    lambda row: _mutate(0, 1)(_mutate_item(6, 0, "x")(row)),
+]
+
+
+@pytest.mark.parametrize("mutate", FORECAST_MUTATIONS)
+def test_compiled_list_validator_matches_cerberus(mutate):
+    cerberus_validator = ListValidator(process_forecast_schema)
+    validator = CompiledListValidator(process_forecast_schema)
+    for row in WEATHERS:
+        document = mutate(copy.deepcopy(row))
+        cerberus_validator.validate(document)
+        assert validator.errors(document) == cerberus_validator.errors
+
+
+VALID_7_DAY = {
+    "location": "Port Vila",
+    "date": "Friday 7",
+    "summary": "Partly cloudy",
+    "minTemp": 21,
+    "maxTemp": 28,
+}
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {},
+        {"minTemp": "22"},
+        {"minTemp": "twenty"},
+        {"maxTemp": None},
+        {"location": ""},
+        {"location": None, "date": 7},
+        {"summary": ""},
+        {"wind": "SE"},
+    ],
+)
+def test_compiled_validator_matches_cerberus(changes):
+    document = {**VALID_7_DAY, **changes}
+    cerberus_validator = Validator(process_public_forecast_7_day_schema)
+    cerberus_validator.validate(document)
+    validator = CompiledValidator(process_public_forecast_7_day_schema)
+    assert validator.errors(document) == cerberus_validator.errors
@@ -1,3 +1,59 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app import models, scraper_sessions
+from app.api.main import app
+from app.scraper import aggregators
+from app.scraper.pages import PagePath
+from app.scraper.scrapers import NO_CURRENT_WARNING
+from app.scraper.sessions import SessionStatus, WarningSession
+from app.scraper_sessions import complete_session
+from app.utils.datetime import now
+
+
 def test_():
     pass
 
+
+@pytest.mark.asyncio
+async def test_latest_warning_stands_after_unchanged_sessions(
+    async_db_session, monkeypatch
+):
+    two_days_ago = now() - timedelta(days=2)
+    monkeypatch.setattr(scraper_sessions, "now", lambda: two_days_ago)
+    monkeypatch.setattr(aggregators, "now", lambda: two_days_ago)
+    session = models.Session(WarningSession.WARNING_MARINE.value)
+    async_db_session.add(session)
+    await async_db_session.flush()
+    page = models.Page(
+        path=PagePath.WARNING_MARINE,
+        raw_data=NO_CURRENT_WARNING,
+        session_id=session.id,
+        issued_at=two_days_ago,
+    )
+    async_db_session.add(page)
+    await async_db_session.flush()
+    await aggregators.aggregate_weather_warnings(async_db_session, session, [page])
+    await complete_session(async_db_session, session)
+    monkeypatch.undo()
+
+    # the page is unchanged since so no warning is saved today
+    unchanged = models.Session(WarningSession.WARNING_MARINE.value)
+    async_db_session.add(unchanged)
+    await async_db_session.flush()
+    await complete_session(async_db_session, unchanged, SessionStatus.UNCHANGED)
+    await async_db_session.commit()
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/v1/warnings")
+        assert response.status_code == 200
+        assert [w["name"] for w in response.json()["data"]] == ["warning_marine"]
+
+        for params in [{}, {"date": now().isoformat()}]:
+            response = await client.get("/v1/warnings/warning_marine", params=params)
+            assert response.status_code == 200
+            warning = response.json()["data"]
+            assert warning["body"] == NO_CURRENT_WARNING
+            assert datetime.fromisoformat(warning["date"]) == two_days_ago